@@ -0,0 +1,65 @@
+from collections.abc import Sequence
+from typing import Any
+
+from _pytest.config import Config, _prepareconfig
+
+
+OUTCOMES = ("passed", "failed", "skipped", "error", "xfailed", "xpassed")
+
+
+class FakeReport:
+    """
+    A test report that has only the attributes used to create a report.
+    """
+
+    __slots__ = ("location", "head_line")
+
+    def __init__(self, filesystempath: str, domaininfo: str) -> None:
+        self.location = (filesystempath, 0, domaininfo)
+        self.head_line = domaininfo
+
+
+class FakeReporter:
+    """
+    A minimal stand-in for the TerminalReporter that holds test reports per category.
+    """
+
+    def __init__(self, stats: dict[str, list[Any]]) -> None:
+        self.stats = stats
+
+    def getreports(self, name: str) -> list[Any]:
+        return self.stats.get(name, [])
+
+
+def make_reporter(num_reports: int, reports_per_row: int, verbosity_level: int) -> FakeReporter:
+    """
+    Create a reporter that has ``num_reports`` reports spread across
+    ``num_reports // reports_per_row`` rows of a report.
+    Most of the reports passed, every 10th row has reports of the other outcomes.
+    """
+
+    stats: dict[str, list[Any]] = {outcome: [] for outcome in OUTCOMES}
+
+    for i in range(num_reports):
+        row = i // reports_per_row
+        if verbosity_level == 0:
+            filepath, funcname = f"tests/test_{row}.py", f"test_func_{i}"
+        else:
+            filepath, funcname = f"tests/test_{row // 10}.py", f"test_func_{row}[{i}]"
+
+        outcome = OUTCOMES[i % len(OUTCOMES)] if row % 10 == 0 else "passed"
+        stats[outcome].append(FakeReport(filepath, funcname))
+
+    return FakeReporter(stats)
+
+
+def make_config(verbosity_level: int, args: Sequence[str] = ()) -> Config:
+    return _prepareconfig(
+        [
+            "-p",
+            "no:cacheprovider",
+            "--md-report",
+            f"--md-report-verbose={verbosity_level}",
+            *args,
+        ]
+    )
@@ -0,0 +1,90 @@
+"""
+Measure the memory retained by the aggregate of test reports, compared to
+aggregating the reports of the terminal reporter into a dict per row
+(extract_pytest_stats), for an increasing number of reports.
+
+Reports are created before the measurement, so strings that are shared with
+the reports are not counted.
+
+Cases:
+    - functions: every report is a distinct test function (a row per report)
+    - params: reports are parameter sets of test functions, folded into
+      a row per ``--params-per-row`` reports
+
+Usage:
+    python benchmarks/bench_aggregate_memory.py [--reports 50000 200000]
+        [--params-per-row 10]
+"""
+
+import argparse
+import tracemalloc
+from collections.abc import Sequence
+from functools import partial
+from typing import Any, Callable, Optional
+
+from _common import OUTCOMES, FakeReporter, make_reporter
+
+from pytest_md_report._aggregator import StatsAggregator
+from pytest_md_report.plugin import extract_pytest_stats
+
+
+VERBOSITY_LEVEL = 1
+
+
+def measure_retained(func: Callable[[], Any]) -> float:
+    """
+    Returns:
+        The memory usage in MiB that is retained by the return value of ``func``.
+    """
+
+    tracemalloc.start()
+    try:
+        start_bytes, _peak_bytes = tracemalloc.get_traced_memory()
+        result = func()
+        end_bytes, _peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return (end_bytes - start_bytes) / 1024**2
+
+
+def aggregate(reporter: FakeReporter) -> StatsAggregator:
+    aggregator = StatsAggregator(verbosity_level=VERBOSITY_LEVEL)
+
+    for outcome in OUTCOMES:
+        for report in reporter.getreports(outcome):
+            aggregator.add(outcome, report)
+
+    return aggregator
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--reports", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--params-per-row", type=int, default=10)
+    options = parser.parse_args(argv)
+
+    print(f"{'case':<10} {'reports':>9} {'rows':>8} {'baseline MiB':>13} {'aggregate MiB':>14}")
+
+    for num_reports in options.reports:
+        for case, reports_per_row in (("functions", 1), ("params", options.params_per_row)):
+            reporter = make_reporter(num_reports, reports_per_row, VERBOSITY_LEVEL)
+            num_rows = -(-num_reports // reports_per_row)
+
+            baseline = measure_retained(
+                partial(
+                    extract_pytest_stats,
+                    reporter,  # type: ignore[arg-type]
+                    outcomes=OUTCOMES,
+                    verbosity_level=VERBOSITY_LEVEL,
+                )
+            )
+            retained = measure_retained(partial(aggregate, reporter))
+            print(f"{case:<10} {num_reports:>9} {num_rows:>8} {baseline:>13.1f} {retained:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measure the time to render a report table for an increasing number of rows.
+
+The render time per row should stay roughly constant as the number of rows grows.
+
+Usage:
+    python benchmarks/bench_render.py [--rows 1000 2000 4000 8000] [--verbose 0|1]
+"""
+
+import argparse
+import time
+from collections.abc import Sequence
+from typing import Optional
+
+from _common import OUTCOMES, make_config, make_reporter
+from pytablewriter.writer.text import MarkdownFlavor
+
+from pytest_md_report import ColorPolicy, make_md_report
+
+
+def bench(
+    num_rows: int,
+    verbosity_level: int,
+    color_policy: ColorPolicy,
+    md_flavor: MarkdownFlavor,
+) -> float:
+    config = make_config(verbosity_level)
+    reporter = make_reporter(num_rows, reports_per_row=1, verbosity_level=verbosity_level)
+    total_stats = {outcome: len(reporter.getreports(outcome)) for outcome in OUTCOMES}
+
+    start = time.perf_counter()
+    make_md_report(
+        config,
+        reporter,  # type: ignore[arg-type]
+        total_stats,
+        color_policy=color_policy,
+        apply_ansi_escape=color_policy != ColorPolicy.NEVER,
+        md_flavor=md_flavor,
+    )
+    elapsed = time.perf_counter() - start
+    config._ensure_unconfigure()
+
+    return elapsed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 2000, 4000, 8000])
+    parser.add_argument("--verbose", type=int, choices=[0, 1], default=0)
+    options = parser.parse_args(argv)
+
+    print(f"{'policy':>8} {'rows':>8} {'seconds':>10} {'usec/row':>10}")
+    for color_policy in (ColorPolicy.AUTO, ColorPolicy.TEXT, ColorPolicy.NEVER):
+        for num_rows in options.rows:
+            elapsed = bench(num_rows, options.verbose, color_policy, MarkdownFlavor.GFM)
+            print(
+                f"{color_policy.name:>8} {num_rows:>8} {elapsed:>10.3f} "
+                f"{elapsed / num_rows * 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Measure the time and the peak memory usage of each step of creating a report
+from synthetic test reports, for an increasing number of reports.
+
+Steps:
+    - retrieve_stat_count_map: count reports per outcome
+    - extract_pytest_stats: aggregate reports per row
+    - aggregate: aggregate reports incrementally with StatsAggregator
+    - make_md_report: render a report from the aggregated reports
+      for each color policy and Markdown flavor
+
+Usage:
+    python benchmarks/bench_report.py [--reports 1000 10000 100000 1000000]
+        [--reports-per-row 100] [--verbose 0|1] [--flavors common_mark gfm]
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Sequence
+from functools import partial
+from typing import Any, Callable, Optional
+
+from _common import OUTCOMES, FakeReporter, make_config, make_reporter
+from pytablewriter.writer.text import normalize_md_flavor
+
+from pytest_md_report import ColorPolicy, make_md_report, retrieve_stat_count_map
+from pytest_md_report._aggregator import StatsAggregator
+from pytest_md_report.plugin import _set_session_object, aggregator_key, extract_pytest_stats
+
+
+def measure(func: Callable[[], Any]) -> tuple[float, float]:
+    """
+    Returns:
+        Elapsed seconds and the peak memory usage in MiB.
+        The peak memory usage is measured by a separate run,
+        since tracing memory allocations slows down the execution.
+    """
+
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return (elapsed, peak / 1024**2)
+
+
+def aggregate(reporter: FakeReporter, verbosity_level: int) -> StatsAggregator:
+    aggregator = StatsAggregator(verbosity_level=verbosity_level)
+
+    for outcome in OUTCOMES:
+        for report in reporter.getreports(outcome):
+            aggregator.add(outcome, report)
+
+    return aggregator
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--reports", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--reports-per-row", type=int, default=100)
+    parser.add_argument("--verbose", type=int, choices=[0, 1], default=0)
+    parser.add_argument("--flavors", nargs="+", default=["common_mark", "gfm"])
+    options = parser.parse_args(argv)
+
+    verbosity_level = options.verbose
+    config = make_config(verbosity_level)
+
+    print(f"{'step':<40} {'reports':>9} {'rows':>7} {'seconds':>9} {'peak MiB':>9}")
+
+    def report(step: str, num_reports: int, num_rows: int, func: Callable[[], Any]) -> None:
+        elapsed, peak = measure(func)
+        print(f"{step:<40} {num_reports:>9} {num_rows:>7} {elapsed:>9.3f} {peak:>9.1f}")
+
+    for num_reports in options.reports:
+        reporter = make_reporter(num_reports, options.reports_per_row, verbosity_level)
+        num_rows = -(-num_reports // options.reports_per_row)
+        total_stats = retrieve_stat_count_map(reporter)  # type: ignore[arg-type]
+
+        # make_md_report reads the rows from the aggregator that pytest_configure stores
+        # during a test session, and falls back to extract_pytest_stats without it
+        _set_session_object(config, aggregator_key, aggregate(reporter, verbosity_level))
+
+        report(
+            "retrieve_stat_count_map",
+            num_reports,
+            num_rows,
+            partial(retrieve_stat_count_map, reporter),  # type: ignore[arg-type]
+        )
+        report(
+            "extract_pytest_stats",
+            num_reports,
+            num_rows,
+            partial(
+                extract_pytest_stats,
+                reporter,  # type: ignore[arg-type]
+                outcomes=OUTCOMES,
+                verbosity_level=verbosity_level,
+            ),
+        )
+        report("aggregate", num_reports, num_rows, partial(aggregate, reporter, verbosity_level))
+
+        for flavor in options.flavors:
+            md_flavor = normalize_md_flavor(flavor)
+            for color_policy in ColorPolicy:
+                report(
+                    f"make_md_report({color_policy.value}, {md_flavor.value})",
+                    num_reports,
+                    num_rows,
+                    partial(
+                        make_md_report,
+                        config,
+                        reporter,  # type: ignore[arg-type]
+                        total_stats,
+                        color_policy=color_policy,
+                        apply_ansi_escape=color_policy != ColorPolicy.NEVER,
+                        md_flavor=md_flavor,
+                    ),
+                )
+
+    config._ensure_unconfigure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measure the time of the style filters to style every cell and column separator of
+a report table, compared to creating a new style for each of them.
+
+The number of interned styles should stay constant as the number of rows grows.
+
+Usage:
+    python benchmarks/bench_style_filter.py [--rows 1000 2000 4000 8000]
+"""
+
+import argparse
+import time
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from _common import OUTCOMES
+from pytablewriter.style import Cell, Style
+
+from pytest_md_report import ColorPolicy
+from pytest_md_report._const import Default, FGColor, Header
+from pytest_md_report._style_filter import StylePlan, col_separator_style_filter, style_filter
+from pytest_md_report._table import ReportTable
+
+
+COLOR_MAP = {
+    FGColor.SUCCESS: Default.FGColor.SUCCESS,
+    FGColor.ERROR: Default.FGColor.ERROR,
+    FGColor.SKIP: Default.FGColor.SKIP,
+    FGColor.GRAYOUT: Default.FGColor.GRAYOUT,
+}
+
+
+def make_table(num_rows: int) -> ReportTable:
+    headers = [Header.FILEPATH, *OUTCOMES, Header.SUBTOTAL]
+    value_matrix: list[list[Any]] = []
+    for row in range(num_rows):
+        counts = [0] * len(OUTCOMES)
+        counts[row % len(OUTCOMES) if row % 10 == 0 else 0] = 1
+        value_matrix.append([f"tests/test_{row}.py", *counts, 1])
+    value_matrix.append(["TOTAL", *[0] * len(OUTCOMES), num_rows])
+
+    return ReportTable(headers=headers, num_key_columns=1, value_matrix=value_matrix)
+
+
+def iter_cells(table: ReportTable) -> list[Cell]:
+    default_style = Style()
+    cells = [
+        Cell(row=-1, col=col, value=header, default_style=default_style)
+        for col, header in enumerate(table.headers)
+    ]
+    for row, values in enumerate(table.value_matrix):
+        cells += [
+            Cell(row=row, col=col, value=value, default_style=default_style)
+            for col, value in enumerate(values)
+        ]
+
+    return cells
+
+
+def new_style_filter(cell: Cell, **kwargs: Any) -> Optional[Style]:
+    # styles cells as the style filter does, creating a new style for each cell
+    style_plan: StylePlan = kwargs["style_plan"]
+
+    if cell.is_header_row():
+        header_color = style_plan.retrieve_header_color(cell.col)
+        if header_color is None:
+            return None
+
+        return Style(color=header_color)
+
+    fg_color, bg_color = style_plan.retrieve_fg_bg_color(cell.row, cell.col, cell.value)
+
+    return Style(color=fg_color, bg_color=bg_color, align=style_plan.retrieve_align(cell.col))
+
+
+def new_col_separator_style_filter(
+    left_cell: Optional[Cell], right_cell: Optional[Cell], **kwargs: Any
+) -> Optional[Style]:
+    style = col_separator_style_filter(left_cell, right_cell, **kwargs)
+    if style is None:
+        return None
+
+    return Style(bg_color=style.bg_color)
+
+
+def bench(num_rows: int) -> tuple[float, float, int]:
+    table = make_table(num_rows)
+    cells = iter_cells(table)
+    num_seps = len(table.value_matrix)
+
+    elapsed = []
+    for cell_filter, separator_filter in (
+        (new_style_filter, new_col_separator_style_filter),
+        (style_filter, col_separator_style_filter),
+    ):
+        style_plan = StylePlan(table, ColorPolicy.AUTO, COLOR_MAP)
+        kwargs = {"style_plan": style_plan, "num_rows": num_seps}
+
+        start = time.perf_counter()
+        for cell in cells:
+            cell_filter(cell, **kwargs)
+        for cell in cells:
+            if cell.col > 0:
+                separator_filter(cell, None, **kwargs)
+        elapsed.append(time.perf_counter() - start)
+
+    return (elapsed[0], elapsed[1], style_plan.num_styles)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 2000, 4000, 8000])
+    options = parser.parse_args(argv)
+
+    print(f"{'rows':>8} {'new [s]':>10} {'interned [s]':>13} {'speedup':>8} {'styles':>7}")
+    for num_rows in options.rows:
+        new_elapsed, interned_elapsed, num_styles = bench(num_rows)
+        print(
+            f"{num_rows:>8} {new_elapsed:>10.3f} {interned_elapsed:>13.3f} "
+            f"{new_elapsed / interned_elapsed:>8.2f} {num_styles:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
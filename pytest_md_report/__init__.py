@@ -1,13 +1,15 @@
 from .__version__ import __author__, __copyright__, __email__, __license__, __version__
-from ._const import ColorPolicy, ZerosRender
-from .plugin import make_md_report, retrieve_stat_count_map
+from ._const import ColorPolicy, WriteMode, ZerosRender
+from .plugin import make_md_report, retrieve_stat_count_map, write_md_report
 
 
 __all__ = (
     "ColorPolicy",
+    "WriteMode",
     "ZerosRender",
     "make_md_report",
     "retrieve_stat_count_map",
+    "write_md_report",
     "__author__",
     "__copyright__",
     "__email__",
@@ -0,0 +1,449 @@
+import os
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Final, NamedTuple, Optional
+
+from ._const import ERROR_OUTCOMES, OUTCOMES, ParamExpand
+from ._histogram import NUM_BUCKETS, add_histograms, to_histogram
+
+
+OUTCOME_INDEXES: Final = {outcome: i for i, outcome in enumerate(OUTCOMES)}
+NUM_OUTCOMES: Final = len(OUTCOMES)
+
+
+class DurationStats(NamedTuple):
+    """
+    Durations of tests, where the duration of a test is the sum of
+    the setup, call, and teardown durations.
+    ``histogram`` is the counts of tests in each bucket of :py:data:`HISTOGRAM_BOUNDS`,
+    or empty if the histogram is not aggregated.
+    """
+
+    total_seconds: float
+    max_seconds: float
+    num_tests: int
+    histogram: tuple[int, ...] = ()
+
+    @classmethod
+    def from_list(cls, values: Sequence[Any]) -> "DurationStats":
+        """
+        Create from a list that converted from a :py:class:`DurationStats`.
+        """
+
+        total_seconds, max_seconds, num_tests, *histogram = values
+
+        return cls(total_seconds, max_seconds, num_tests, tuple(histogram[0]) if histogram else ())
+
+    @property
+    def mean_seconds(self) -> float:
+        if self.num_tests == 0:
+            return 0.0
+
+        return self.total_seconds / self.num_tests
+
+    def combine(self, other: "DurationStats") -> "DurationStats":
+        return DurationStats(
+            total_seconds=self.total_seconds + other.total_seconds,
+            max_seconds=max(self.max_seconds, other.max_seconds),
+            num_tests=self.num_tests + other.num_tests,
+            histogram=add_histograms(self.histogram, other.histogram),
+        )
+
+
+class InternTable:
+    """
+    A table that assigns a sequential id to each distinct string.
+    """
+
+    def __init__(self) -> None:
+        self.__ids: Final[dict[str, int]] = {}
+        self.__values: Final[list[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def intern(self, value: str) -> int:
+        value_id = self.__ids.get(value)
+        if value_id is None:
+            value_id = len(self.__values)
+            self.__ids[value] = value_id
+            self.__values.append(value)
+
+        return value_id
+
+    def lookup(self, value_id: int) -> str:
+        return self.__values[value_id]
+
+
+class StatsAggregator:
+    """
+    Aggregate test outcome counts per file/function incrementally as reports arrive.
+    Path normalization and function name extraction are executed once per distinct
+    location, so the cost of producing a report scales with the number of rows.
+
+    File paths are normalized once per distinct path and interned. Rows are indexed by
+    the function names per file, and each row is a fixed-size slice of a flat integer array
+    that holds the counts of every outcome, so the memory usage per row does not depend on
+    the number of tests, and a function name is held once per row. When ``is_histogram`` is |True|,
+    each row also has a fixed-size slice that holds the counts of the duration histogram.
+
+    At verbosity level 2, tests of parameter sets that match ``expand_params`` have rows of
+    their own, keyed by the function names with the parameter ids. The other tests are
+    aggregated into the rows of the functions. Whether a test is expanded is decided once
+    per node id, at the first phase of the test that has an outcome, so that every phase of
+    the test is aggregated into the same row. Decisions are kept only until the teardown of
+    the tests.
+
+    Rows are extracted in the same order as the terminal reporter groups the reports:
+    by the outcome that first reported among the outcomes of each row, in the order that
+    outcomes first appeared during the session, then by the first report of the row
+    with the outcome.
+    """
+
+    @property
+    def verbosity_level(self) -> int:
+        return self.__verbosity_level
+
+    @property
+    def total_stats(self) -> Mapping[str, int]:
+        return {outcome: self.__total_stats[i] for i, outcome in enumerate(OUTCOMES)}
+
+    @property
+    def total_durations(self) -> DurationStats:
+        return self.__total_durations
+
+    def __init__(
+        self,
+        verbosity_level: int,
+        expand_params: str = ParamExpand.ALL,
+        duration_threshold: Optional[float] = None,
+        is_histogram: bool = False,
+    ) -> None:
+        self.__verbosity_level: Final = verbosity_level
+        self.__is_histogram: Final = is_histogram
+        self.__expand_params: Final = expand_params
+        self.__duration_threshold: Final = duration_threshold
+        self.__total_stats: Final = array("q", [0] * NUM_OUTCOMES)
+        self.__paths: Final = InternTable()
+        # ids of the normalized paths of the paths of reports
+        self.__path_ids: Final[dict[str, int]] = {}
+
+        # rows per path id, keyed by function names: None at verbosity level 0.
+        # keys of rows are the path ids and the function names of the rows
+        self.__row_indexes: Final[list[dict[Optional[str], int]]] = []
+        self.__row_path_ids: Final = array("q")
+        self.__row_testfuncs: Final[list[Optional[str]]] = []
+        self.__counts: Final = array("q")
+
+        # sequence numbers of the first reports of each row per outcome: -1 if none,
+        # and the ranks of outcomes in the order of the first appearance
+        self.__first_seqs: Final = array("q")
+        self.__outcome_seqs: Final = array("q", [0] * NUM_OUTCOMES)
+        self.__outcome_ranks: Final[dict[int, int]] = {}
+        self.__duration_sums: Final = array("d")
+        self.__duration_maxs: Final = array("d")
+        self.__duration_counts: Final = array("q")
+        self.__histograms: Final = array("q")
+        self.__total_durations = DurationStats(
+            total_seconds=0.0,
+            max_seconds=0.0,
+            num_tests=0,
+            histogram=(0,) * NUM_BUCKETS if is_histogram else (),
+        )
+
+        # durations of the tests that are running: removed at the teardown of each test
+        self.__running_durations: Final[dict[str, float]] = {}
+
+        # whether the running tests are expanded into the rows of parameter sets, and
+        # the node id of the last expanded test that finished: the duration of a test
+        # is added after the teardown report is added
+        self.__expand_decisions: Final[dict[str, bool]] = {}
+        self.__finished_expanded_nodeid: Optional[str] = None
+
+    def add(self, outcome: str, report: Any) -> None:
+        outcome_idx = OUTCOME_INDEXES.get(outcome)
+        if outcome_idx is not None:
+            self.__total_stats[outcome_idx] += 1
+            seq = self.__next_seq(outcome_idx, 1)
+
+            row = self.__to_row(report, self.__is_expanded(outcome, report))
+            if row is not None:
+                self.__add_count(row, outcome_idx, 1, seq)
+
+        if getattr(report, "when", None) not in ("setup", "call"):
+            # the teardown is the last report of a test, and collectors have only
+            # a collection report
+            self.__finish_expanded(getattr(report, "nodeid", None))
+
+    def add_duration(self, report: Any) -> None:
+        """
+        Add the duration of a setup/call/teardown phase of a test.
+        The duration of the test is added to the row of the test at the teardown,
+        after the report of the phase is added by :py:meth:`add`.
+        """
+
+        nodeid = report.nodeid
+        duration = self.__running_durations.pop(nodeid, 0.0) + report.duration
+        if report.when != "teardown":
+            self.__running_durations[nodeid] = duration
+            return
+
+        is_expanded = (
+            self.__is_expand_all()
+            or self.__expand_decisions.get(nodeid, False)
+            or nodeid == self.__finished_expanded_nodeid
+        )
+        self.__add_test_duration(
+            self.__to_row(report, is_expanded),
+            DurationStats(
+                duration, duration, 1, to_histogram(duration) if self.__is_histogram else ()
+            ),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the aggregate to a compact form that consists of only builtin types,
+        which can be sent through the pytest-xdist workeroutput channel.
+        """
+
+        return {
+            "verbosity_level": self.__verbosity_level,
+            "total_stats": {
+                outcome: count for outcome, count in self.total_stats.items() if count > 0
+            },
+            "results": [
+                [list(self.__lookup_key(row)), self.__row_results(row)]
+                for row in range(len(self.__row_testfuncs))
+            ],
+            "total_durations": list(self.__total_durations),
+            "durations": [
+                [list(self.__lookup_key(row)), list(self.__row_durations(row))]
+                for row in range(len(self.__row_testfuncs))
+                if self.__duration_counts[row]
+            ],
+        }
+
+    def merge(self, data: Mapping[str, Any]) -> None:
+        """
+        Merge an aggregate that converted by :py:meth:`to_dict` into this aggregate.
+        """
+
+        self.merge_totals(
+            data["total_stats"],
+            DurationStats.from_list(data.get("total_durations", (0.0, 0.0, 0))),
+        )
+        for key, results in data["results"]:
+            self.merge_row(key, results)
+        for key, durations in data.get("durations", []):
+            self.merge_row(key, {}, DurationStats.from_list(durations))
+
+    def merge_totals(
+        self, total_stats: Mapping[str, int], total_durations: Optional[DurationStats] = None
+    ) -> None:
+        """
+        Merge the total counts of outcomes and the total durations of another aggregate.
+        """
+
+        for outcome, count in total_stats.items():
+            self.__total_stats[OUTCOME_INDEXES[outcome]] += count
+
+        if total_durations is not None:
+            self.__add_test_duration(None, total_durations)
+
+    def merge_row(
+        self,
+        key: Sequence[str],
+        results: Mapping[str, int],
+        durations: Optional[DurationStats] = None,
+    ) -> None:
+        """
+        Merge the counts of outcomes and the durations of a row of another aggregate.
+        The totals are not changed: merged by :py:meth:`merge_totals`.
+        """
+
+        row = self.__get_row(self.__intern_path(key[0]), key[1] if len(key) > 1 else None)
+        for outcome, count in results.items():
+            outcome_idx = OUTCOME_INDEXES[outcome]
+            self.__add_count(row, outcome_idx, count, self.__next_seq(outcome_idx, count))
+
+        if durations is not None:
+            self.__add_test_duration(row, durations, is_add_total=False)
+
+    def extract_results(self, outcomes: Sequence[str]) -> Mapping[tuple, Mapping[str, int]]:
+        outcome_indexes = [(outcome, OUTCOME_INDEXES[outcome]) for outcome in outcomes]
+        counts = self.__counts
+        first_seqs = self.__first_seqs
+        outcome_ranks = self.__outcome_ranks
+        ordered_rows: list[tuple[tuple[int, int], int, dict[str, int]]] = []
+
+        for row in range(len(self.__row_testfuncs)):
+            offset = row * NUM_OUTCOMES
+            filtered_results = {
+                outcome: counts[offset + i] for outcome, i in outcome_indexes if counts[offset + i]
+            }
+            if not filtered_results:
+                continue
+
+            order = min(
+                (outcome_ranks[i], first_seqs[offset + i])
+                for _outcome, i in outcome_indexes
+                if counts[offset + i]
+            )
+            ordered_rows.append((order, row, filtered_results))
+
+        ordered_rows.sort(key=lambda item: item[0])
+
+        return {self.__lookup_key(row): results for _order, row, results in ordered_rows}
+
+    def extract_durations(self) -> Mapping[tuple, DurationStats]:
+        return {
+            self.__lookup_key(row): self.__row_durations(row)
+            for row in range(len(self.__row_testfuncs))
+        }
+
+    def __add_test_duration(
+        self, row: Optional[int], durations: DurationStats, is_add_total: bool = True
+    ) -> None:
+        if durations.num_tests == 0:
+            return
+
+        if is_add_total:
+            self.__total_durations = self.__total_durations.combine(durations)
+
+        if row is None:
+            return
+
+        self.__duration_sums[row] += durations.total_seconds
+        self.__duration_counts[row] += durations.num_tests
+        if durations.max_seconds > self.__duration_maxs[row]:
+            self.__duration_maxs[row] = durations.max_seconds
+        if self.__is_histogram:
+            offset = row * NUM_BUCKETS
+            for i, count in enumerate(durations.histogram):
+                self.__histograms[offset + i] += count
+
+    def __row_durations(self, row: int) -> DurationStats:
+        histogram: tuple[int, ...] = ()
+        if self.__is_histogram:
+            offset = row * NUM_BUCKETS
+            histogram = tuple(self.__histograms[offset : offset + NUM_BUCKETS])
+
+        return DurationStats(
+            total_seconds=self.__duration_sums[row],
+            max_seconds=self.__duration_maxs[row],
+            num_tests=self.__duration_counts[row],
+            histogram=histogram,
+        )
+
+    def __next_seq(self, outcome_idx: int, count: int) -> int:
+        if outcome_idx not in self.__outcome_ranks:
+            self.__outcome_ranks[outcome_idx] = len(self.__outcome_ranks)
+
+        seq = self.__outcome_seqs[outcome_idx]
+        self.__outcome_seqs[outcome_idx] += count
+
+        return seq
+
+    def __add_count(self, row: int, outcome_idx: int, count: int, seq: int) -> None:
+        pos = row * NUM_OUTCOMES + outcome_idx
+        self.__counts[pos] += count
+        if self.__first_seqs[pos] < 0:
+            self.__first_seqs[pos] = seq
+
+    def __row_results(self, row: int) -> dict[str, int]:
+        offset = row * NUM_OUTCOMES
+
+        return {
+            outcome: self.__counts[offset + i]
+            for i, outcome in enumerate(OUTCOMES)
+            if self.__counts[offset + i]
+        }
+
+    def __get_row(self, path_id: int, testfunc: Optional[str]) -> int:
+        while path_id >= len(self.__row_indexes):
+            self.__row_indexes.append({})
+
+        row_indexes = self.__row_indexes[path_id]
+        row = row_indexes.get(testfunc)
+        if row is None:
+            row = len(self.__row_testfuncs)
+            row_indexes[testfunc] = row
+            self.__row_path_ids.append(path_id)
+            self.__row_testfuncs.append(testfunc)
+            self.__counts.extend([0] * NUM_OUTCOMES)
+            self.__first_seqs.extend([-1] * NUM_OUTCOMES)
+            self.__duration_sums.append(0.0)
+            self.__duration_maxs.append(0.0)
+            self.__duration_counts.append(0)
+            if self.__is_histogram:
+                self.__histograms.extend([0] * NUM_BUCKETS)
+
+        return row
+
+    def __intern_path(self, filesystempath: str) -> int:
+        path_id = self.__path_ids.get(filesystempath)
+        if path_id is None:
+            path_id = self.__paths.intern(os.path.normpath(filesystempath).replace("\\", "/"))
+            self.__path_ids[filesystempath] = path_id
+
+        return path_id
+
+    def __lookup_key(self, row: int) -> tuple[str, ...]:
+        filesystempath = self.__paths.lookup(self.__row_path_ids[row])
+        testfunc = self.__row_testfuncs[row]
+        if testfunc is None:
+            return (filesystempath,)
+
+        return (filesystempath, testfunc)
+
+    def __finish_expanded(self, nodeid: Optional[str]) -> None:
+        if nodeid is None or not self.__expand_decisions.pop(nodeid, False):
+            return
+
+        self.__finished_expanded_nodeid = nodeid
+
+    def __is_expand_all(self) -> bool:
+        return self.__verbosity_level < 2 or self.__expand_params == ParamExpand.ALL
+
+    def __is_expanded(self, outcome: Optional[str], report: Any) -> bool:
+        if self.__is_expand_all():
+            return True
+
+        nodeid = getattr(report, "nodeid", None)
+        if nodeid is not None:
+            decision = self.__expand_decisions.get(nodeid)
+            if decision is not None:
+                return decision
+
+        is_expanded = outcome in ERROR_OUTCOMES
+        if not is_expanded and self.__expand_params == ParamExpand.FAILED_OR_SLOW:
+            threshold = self.__duration_threshold
+            is_expanded = threshold is not None and getattr(report, "duration", 0.0) > threshold
+
+        if nodeid is not None:
+            # the rest of the phases and the duration of the test are added to the same row:
+            # removed at the teardown
+            self.__expand_decisions[nodeid] = is_expanded
+
+        return is_expanded
+
+    def __to_row(self, report: Any, is_expanded: bool) -> Optional[int]:
+        try:
+            location = report.location
+        except AttributeError:
+            return None
+
+        if location is None:
+            return None
+
+        filesystempath, _lineno, domaininfo = location
+        if self.__verbosity_level < 0:
+            return None
+        if self.__verbosity_level == 0:
+            testfunc = None
+        elif self.__verbosity_level >= 2 and is_expanded:
+            testfunc = str(domaininfo)
+        else:
+            testfunc = str(domaininfo).split("[")[0]
+
+        return self.__get_row(self.__intern_path(filesystempath), testfunc)
@@ -0,0 +1,123 @@
+from collections.abc import Mapping
+from typing import Any, Final, NamedTuple, Optional
+
+from ._aggregator import DurationStats
+from ._const import ERROR_OUTCOMES
+
+
+BASELINE_VERSION: Final = 1
+
+
+class BaselineRow(NamedTuple):
+    num_failures: int
+    total_seconds: Optional[float]
+
+
+class BaselineDelta(NamedTuple):
+    """
+    Changes of a row from the baseline.
+    ``duration_change`` is |None| if either of the runs does not have durations.
+    """
+
+    new_failures: int
+    fixed: int
+    duration_change: Optional[float]
+
+    def __add__(self, other: Any) -> "BaselineDelta":
+        if not isinstance(other, BaselineDelta):
+            return NotImplemented
+
+        if self.duration_change is None:
+            duration_change = other.duration_change
+        elif other.duration_change is None:
+            duration_change = self.duration_change
+        else:
+            duration_change = self.duration_change + other.duration_change
+
+        return BaselineDelta(
+            new_failures=self.new_failures + other.new_failures,
+            fixed=self.fixed + other.fixed,
+            duration_change=duration_change,
+        )
+
+
+ZERO_DELTA: Final = BaselineDelta(new_failures=0, fixed=0, duration_change=None)
+
+
+def count_failures(results: Mapping[str, int]) -> int:
+    return sum(results.get(outcome, 0) for outcome in ERROR_OUTCOMES)
+
+
+class Baseline:
+    """
+    Failure counts and durations of the rows of a previous report, keyed by the keys of
+    the rows. Changes of a row are computed with a single lookup.
+
+    Rows of the current run are kept apart from the previous rows, and replace the previous
+    rows that have the same keys when converted by :py:meth:`to_cache_value`, so that
+    a partial run (e.g. ``--lf``) keeps the rows of the other tests.
+    """
+
+    def __init__(self, rows: Optional[Mapping[tuple, BaselineRow]] = None) -> None:
+        self.__rows: Final[dict[tuple, BaselineRow]] = dict(rows or {})
+        self.__updates: Final[dict[tuple, BaselineRow]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    @classmethod
+    def from_cache_value(cls, value: Any) -> "Baseline":
+        """
+        Create a baseline from a value that is converted by :py:meth:`to_cache_value`.
+        Values of unknown versions are ignored.
+        """
+
+        if not isinstance(value, dict) or value.get("version") != BASELINE_VERSION:
+            return cls()
+
+        return cls(
+            {
+                tuple(key): BaselineRow(num_failures, total_seconds)
+                for key, num_failures, total_seconds in value["rows"]
+            }
+        )
+
+    def to_cache_value(self) -> dict[str, Any]:
+        """
+        Convert the baseline to a compact form that consists of only builtin types,
+        which can be stored in the pytest cache.
+        """
+
+        rows = dict(self.__rows)
+        rows.update(self.__updates)
+
+        return {
+            "version": BASELINE_VERSION,
+            "rows": [[list(key), row.num_failures, row.total_seconds] for key, row in rows.items()],
+        }
+
+    def diff(
+        self, key: tuple, results: Mapping[str, int], durations: Optional[DurationStats]
+    ) -> BaselineDelta:
+        num_failures = count_failures(results)
+        prev = self.__rows.get(key)
+        if prev is None:
+            return BaselineDelta(new_failures=num_failures, fixed=0, duration_change=None)
+
+        duration_change = None
+        if durations is not None and prev.total_seconds is not None:
+            duration_change = durations.total_seconds - prev.total_seconds
+
+        return BaselineDelta(
+            new_failures=max(num_failures - prev.num_failures, 0),
+            fixed=max(prev.num_failures - num_failures, 0),
+            duration_change=duration_change,
+        )
+
+    def update(
+        self, key: tuple, results: Mapping[str, int], durations: Optional[DurationStats]
+    ) -> None:
+        self.__updates[key] = BaselineRow(
+            num_failures=count_failures(results),
+            total_seconds=durations.total_seconds if durations is not None else None,
+        )
@@ -0,0 +1,288 @@
+from collections.abc import Mapping, Sequence
+from typing import Final, NamedTuple, Optional
+
+from ._aggregator import DurationStats
+from ._baseline import ZERO_DELTA, BaselineDelta
+from ._const import ERROR_OUTCOMES, SKIP_OUTCOMES
+from ._histogram import to_histogram_values
+from ._table import MIN_COLUMN_WIDTH, calc_display_width, format_duration, format_duration_change
+
+
+# priorities of rows to be kept within a budget: smaller is kept first
+_ERROR_PRIORITY: Final = 0
+_SKIP_PRIORITY: Final = 1
+_SUCCESS_PRIORITY: Final = 2
+
+
+class RowUnit(NamedTuple):
+    """
+    Names of the entity of a row, used for the label of the row that collapses omitted rows.
+    """
+
+    singular: str
+    plural: str
+
+
+class FittedRows(NamedTuple):
+    results_per_testfunc: Mapping[tuple, Mapping[str, int]]
+    durations_per_testfunc: Optional[Mapping[tuple, DurationStats]]
+    deltas_per_testfunc: Optional[Mapping[tuple, BaselineDelta]]
+    num_omitted_rows: int
+    is_within_budget: bool = True
+
+
+def _calc_item_extra_bytes(text: str) -> int:
+    # bytes of a padded cell in addition to the display width of the column:
+    # multibyte characters and escaped pipes
+    return len(text.encode("utf-8")) - calc_display_width(text) + text.count("|")
+
+
+class RowBudgetPlanner:
+    """
+    Select the rows of a report to fit the report within a number of rows and/or
+    a number of bytes of a Markdown table without styles.
+
+    Rows that have failed/error results are kept first, then rows that have
+    skipped/xfailed/xpassed results, then the other rows, each in the original order.
+    Omitted rows are collapsed into a single row that sums the results of them, labeled as
+    ``N other <unit> passed`` if all of the omitted rows passed, ``N other <unit>`` otherwise.
+    The collapsed row counts toward ``max_rows``, the TOTAL row does not.
+    When ``is_nested_rows`` is |True|, the keys are paths of directories in pre-order whose
+    rows are subtotals of the subdirectories: an omitted row under another omitted row is
+    not summed into the collapsed row again.
+    When the header, the collapsed row, and the TOTAL row exceed ``max_bytes``, every row is
+    collapsed and the result is marked as not within the budget.
+
+    The size of the table is computed from the texts of the cells without rendering
+    the table: column widths are computed over all of the rows, which are upper bounds of
+    the widths of a table that consists of a part of the rows.
+    """
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        outcomes: Sequence[str],
+        num_key_columns: int,
+        margin: int,
+        is_kramdown: bool,
+        unit: RowUnit,
+        histogram_style: Optional[str] = None,
+        is_nested_rows: bool = False,
+    ) -> None:
+        self.__headers: Final = list(headers)
+        self.__outcomes: Final = list(outcomes)
+        self.__num_key_columns: Final = num_key_columns
+        self.__margin: Final = margin
+        self.__is_kramdown: Final = is_kramdown
+        self.__unit: Final = unit
+        self.__histogram_style: Final = histogram_style
+        self.__is_nested_rows: Final = is_nested_rows
+
+    def fit(
+        self,
+        results_per_testfunc: Mapping[tuple, Mapping[str, int]],
+        durations_per_testfunc: Optional[Mapping[tuple, DurationStats]],
+        total_stats: Mapping[str, int],
+        total_durations: Optional[DurationStats],
+        max_rows: Optional[int],
+        max_bytes: Optional[int],
+        deltas_per_testfunc: Optional[Mapping[tuple, BaselineDelta]] = None,
+        total_delta: Optional[BaselineDelta] = None,
+    ) -> FittedRows:
+        keys = list(results_per_testfunc)
+        row_texts = [
+            self.__to_texts(
+                key,
+                results_per_testfunc[key],
+                durations_per_testfunc[key] if durations_per_testfunc is not None else None,
+                deltas_per_testfunc[key] if deltas_per_testfunc is not None else None,
+            )
+            for key in keys
+        ]
+        total_texts = self.__to_texts(
+            ("TOTAL",) + ("",) * (self.__num_key_columns - 1),
+            total_stats,
+            total_durations,
+            total_delta,
+        )
+        # the label of the collapsed row is the longest when all of the rows are omitted,
+        # and the counts of the collapsed row are at most the counts of the TOTAL row
+        collapsed_texts = [self.__to_label(len(keys), is_all_passed=True)] + total_texts[1:]
+        if deltas_per_testfunc is not None and durations_per_testfunc is not None:
+            # changes of durations can be negative: the TOTAL row does not bound
+            # the change of the collapsed row, the sum of the absolute values does
+            collapsed_texts[-1] = "+" + format_duration(
+                sum(abs(delta.duration_change or 0.0) for delta in deltas_per_testfunc.values())
+            )
+
+        widths = [max(calc_display_width(header), MIN_COLUMN_WIDTH) for header in self.__headers]
+        for texts in row_texts + [total_texts, collapsed_texts]:
+            for col, text in enumerate(texts):
+                widths[col] = max(widths[col], calc_display_width(text))
+
+        line_bytes = sum(widths) + (2 * self.__margin + 1) * len(widths) + 2
+        row_bytes = [
+            line_bytes + sum(_calc_item_extra_bytes(text) for text in texts) for texts in row_texts
+        ]
+        fixed_bytes = (
+            line_bytes  # header
+            + sum(_calc_item_extra_bytes(header) for header in self.__headers)
+            + line_bytes  # separator
+            + (1 if self.__is_kramdown else 0)
+            + line_bytes
+            + sum(_calc_item_extra_bytes(text) for text in total_texts)
+        )
+        collapsed_bytes = line_bytes + sum(_calc_item_extra_bytes(text) for text in collapsed_texts)
+
+        if self.__is_within(len(keys), fixed_bytes + sum(row_bytes), max_rows, max_bytes):
+            return FittedRows(
+                results_per_testfunc,
+                durations_per_testfunc,
+                deltas_per_testfunc,
+                num_omitted_rows=0,
+            )
+
+        priorities = [self.__calc_priority(results_per_testfunc[key]) for key in keys]
+        selected: set[int] = set()
+        num_bytes = fixed_bytes + collapsed_bytes
+        is_within_budget = self.__is_within(1, num_bytes, max_rows, max_bytes)
+        for row in sorted(range(len(keys)), key=lambda row: priorities[row]):
+            if not self.__is_within(
+                len(selected) + 2, num_bytes + row_bytes[row], max_rows, max_bytes
+            ):
+                break
+
+            selected.add(row)
+            num_bytes += row_bytes[row]
+
+        return self.__collapse(
+            keys,
+            selected,
+            priorities,
+            results_per_testfunc,
+            durations_per_testfunc,
+            deltas_per_testfunc,
+            is_within_budget,
+        )
+
+    def __collapse(
+        self,
+        keys: Sequence[tuple],
+        selected: set[int],
+        priorities: Sequence[int],
+        results_per_testfunc: Mapping[tuple, Mapping[str, int]],
+        durations_per_testfunc: Optional[Mapping[tuple, DurationStats]],
+        deltas_per_testfunc: Optional[Mapping[tuple, BaselineDelta]],
+        is_within_budget: bool,
+    ) -> FittedRows:
+        fitted_results: dict[tuple, Mapping[str, int]] = {}
+        fitted_durations: Optional[dict[tuple, DurationStats]] = (
+            {} if durations_per_testfunc is not None else None
+        )
+        collapsed_results: dict[str, int] = {}
+        collapsed_durations = DurationStats(total_seconds=0.0, max_seconds=0.0, num_tests=0)
+        fitted_deltas: Optional[dict[tuple, BaselineDelta]] = (
+            {} if deltas_per_testfunc is not None else None
+        )
+        collapsed_delta = ZERO_DELTA
+        num_omitted_rows = 0
+        is_all_passed = True
+        # the last omitted directory that is summed: rows in pre-order
+        collapsed_dirpath: Optional[str] = None
+
+        for row, key in enumerate(keys):
+            if row in selected:
+                fitted_results[key] = results_per_testfunc[key]
+                if fitted_durations is not None and durations_per_testfunc is not None:
+                    fitted_durations[key] = durations_per_testfunc[key]
+                if fitted_deltas is not None and deltas_per_testfunc is not None:
+                    fitted_deltas[key] = deltas_per_testfunc[key]
+                continue
+
+            num_omitted_rows += 1
+            is_all_passed = is_all_passed and priorities[row] == _SUCCESS_PRIORITY
+            if self.__is_nested_rows:
+                if collapsed_dirpath is not None and key[0].startswith(collapsed_dirpath):
+                    continue
+                collapsed_dirpath = key[0]
+            for outcome, count in results_per_testfunc[key].items():
+                collapsed_results[outcome] = collapsed_results.get(outcome, 0) + count
+            if durations_per_testfunc is not None:
+                durations = durations_per_testfunc[key]
+                collapsed_durations = collapsed_durations.combine(durations)
+            if deltas_per_testfunc is not None:
+                collapsed_delta += deltas_per_testfunc[key]
+
+        collapsed_key = (self.__to_label(num_omitted_rows, is_all_passed),) + ("",) * (
+            self.__num_key_columns - 1
+        )
+        fitted_results[collapsed_key] = collapsed_results
+        if fitted_durations is not None:
+            fitted_durations[collapsed_key] = collapsed_durations
+        if fitted_deltas is not None:
+            fitted_deltas[collapsed_key] = collapsed_delta
+
+        return FittedRows(
+            fitted_results,
+            fitted_durations,
+            fitted_deltas,
+            num_omitted_rows=num_omitted_rows,
+            is_within_budget=is_within_budget,
+        )
+
+    def __to_texts(
+        self,
+        key: Sequence[str],
+        results: Mapping[str, int],
+        durations: Optional[DurationStats],
+        delta: Optional[BaselineDelta],
+    ) -> list[str]:
+        # zero values are counted as "0", which is not shorter than an empty cell
+        texts = [str(value) for value in key]
+        texts += [str(results.get(outcome, 0)) for outcome in self.__outcomes]
+        texts.append(str(sum(results.values())))
+        if durations is not None:
+            texts += [
+                format_duration(durations.total_seconds),
+                format_duration(durations.max_seconds),
+                format_duration(durations.mean_seconds),
+            ]
+            if self.__histogram_style is not None:
+                texts += [
+                    str(value)
+                    for value in to_histogram_values(durations.histogram, self.__histogram_style)
+                ]
+        if delta is not None:
+            texts += [str(delta.new_failures), str(delta.fixed)]
+            if durations is not None:
+                texts.append(format_duration_change(delta.duration_change))
+
+        return texts
+
+    def __to_label(self, num_rows: int, is_all_passed: bool) -> str:
+        unit = self.__unit.singular if num_rows == 1 else self.__unit.plural
+        label = f"{num_rows} other {unit}"
+        if is_all_passed:
+            return f"{label} passed"
+
+        return label
+
+    @staticmethod
+    def __calc_priority(results: Mapping[str, int]) -> int:
+        if any(results.get(outcome, 0) for outcome in ERROR_OUTCOMES):
+            return _ERROR_PRIORITY
+        if any(results.get(outcome, 0) for outcome in SKIP_OUTCOMES):
+            return _SKIP_PRIORITY
+
+        return _SUCCESS_PRIORITY
+
+    @staticmethod
+    def __is_within(
+        num_rows: int, num_bytes: int, max_rows: Optional[int], max_bytes: Optional[int]
+    ) -> bool:
+        if max_rows is not None and num_rows > max_rows:
+            return False
+        if max_bytes is not None and num_bytes > max_bytes:
+            return False
+
+        return True
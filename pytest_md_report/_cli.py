@@ -0,0 +1,184 @@
+import argparse
+import sys
+from collections.abc import Sequence
+from typing import Final, Optional, TextIO
+
+from ._const import MARKDOWN_FLAVORS, OUTCOMES, Default, JsonFormat, WriteMode, ZerosRender
+from ._file_writer import open_report_file
+from ._merge import ShardMerger
+
+
+PROG: Final = "pytest-md-report"
+
+
+def write_merged_report(
+    stream: TextIO,
+    merger: ShardMerger,
+    md_flavor: str,
+    margin: int,
+    zeros: str,
+    exclude_outcomes: Sequence[str],
+) -> None:
+    """
+    Write a report of the merged aggregate without styles.
+    Columns of durations are added if every shard has durations.
+    """
+
+    from pytablewriter.writer.text import normalize_md_flavor
+
+    from ._stream_writer import MarkdownStreamWriter
+    from ._table import ReportTable
+    from .plugin import _iter_report_rows, _to_headers, _to_key_headers
+
+    aggregator = merger.aggregator
+    if aggregator is None:
+        return
+
+    total_stats = aggregator.total_stats
+    outcomes = [
+        outcome
+        for outcome in OUTCOMES
+        if outcome not in exclude_outcomes and total_stats.get(outcome, 0) > 0
+    ]
+    if not outcomes:
+        return
+
+    # shards that are run in quiet mode do not have rows: only the TOTAL row is written
+    verbosity_level = max(aggregator.verbosity_level, 0)
+    key_headers = _to_key_headers(verbosity_level)
+    durations_per_testfunc = aggregator.extract_durations() if merger.is_durations else None
+    table = ReportTable(
+        headers=_to_headers(key_headers, outcomes, is_durations=merger.is_durations),
+        num_key_columns=len(key_headers),
+        value_matrix=lambda: _iter_report_rows(
+            aggregator.extract_results(outcomes),
+            outcomes,
+            total_stats,
+            verbosity_level,
+            durations_per_testfunc=durations_per_testfunc,
+            total_durations=aggregator.total_durations if merger.is_durations else None,
+        ),
+    )
+
+    render_zeros = zeros != ZerosRender.EMPTY
+    MarkdownStreamWriter(
+        headers=table.headers,
+        number_columns=table.number_columns,
+        flavor=normalize_md_flavor(md_flavor),
+        margin=margin,
+        render_zeros=render_zeros,
+    ).write_table(
+        stream,
+        table.iter_rows,
+        column_layout=table.retrieve_column_layout(render_zeros),
+    )
+
+
+def _make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=PROG)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    merge_parser = subparsers.add_parser(
+        "merge",
+        help="merge aggregate files of shards into a single report.",
+        description=(
+            "Merge aggregate files that are written by --md-report-json-output of each shard "
+            "into a single Markdown report. Files are read a record at a time: "
+            "the memory usage depends on the number of distinct rows."
+        ),
+    )
+    merge_parser.add_argument(
+        "files", metavar="FILE", nargs="+", help="aggregate files in JSON or JSON Lines format."
+    )
+    merge_parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILEPATH",
+        help="path to a file to output the merged report. Defaults to the standard output.",
+    )
+    merge_parser.add_argument(
+        "--write-mode",
+        choices=WriteMode.LIST,
+        default=Default.WRITE_MODE,
+        help="how to write the report to the output file. Defaults to '%(default)s'.",
+    )
+    merge_parser.add_argument(
+        "--flavor",
+        choices=MARKDOWN_FLAVORS,
+        default=Default.MARKDOWN_FLAVOR,
+        help="Markdown flavor of the report. Defaults to '%(default)s'.",
+    )
+    merge_parser.add_argument(
+        "--margin",
+        type=int,
+        default=Default.MARGIN,
+        help="margin size for each cell. Defaults to %(default)s.",
+    )
+    merge_parser.add_argument(
+        "--zeros",
+        choices=ZerosRender.LIST,
+        default=Default.ZEROS,
+        help="rendering method for results of zero values. Defaults to '%(default)s'.",
+    )
+    merge_parser.add_argument(
+        "--exclude-outcomes",
+        metavar="OUTCOME",
+        nargs="+",
+        choices=OUTCOMES,
+        default=[],
+        help="test result outcomes to exclude from the report.",
+    )
+    merge_parser.add_argument(
+        "--json-output",
+        metavar="FILEPATH",
+        help=(
+            "path to a file to output the merged aggregate, which can be merged again "
+            "(e.g. to merge shards in stages)."
+        ),
+    )
+    merge_parser.add_argument(
+        "--json-format",
+        choices=JsonFormat.LIST,
+        default=Default.JSON_FORMAT,
+        help="format of the JSON output file. Defaults to '%(default)s'.",
+    )
+
+    return parser
+
+
+def _merge(args: argparse.Namespace) -> None:
+    from ._json_writer import write_json
+
+    merger = ShardMerger()
+    for filepath in args.files:
+        merger.add_file(filepath)
+
+    if args.output:
+        with open_report_file(args.output, args.write_mode) as f:
+            write_merged_report(
+                f, merger, args.flavor, args.margin, args.zeros, args.exclude_outcomes
+            )
+    else:
+        write_merged_report(
+            sys.stdout, merger, args.flavor, args.margin, args.zeros, args.exclude_outcomes
+        )
+
+    if args.json_output and merger.aggregator is not None:
+        with open_report_file(args.json_output, WriteMode.ATOMIC) as f:
+            write_json(f, merger.aggregator, args.json_format, is_durations=merger.is_durations)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = _make_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        _merge(args)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{PROG}: error: {e}\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
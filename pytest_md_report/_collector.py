@@ -0,0 +1,168 @@
+from contextlib import AbstractContextManager, nullcontext
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+import pytest
+from _pytest.config import Config
+
+from ._aggregator import StatsAggregator
+from ._exit_flush import ExitFlusher
+from ._slowest import SlowestTests
+from ._snapshot import SnapshotScheduler
+
+
+if TYPE_CHECKING:
+    # _pytest.reports is not available before pytest 3.6
+    from _pytest.reports import CollectReport, TestReport
+
+
+WORKEROUTPUT_KEY: Final = "md_report_aggregate"
+SLOWEST_WORKEROUTPUT_KEY: Final = "md_report_slowest"
+
+
+def is_xdist_worker(config: Config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+class ReportCollector:
+    """
+    A plugin object that feeds test reports into a :py:class:`StatsAggregator`
+    as they arrive, using the same categories as the terminal reporter.
+
+    When ``is_durations`` is |True|, durations of tests are aggregated as well.
+    When ``slowest`` is specified, every setup/call/teardown phase is offered to it.
+    When ``snapshot`` is specified, it is notified at the teardown of each test.
+    Node ids of the tests that are running are tracked in :py:attr:`running_nodeids`.
+    When ``exit_flusher`` is specified, signals are handled after the aggregate is updated.
+
+    When ``is_xdist_aggregate`` is |True|, each pytest-xdist worker aggregates its own
+    test reports and sends only the aggregate to the controller, which merges them
+    instead of aggregating every report forwarded from the workers.
+    Reports of a worker that went down without sending its aggregate, such as the report
+    of the test that crashed the worker, are aggregated at the controller. The other
+    results of a crashed worker are lost with the worker.
+    """
+
+    @property
+    def running_nodeids(self) -> list[str]:
+        return list(self.__running_nodeids)
+
+    def __init__(
+        self,
+        config: Config,
+        aggregator: StatsAggregator,
+        is_xdist_aggregate: bool,
+        is_durations: bool = False,
+        slowest: Optional[SlowestTests] = None,
+        snapshot: Optional[SnapshotScheduler] = None,
+        exit_flusher: Optional[ExitFlusher] = None,
+    ) -> None:
+        self.__config: Final = config
+        self.__aggregator: Final = aggregator
+        self.__is_xdist_aggregate: Final = is_xdist_aggregate
+        self.__is_durations: Final = is_durations
+        self.__slowest: Final = slowest
+        self.__snapshot: Final = snapshot
+        self.__exit_flusher: Final = exit_flusher
+        self.__is_xdist_worker: Final = is_xdist_worker(config)
+
+        # used as an ordered set: tests of multiple pytest-xdist workers run at the same time
+        self.__running_nodeids: Final[dict[str, None]] = {}
+
+        # pytest-xdist workers that went down without sending the aggregates
+        self.__lost_workers: Final[set[Any]] = set()
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        self.__running_nodeids[nodeid] = None
+
+    # optional: pytest_runtest_logfinish is not available before pytest 3.4
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_runtest_logfinish(self, nodeid: str) -> None:
+        self.__running_nodeids.pop(nodeid, None)
+
+    def pytest_runtest_logreport(self, report: "TestReport") -> None:
+        with self.__defer_signals():
+            self.__add_test_report(report)
+
+    def __add_test_report(self, report: "TestReport") -> None:
+        if self.__is_xdist_aggregate and self.__is_aggregated_by_worker(report):
+            # the report forwarded from a worker: merged at pytest_testnodedown
+            self.__notify_snapshot(report)
+            return
+
+        category, _letter, _word = self.__config.hook.pytest_report_teststatus(
+            report=report, config=self.__config
+        )
+        self.__aggregator.add(category, report)
+
+        if self.__is_durations:
+            self.__aggregator.add_duration(report)
+
+        if self.__slowest is not None:
+            # passed setup/teardown phases do not have a category
+            self.__slowest.add(
+                report.nodeid, report.when, report.duration, category or report.outcome
+            )
+
+        self.__notify_snapshot(report)
+
+    def __is_aggregated_by_worker(self, report: "TestReport") -> bool:
+        node = getattr(report, "node", None)
+        if node is None:
+            return False
+
+        # the controller creates the report of a crashed test after the worker went down
+        return node not in self.__lost_workers
+
+    def __defer_signals(self) -> AbstractContextManager[None]:
+        if self.__exit_flusher is None:
+            return nullcontext()
+
+        return self.__exit_flusher.defer_signals()
+
+    def __notify_snapshot(self, report: "TestReport") -> None:
+        if self.__snapshot is not None and report.when == "teardown":
+            self.__snapshot.on_test_finished()
+
+    def pytest_collectreport(self, report: "CollectReport") -> None:
+        if self.__is_xdist_aggregate and self.__is_xdist_worker:
+            # every worker collects all of the tests: the controller receives
+            # collection errors from workers without duplication
+            return
+
+        with self.__defer_signals():
+            if report.failed:
+                self.__aggregator.add("error", report)
+            elif report.skipped:
+                self.__aggregator.add("skipped", report)
+
+    def pytest_sessionfinish(self) -> None:
+        if not (self.__is_xdist_aggregate and self.__is_xdist_worker):
+            return
+
+        workeroutput = self.__config.workeroutput  # type: ignore[attr-defined]
+        workeroutput[WORKEROUTPUT_KEY] = self.__aggregator.to_dict()
+        if self.__slowest is not None:
+            workeroutput[SLOWEST_WORKEROUTPUT_KEY] = self.__slowest.to_list()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: Any, error: Any) -> None:
+        if not self.__is_xdist_aggregate:
+            return
+
+        workeroutput = getattr(node, "workeroutput", {})
+        data = workeroutput.get(WORKEROUTPUT_KEY)
+        if data is None:
+            self.__lost_workers.add(node)
+            reporter = self.__config.pluginmanager.get_plugin("terminalreporter")
+            if reporter is not None:
+                reporter.write_line(
+                    f"md-report: worker {node.gateway.id} did not send aggregated results, "
+                    "the report does not include the results of the worker "
+                    "except for a test that crashed the worker."
+                )
+            return
+
+        with self.__defer_signals():
+            self.__aggregator.merge(data)
+            if self.__slowest is not None:
+                self.__slowest.merge(workeroutput.get(SLOWEST_WORKEROUTPUT_KEY, []))
@@ -2,17 +2,52 @@ from enum import Enum, unique
 from textwrap import dedent
 from typing import Final
 
-from pytablewriter.writer.text import MarkdownFlavor
-from tcolorpy import AnsiFGColor
 
+# names of tcolorpy.AnsiFGColor and values of pytablewriter MarkdownFlavor:
+# defined as literals to avoid importing the libraries until a report is created
+COLOR_NAMES: Final = "/".join(
+    [
+        "black",
+        "red",
+        "green",
+        "yellow",
+        "blue",
+        "magenta",
+        "cyan",
+        "white",
+        "lightblack",
+        "lightred",
+        "lightgreen",
+        "lightyellow",
+        "lightblue",
+        "lightmagenta",
+        "lightcyan",
+        "lightwhite",
+    ]
+)
+MARKDOWN_FLAVORS: Final = ("common_mark", "github", "gfm", "jekyll", "kramdown")
 
-COLOR_NAMES: Final = "/".join([style.name.lower() for style in list(AnsiFGColor)])
+
+OUTCOMES: Final = ("passed", "failed", "error", "skipped", "xfailed", "xpassed")
+SUCCESS_OUTCOMES: Final = ("passed",)
+ERROR_OUTCOMES: Final = ("failed", "error")
+SKIP_OUTCOMES: Final = ("skipped", "xfailed", "xpassed")
 
 
 class Header:
     FILEPATH: Final = "filepath"
     TESTFUNC: Final = "function"
     SUBTOTAL: Final = "SUBTOTAL"
+    DURATION: Final = "duration"
+    MAX_DURATION: Final = "max duration"
+    MEAN_DURATION: Final = "mean duration"
+    DURATION_HISTOGRAM: Final = "duration histogram"
+    NODEID: Final = "nodeid"
+    PHASE: Final = "phase"
+    OUTCOME: Final = "outcome"
+    NEW_FAILURES: Final = "new failures"
+    FIXED: Final = "fixed"
+    DURATION_CHANGE: Final = "duration change"
 
 
 class ColorPolicy(Enum):
@@ -27,6 +62,32 @@ class ZerosRender:
     LIST: Final = (NUMBER, EMPTY)
 
 
+class ParamExpand:
+    ALL: Final = "all"
+    FAILED: Final = "failed"
+    FAILED_OR_SLOW: Final = "failed-or-slow"
+    LIST: Final = (ALL, FAILED, FAILED_OR_SLOW)
+
+
+class HistogramStyle:
+    COLUMNS: Final = "columns"
+    SPARKLINE: Final = "sparkline"
+    LIST: Final = (COLUMNS, SPARKLINE)
+
+
+class WriteMode:
+    OVERWRITE: Final = "overwrite"
+    APPEND: Final = "append"
+    ATOMIC: Final = "atomic"
+    LIST: Final = (OVERWRITE, APPEND, ATOMIC)
+
+
+class JsonFormat:
+    JSON: Final = "json"
+    JSONL: Final = "jsonl"
+    LIST: Final = (JSON, JSONL)
+
+
 class FGColor:
     SUCCESS: Final = "SUCCESS"
     ERROR: Final = "ERROR"
@@ -43,9 +104,15 @@ class BGColor:
 class Default:
     COLOR_POLICY: Final = ColorPolicy.AUTO
     MARGIN: Final = 1
-    MARKDOWN_FLAVOR: Final = MarkdownFlavor.COMMON_MARK
+    MARKDOWN_FLAVOR: Final = "common_mark"
     ZEROS: Final = ZerosRender.NUMBER
     EXCLUDE_RESULTS: list[str] = []
+    DURATION_THRESHOLD: Final = 1.0
+    SLOWEST: Final = 0
+    ROLLUP_DEPTH: Final = 0
+    EXPAND_PARAMS: Final = ParamExpand.ALL
+    WRITE_MODE: Final = WriteMode.OVERWRITE
+    JSON_FORMAT: Final = JsonFormat.JSON
 
     class FGColor:
         SUCCESS: Final = "light_green"
@@ -65,10 +132,13 @@ class Option(Enum):
         dedent(
             """\
             Verbosity level for pytest-md-report.
+            0: a row for each file. 1: a row for each test function.
+            2: a row for each parameter set of parametrized test functions
+            (see {expand_params}).
             If not set, use the verbosity level of pytest.
             Defaults to 0.
             """
-        ),
+        ).format(expand_params=f"--{OPTION_PREFIX}-expand-params"),
     )
     MD_REPORT_OUTPUT = (
         f"{OPTION_PREFIX}-output",
@@ -157,7 +227,7 @@ class Option(Enum):
             Defaults to '{default}'.
             """
         ).format(
-            default=Default.MARKDOWN_FLAVOR.value,
+            default=Default.MARKDOWN_FLAVOR,
         ),
     )
     MD_EXCLUDE_OUTCOMES = (
@@ -173,6 +243,203 @@ class Option(Enum):
             default=Default.EXCLUDE_RESULTS,
         ),
     )
+    MD_REPORT_XDIST_AGGREGATE = (
+        f"{OPTION_PREFIX}-xdist-aggregate",
+        dedent(
+            """\
+            Aggregate test outcomes at each pytest-xdist worker and send only the aggregates
+            to the controller, instead of aggregating all of the test reports at the controller.
+            Results of a worker that crashed before finishing are not included in the report.
+            """
+        ),
+    )
+    MD_REPORT_DURATIONS = (
+        f"{OPTION_PREFIX}-durations",
+        dedent(
+            """\
+            Add columns of the durations of tests for each row: the sum, the maximum,
+            and the mean of the durations in seconds. The duration of a test is the sum of
+            the setup, call, and teardown durations.
+            """
+        ),
+    )
+    MD_REPORT_DURATION_THRESHOLD = (
+        f"{OPTION_PREFIX}-duration-threshold",
+        dedent(
+            """\
+            Maximum and mean durations that exceed the threshold in seconds
+            are rendered with the error color.
+            Defaults to {default}.
+            """
+        ).format(default=Default.DURATION_THRESHOLD),
+    )
+    MD_REPORT_DURATION_HISTOGRAM = (
+        f"{OPTION_PREFIX}-duration-histogram",
+        dedent(
+            """\
+            Add a histogram of the durations of tests in each row:
+            the number of tests within {buckets} seconds.
+            columns: a column for each bucket.
+            sparkline: a column of a sparkline that scaled by the largest bucket of the row.
+            Implies {durations}.
+            """
+        ).format(buckets="<0.01/<0.1/<1/<10/>=10", durations=f"--{OPTION_PREFIX}-durations"),
+    )
+    MD_REPORT_SLOWEST = (
+        f"{OPTION_PREFIX}-slowest",
+        dedent(
+            """\
+            Add a table of the N slowest setup/call/teardown phases of tests
+            (nodeid, phase, duration, outcome) after the report.
+            Defaults to {default} (disabled).
+            """
+        ).format(default=Default.SLOWEST),
+    )
+    MD_REPORT_ROLLUP_DEPTH = (
+        f"{OPTION_PREFIX}-rollup-depth",
+        dedent(
+            """\
+            Roll up the results of files into subtotals of the directories of the files,
+            limited to the specified depth of directories: each row of the report
+            is a directory, including the results of its subdirectories.
+            Files in the root directory are counted only in the TOTAL row.
+            Defaults to {default} (disabled).
+            """
+        ).format(default=Default.ROLLUP_DEPTH),
+    )
+    MD_REPORT_EXPAND_PARAMS = (
+        f"{OPTION_PREFIX}-expand-params",
+        dedent(
+            """\
+            Test functions whose parameter sets are broken out into rows
+            at verbosity level 2.
+            all: every parameter set.
+            failed: parameter sets whose first result is failed/error.
+            failed-or-slow: parameter sets whose first result is failed/error, or
+            whose duration of the phase exceeds {threshold}.
+            The other parameter sets are aggregated into the row of the function,
+            so that the number of rows depends only on the expanded parameter sets.
+            Every result of a parameter set is in the same row.
+            Defaults to '{default}'.
+            """
+        ).format(threshold=f"--{OPTION_PREFIX}-duration-threshold", default=Default.EXPAND_PARAMS),
+    )
+    MD_REPORT_WRITE_MODE = (
+        f"{OPTION_PREFIX}-write-mode",
+        dedent(
+            """\
+            How to write the report to the output file.
+            overwrite: overwrite the file with the report.
+            append: append the report to the file (e.g. $GITHUB_STEP_SUMMARY),
+            separated from the existing contents by a blank line.
+            atomic: write the report to a temporary file in the same directory, then
+            rename it to the output file, so that readers never observe a partial report.
+            Reports are written with a single write in append/atomic modes.
+            Defaults to '{default}'.
+            """
+        ).format(default=Default.WRITE_MODE),
+    )
+    MD_REPORT_BASELINE = (
+        f"{OPTION_PREFIX}-baseline",
+        dedent(
+            """\
+            Store the failure counts and durations of the rows of the report in the pytest
+            cache, and add columns of changes from the stored rows of the previous runs:
+            new failures, fixed, and duration change (if {durations} is set).
+            Rows of a partial run (e.g. --lf) replace only the stored rows of the same keys.
+            """
+        ).format(durations=f"--{OPTION_PREFIX}-durations"),
+    )
+    MD_REPORT_JSON_OUTPUT = (
+        f"{OPTION_PREFIX}-json-output",
+        dedent(
+            """\
+            Path to a file to output the aggregated results in JSON format:
+            outcome counts per row, the total counts, and durations if {durations} is set.
+            The file is written atomically when the write mode is 'atomic',
+            overwritten otherwise.
+            """
+        ).format(durations=f"--{OPTION_PREFIX}-durations"),
+    )
+    MD_REPORT_JSON_FORMAT = (
+        f"{OPTION_PREFIX}-json-format",
+        dedent(
+            """\
+            Format of the JSON output file.
+            json: a JSON object.
+            jsonl: JSON Lines, a summary record followed by a record for each row.
+            Defaults to '{default}'.
+            """
+        ).format(default=Default.JSON_FORMAT),
+    )
+    MD_REPORT_MAX_ROWS = (
+        f"{OPTION_PREFIX}-max-rows",
+        dedent(
+            """\
+            Maximum number of rows of the report, excluding the TOTAL row.
+            Rows that have failed/error results are kept first, and the other rows are
+            collapsed into a row such as 'N other files passed'.
+            """
+        ),
+    )
+    MD_REPORT_MAX_BYTES = (
+        f"{OPTION_PREFIX}-max-bytes",
+        dedent(
+            """\
+            Maximum size of the report in bytes (e.g. 1048576 for GitHub job summaries).
+            Rows are kept and collapsed in the same way as {max_rows}.
+            A colored table that exceeds the size is written without colors.
+            The table of the slowest tests is limited to half of the size.
+            At least the header, the collapsed, and the TOTAL rows are written:
+            a warning is written to the terminal if they exceed the size.
+            """
+        ).format(max_rows=f"--{OPTION_PREFIX}-max-rows"),
+    )
+    MD_REPORT_SNAPSHOT_INTERVAL = (
+        f"{OPTION_PREFIX}-snapshot-interval",
+        dedent(
+            """\
+            Rewrite the output file with a snapshot of the report during a session,
+            at most once every specified seconds. Checked at the end of each test.
+            Snapshots are written atomically, followed by a line that notes the
+            number of finished tests. Requires {output}, and cannot be used with
+            the append write mode.
+            """
+        ).format(output=f"--{OPTION_PREFIX}-output"),
+    )
+    MD_REPORT_SNAPSHOT_TESTS = (
+        f"{OPTION_PREFIX}-snapshot-tests",
+        dedent(
+            """\
+            Rewrite the output file with a snapshot of the report during a session,
+            every specified number of finished tests.
+            Can be combined with {interval}.
+            """
+        ).format(interval=f"--{OPTION_PREFIX}-snapshot-interval"),
+    )
+    MD_REPORT_CRASH_SAFE = (
+        f"{OPTION_PREFIX}-crash-safe",
+        dedent(
+            """\
+            Write a partial report from the aggregate when a session ends without
+            finishing: on SIGTERM/SIGHUP or at the exit of the interpreter
+            (e.g. killed by a CI job timeout). The partial report is followed by a line
+            that marks the report as incomplete, with the tests that were running.
+            The output file is written atomically, or appended in the append write mode.
+            """
+        ),
+    )
+    MD_REPORT_PROFILE = (
+        f"{OPTION_PREFIX}-profile",
+        dedent(
+            """\
+            Measure the time and the peak memory usage of each phase of creating the report
+            (settings, extraction, matrix, styling, rendering, file write), and
+            write the breakdown to the terminal. Snapshots and partial reports are measured
+            as separate phases. Tracing memory allocations adds overhead to the measured times.
+            """
+        ),
+    )
 
     @property
     def cmdoption_str(self) -> str:
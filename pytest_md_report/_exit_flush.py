@@ -0,0 +1,110 @@
+import atexit
+import os
+import signal
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Callable, Final, Optional
+
+
+DEFAULT_SIGNALS: Final = tuple(
+    getattr(signal, name) for name in ("SIGTERM", "SIGHUP") if hasattr(signal, name)
+)
+
+
+class ExitFlusher:
+    """
+    Call a function to write a partial report when a session ends without
+    ``pytest_unconfigure``: when the process receives one of ``signals``, or at the exit
+    of the interpreter. The function is called at most once, with the reason.
+
+    Previous signal handlers are called after the function, and the default handlers
+    terminate the process by the signal as before. Processes that are terminated by
+    ``os._exit`` or SIGKILL cannot be handled.
+
+    Signal handlers run between any two bytecodes of the main thread: signals that are
+    received in a :py:meth:`defer_signals` block are handled when the block exits, so that
+    the function does not observe the aggregate in the middle of an update.
+    """
+
+    def __init__(
+        self, flush: Callable[[str], None], signals: Sequence[signal.Signals] = DEFAULT_SIGNALS
+    ) -> None:
+        self.__flush: Final = flush
+        self.__signals: Final = tuple(signals)
+        self.__prev_handlers: Final[dict[signal.Signals, Any]] = {}
+        self.__pending_signals: Final[list[tuple[int, Optional[FrameType]]]] = []
+        self.__defer_depth = 0
+        self.__is_done = False
+
+    def install(self) -> None:
+        atexit.register(self.__on_exit)
+
+        if threading.current_thread() is not threading.main_thread():
+            # signal handlers can be set only in the main thread
+            return
+
+        for signum in self.__signals:
+            prev_handler = signal.signal(signum, self.__on_signal)
+            # None: the previous handler was not installed from Python
+            self.__prev_handlers[signum] = signal.SIG_DFL if prev_handler is None else prev_handler
+
+    def uninstall(self) -> None:
+        """
+        Disarm the flusher: called when the session ends normally.
+        """
+
+        self.__is_done = True
+        atexit.unregister(self.__on_exit)
+
+        for signum, prev_handler in self.__prev_handlers.items():
+            signal.signal(signum, prev_handler)
+        self.__prev_handlers.clear()
+
+    @contextmanager
+    def defer_signals(self) -> Iterator[None]:
+        """
+        Defer the handling of signals that are received in the block until the block exits.
+        """
+
+        self.__defer_depth += 1
+        try:
+            yield
+        finally:
+            self.__defer_depth -= 1
+            if self.__defer_depth == 0:
+                while self.__pending_signals:
+                    self.__handle_signal(*self.__pending_signals.pop(0))
+
+    def __call_flush(self, reason: str) -> None:
+        if self.__is_done:
+            return
+
+        self.__is_done = True
+        self.__flush(reason)
+
+    def __on_exit(self) -> None:
+        self.__call_flush("the interpreter exited")
+
+    def __on_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        if self.__defer_depth > 0:
+            self.__pending_signals.append((signum, frame))
+            return
+
+        self.__handle_signal(signum, frame)
+
+    def __handle_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        try:
+            self.__call_flush(f"received {signal.Signals(signum).name}")
+        finally:
+            prev_handler = self.__prev_handlers.pop(signal.Signals(signum), None)
+            if prev_handler is None:
+                # a deferred signal after the previous handler was restored
+                prev_handler = signal.getsignal(signum) or signal.SIG_DFL
+            else:
+                signal.signal(signum, prev_handler)
+            if callable(prev_handler):
+                prev_handler(signum, frame)
+            elif prev_handler == signal.SIG_DFL:
+                os.kill(os.getpid(), signum)
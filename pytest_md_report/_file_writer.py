@@ -0,0 +1,86 @@
+import io
+import os
+import secrets
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TextIO
+
+from ._const import WriteMode
+
+
+def _create_temp_file(dirpath: str, basename: str) -> tuple[int, str]:
+    """
+    Create a temporary file with the permissions of a file that is created by open():
+    the umask of the process is applied by the OS, without changing the process-wide umask.
+    """
+
+    while True:
+        temp_filepath = os.path.join(dirpath, f".{basename}.{secrets.token_hex(4)}.tmp")
+        try:
+            fd = os.open(temp_filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+
+        return (fd, temp_filepath)
+
+
+def write_atomic(filepath: str, content: str) -> None:
+    """
+    Write a content to a temporary file in the directory of ``filepath``,
+    then rename the temporary file to ``filepath``.
+    Readers of ``filepath`` observe either the previous file or the whole content.
+    """
+
+    dirpath = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_filepath = _create_temp_file(dirpath, os.path.basename(filepath))
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # keep the permissions of the file to replace
+        if os.path.exists(filepath):
+            os.chmod(temp_filepath, os.stat(filepath).st_mode & 0o7777)
+
+        os.replace(temp_filepath, filepath)
+    except BaseException:
+        try:
+            os.remove(temp_filepath)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def open_report_file(filepath: str, write_mode: str) -> Iterator[TextIO]:
+    """
+    Open a stream to write a report to a file in a :py:class:`WriteMode`.
+
+    In the overwrite mode, the report is written to the file as it is rendered.
+    In the append/atomic modes, the report is buffered and written to the file
+    with a single write when the context exits without errors.
+    """
+
+    if write_mode == WriteMode.OVERWRITE:
+        with open(filepath, "w") as f:
+            yield f
+        return
+
+    buffer = io.StringIO()
+    yield buffer
+    content = buffer.getvalue()
+
+    if write_mode == WriteMode.APPEND:
+        with open(filepath, "a") as f:
+            if f.tell() > 0:
+                # a blank line separates Markdown blocks
+                content = "\n" + content
+            f.write(content)
+        return
+
+    if write_mode == WriteMode.ATOMIC:
+        write_atomic(filepath, content)
+        return
+
+    raise ValueError(f"unknown write mode: {write_mode}")
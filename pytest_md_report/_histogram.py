@@ -0,0 +1,68 @@
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Any, Final
+
+from ._const import HistogramStyle
+
+
+# upper bounds of the buckets in seconds: the last bucket has no upper bound
+HISTOGRAM_BOUNDS: Final = (0.01, 0.1, 1.0, 10.0)
+HISTOGRAM_HEADERS: Final = ("<10ms", "<100ms", "<1s", "<10s", ">=10s")
+NUM_BUCKETS: Final = len(HISTOGRAM_HEADERS)
+
+SPARKLINE_CHARS: Final = "▁▂▃▄▅▆▇█"
+SPARKLINE_EMPTY_CHAR: Final = " "
+
+
+def to_bucket(seconds: float) -> int:
+    return bisect_right(HISTOGRAM_BOUNDS, seconds)
+
+
+def to_histogram(seconds: float) -> tuple[int, ...]:
+    histogram = [0] * NUM_BUCKETS
+    histogram[to_bucket(seconds)] = 1
+
+    return tuple(histogram)
+
+
+def add_histograms(lhs: Sequence[int], rhs: Sequence[int]) -> tuple[int, ...]:
+    # an empty histogram is a histogram that is not aggregated
+    if not lhs:
+        return tuple(rhs)
+    if not rhs:
+        return tuple(lhs)
+
+    return tuple(x + y for x, y in zip(lhs, rhs))
+
+
+def to_sparkline(histogram: Sequence[int]) -> str:
+    """
+    Render the counts of the buckets as a string of block characters, scaled by the maximum
+    count. Buckets that have no tests are rendered as spaces.
+    """
+
+    max_count = max(histogram, default=0)
+    if max_count == 0:
+        return SPARKLINE_EMPTY_CHAR * NUM_BUCKETS
+
+    num_levels = len(SPARKLINE_CHARS)
+
+    return "".join(
+        SPARKLINE_CHARS[-(-count * num_levels // max_count) - 1] if count else SPARKLINE_EMPTY_CHAR
+        for count in histogram
+    )
+
+
+def to_histogram_values(histogram: Sequence[int], style: str) -> list[Any]:
+    """
+    Convert the counts of the buckets to the values of the cells of a row:
+    a count for each bucket, or a sparkline.
+    """
+
+    if not histogram:
+        histogram = (0,) * NUM_BUCKETS
+
+    if style == HistogramStyle.SPARKLINE:
+        return [to_sparkline(histogram)]
+
+    return list(histogram)
@@ -0,0 +1,78 @@
+import json
+from collections.abc import Iterator
+from typing import Any, Final, TextIO
+
+from ._aggregator import DurationStats, StatsAggregator
+from ._const import OUTCOMES, JsonFormat
+
+
+JSON_SCHEMA_VERSION: Final = 1
+
+_KEY_NAMES: Final = ("filepath", "function")
+
+
+def _to_durations_dict(durations: DurationStats) -> dict[str, Any]:
+    durations_dict: dict[str, Any] = {
+        "total_seconds": durations.total_seconds,
+        "max_seconds": durations.max_seconds,
+        "num_tests": durations.num_tests,
+    }
+    if durations.histogram:
+        durations_dict["histogram"] = list(durations.histogram)
+
+    return durations_dict
+
+
+def iter_json_records(aggregator: StatsAggregator, is_durations: bool) -> Iterator[dict[str, Any]]:
+    """
+    Iterate the records of the aggregate: a summary record, followed by a record for
+    each row. Outcomes that have zero counts are omitted.
+    """
+
+    summary: dict[str, Any] = {
+        "type": "summary",
+        "version": JSON_SCHEMA_VERSION,
+        "verbosity_level": aggregator.verbosity_level,
+        "total": {outcome: count for outcome, count in aggregator.total_stats.items() if count > 0},
+    }
+    if is_durations:
+        summary["total_durations"] = _to_durations_dict(aggregator.total_durations)
+    yield summary
+
+    durations_per_testfunc = aggregator.extract_durations() if is_durations else {}
+    for key, results in aggregator.extract_results(OUTCOMES).items():
+        record: dict[str, Any] = {"type": "row"}
+        record.update(zip(_KEY_NAMES, key))
+        record["results"] = dict(results)
+        if is_durations:
+            record["durations"] = _to_durations_dict(durations_per_testfunc[key])
+        yield record
+
+
+def write_json(
+    stream: TextIO, aggregator: StatsAggregator, json_format: str, is_durations: bool
+) -> None:
+    """
+    Write the aggregate in a :py:class:`JsonFormat`. The JSON format is an object that
+    has the members of the summary record and a ``rows`` array of the row records.
+    """
+
+    records = iter_json_records(aggregator, is_durations)
+
+    if json_format == JsonFormat.JSONL:
+        for record in records:
+            stream.write(json.dumps(record, separators=(",", ":")))
+            stream.write("\n")
+        return
+
+    if json_format == JsonFormat.JSON:
+        obj = next(records)
+        del obj["type"]
+        obj["rows"] = [
+            {name: value for name, value in record.items() if name != "type"} for record in records
+        ]
+        json.dump(obj, stream, separators=(",", ":"))
+        stream.write("\n")
+        return
+
+    raise ValueError(f"unknown JSON format: {json_format}")
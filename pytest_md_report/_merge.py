@@ -0,0 +1,124 @@
+import json
+from collections.abc import Iterator
+from typing import Any, Optional, TextIO
+
+from ._aggregator import DurationStats, StatsAggregator
+from ._json_writer import JSON_SCHEMA_VERSION
+
+
+def _to_duration_stats(value: Any) -> DurationStats:
+    return DurationStats(
+        total_seconds=value["total_seconds"],
+        max_seconds=value["max_seconds"],
+        num_tests=value["num_tests"],
+        histogram=tuple(value.get("histogram", ())),
+    )
+
+
+def iter_aggregate_records(stream: TextIO) -> Iterator[dict[str, Any]]:
+    """
+    Iterate the records of an aggregate that written by :py:func:`write_json`
+    in either of the formats. JSON Lines are read a line at a time.
+    JSON objects are written in a single line, and loaded as a whole.
+    """
+
+    for line in stream:
+        if not line.strip():
+            continue
+
+        record = json.loads(line)
+        if "type" in record or "rows" not in record:
+            yield record
+            continue
+
+        rows = record.pop("rows")
+        yield {"type": "summary", **record}
+        for row in rows:
+            yield {"type": "row", **row}
+
+
+class ShardMerger:
+    """
+    Merge the aggregates of shards that written by ``--md-report-json-output`` into
+    a single aggregate. Files are read a record at a time, so that the memory usage depends
+    on the number of distinct rows, not on the number or the sizes of the files.
+
+    Durations are merged only if every shard has durations.
+    """
+
+    @property
+    def aggregator(self) -> Optional[StatsAggregator]:
+        return self.__aggregator
+
+    @property
+    def is_durations(self) -> bool:
+        return self.__num_shards > 0 and self.__is_durations
+
+    @property
+    def num_shards(self) -> int:
+        return self.__num_shards
+
+    def __init__(self) -> None:
+        self.__aggregator: Optional[StatsAggregator] = None
+        self.__is_durations = True
+        self.__num_shards = 0
+
+    def add_file(self, filepath: str) -> None:
+        """
+        Merge an aggregate file of a shard.
+
+        Raises:
+            ValueError: If the file is not a valid aggregate, or the verbosity level of
+                the aggregate differs from the other shards.
+        """
+
+        with open(filepath, encoding="utf-8") as f:
+            try:
+                self.add_records(iter_aggregate_records(f))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{filepath}: invalid aggregate: {e}") from e
+
+    def add_records(self, records: Iterator[dict[str, Any]]) -> None:
+        summary = next(records, None)
+        if summary is None or summary.get("type") != "summary":
+            raise ValueError("a summary record is missing")
+        if summary.get("version") != JSON_SCHEMA_VERSION:
+            raise ValueError(f"unsupported version: {summary.get('version')}")
+
+        verbosity_level = summary["verbosity_level"]
+        total_durations = summary.get("total_durations")
+        aggregator = self.__aggregator
+        if aggregator is None:
+            aggregator = StatsAggregator(
+                verbosity_level=verbosity_level,
+                is_histogram=total_durations is not None and "histogram" in total_durations,
+            )
+            self.__aggregator = aggregator
+        elif aggregator.verbosity_level != verbosity_level:
+            raise ValueError(
+                f"verbosity level mismatch: expected {aggregator.verbosity_level}, "
+                f"got {verbosity_level}"
+            )
+
+        is_durations = total_durations is not None
+        self.__is_durations = self.__is_durations and is_durations
+        aggregator.merge_totals(
+            summary["total"],
+            _to_duration_stats(total_durations) if is_durations else None,
+        )
+
+        for record in records:
+            if record.get("type") != "row":
+                raise ValueError(f"unexpected record type: {record.get('type')}")
+
+            key = [record["filepath"]]
+            if "function" in record:
+                key.append(record["function"])
+            durations = record.get("durations")
+            aggregator.merge_row(
+                key,
+                record["results"],
+                _to_duration_stats(durations) if durations is not None else None,
+            )
+
+        self.__num_shards += 1
@@ -0,0 +1,168 @@
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Final, NamedTuple, Optional
+
+
+class Phase:
+    IMPORT: Final = "import"
+    SETTINGS: Final = "settings"
+    EXTRACTION: Final = "extraction"
+    MATRIX: Final = "matrix"
+    STYLING: Final = "styling"
+    RENDERING: Final = "rendering"
+    FILE_WRITE: Final = "file write"
+
+    # reports that are written in addition to the report at the end of a session
+    SNAPSHOT: Final = "snapshot"
+    PARTIAL: Final = "partial"
+
+
+class PhaseStats(NamedTuple):
+    seconds: float
+    peak_bytes: int
+
+
+class _Frame:
+    __slots__ = ("start_bytes", "start_peak_bytes", "peak_bytes", "child_seconds")
+
+    def __init__(self, start_bytes: int, start_peak_bytes: int) -> None:
+        self.start_bytes = start_bytes
+        self.start_peak_bytes = start_peak_bytes
+        self.peak_bytes = start_bytes
+        self.child_seconds = 0.0
+
+
+class PhaseProfiler:
+    """
+    Measure the self time and the peak memory usage of each phase of creating a report.
+
+    Phases can be nested: the time of a phase excludes the time of the phases nested in it,
+    while the peak memory usage of a phase includes the nested phases.
+    Measuring is a no-op when the profiler is disabled.
+
+    When memory allocations are already traced by others, the peak of the trace is not reset:
+    a peak that does not exceed the peak at the start of a phase is not attributed to the phase.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @property
+    def stats(self) -> dict[str, PhaseStats]:
+        return dict(self.__stats)
+
+    def __init__(self, enabled: bool) -> None:
+        self.__enabled: Final = enabled
+        self.__stats: Final[dict[str, PhaseStats]] = {}
+        self.__frames: Final[list[_Frame]] = []
+        self.__is_tracing_owner = False
+        self.__phase_override: Optional[str] = None
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        if not self.__enabled:
+            yield
+            return
+
+        if self.__phase_override is not None:
+            phase = self.__phase_override
+
+        if not self.__frames and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__is_tracing_owner = True
+
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        if self.__frames:
+            self.__update_peak(self.__frames[-1], current_bytes, peak_bytes)
+        if self.__is_tracing_owner:
+            tracemalloc.reset_peak()
+            peak_bytes = current_bytes
+
+        frame = _Frame(current_bytes, peak_bytes)
+        self.__frames.append(frame)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.__update_peak(frame, *tracemalloc.get_traced_memory())
+            self.__frames.pop()
+
+            if self.__frames:
+                parent = self.__frames[-1]
+                parent.child_seconds += elapsed
+                parent.peak_bytes = max(parent.peak_bytes, frame.peak_bytes)
+            elif self.__is_tracing_owner:
+                tracemalloc.stop()
+                self.__is_tracing_owner = False
+
+            prev = self.__stats.get(phase, PhaseStats(seconds=0.0, peak_bytes=0))
+            self.__stats[phase] = PhaseStats(
+                seconds=prev.seconds + elapsed - frame.child_seconds,
+                peak_bytes=max(prev.peak_bytes, frame.peak_bytes - frame.start_bytes),
+            )
+
+    @contextmanager
+    def measure_all(self, phase: str) -> Iterator[None]:
+        """
+        Measure a phase together with the phases nested in it. Used for reports that are
+        written in addition to the report at the end of a session, so that they do not add
+        to the costs of the phases of the report.
+        """
+
+        if not self.__enabled:
+            yield
+            return
+
+        with self.measure(phase):
+            prev_override = self.__phase_override
+            self.__phase_override = self.__phase_override or phase
+            try:
+                yield
+            finally:
+                self.__phase_override = prev_override
+
+    @contextmanager
+    def measure_time(self, phase: str) -> Iterator[None]:
+        """
+        Measure only the time of a top-level phase. Used for phases that import modules:
+        importing some modules while tracing memory allocations is extremely slow.
+        """
+
+        if not self.__enabled:
+            yield
+            return
+
+        if self.__phase_override is not None:
+            phase = self.__phase_override
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            prev = self.__stats.get(phase, PhaseStats(seconds=0.0, peak_bytes=0))
+            self.__stats[phase] = prev._replace(
+                seconds=prev.seconds + time.perf_counter() - start_time
+            )
+
+    @staticmethod
+    def __update_peak(frame: _Frame, current_bytes: int, peak_bytes: int) -> None:
+        if peak_bytes > frame.start_peak_bytes:
+            frame.peak_bytes = max(frame.peak_bytes, peak_bytes)
+        else:
+            # the peak of the trace was reached before the phase started
+            frame.peak_bytes = max(frame.peak_bytes, current_bytes)
+
+    def to_lines(self) -> list[str]:
+        lines = [f"{'phase':<12} {'seconds':>10} {'peak KiB':>10}"]
+        total = 0.0
+
+        for phase, stats in self.__stats.items():
+            lines.append(f"{phase:<12} {stats.seconds:>10.4f} {stats.peak_bytes / 1024:>10.1f}")
+            total += stats.seconds
+        lines.append(f"{'total':<12} {total:>10.4f}")
+
+        return lines
@@ -0,0 +1,89 @@
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Final, Optional
+
+from ._aggregator import DurationStats
+
+
+class _DirectoryNode:
+    __slots__ = ("children", "counts", "durations")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _DirectoryNode] = {}
+        self.counts: Optional[list[int]] = None
+        self.durations: Optional[DurationStats] = None
+
+
+class DirectoryTree:
+    """
+    A prefix tree of directories that rolls up the results of files into subtotals of
+    the directories of the files, limited to ``depth`` levels.
+
+    Each file is added by walking the components of its normalized path once,
+    and the results are accumulated in every node on the path within the depth:
+    the row of a directory is the subtotal of the files under the directory, including
+    the subdirectories. The subtotal of the root directory is the TOTAL row of a report,
+    so the root directory does not have a row.
+    Rows are extracted in pre-order, so a directory is followed by its subdirectories.
+    """
+
+    def __init__(self, outcomes: Sequence[str], depth: int) -> None:
+        if depth < 1:
+            raise ValueError(f"depth must be greater than zero: {depth}")
+
+        self.__outcomes: Final = list(outcomes)
+        self.__depth: Final = depth
+        self.__root: Final = _DirectoryNode()
+
+    def add(
+        self,
+        filepath: str,
+        results: Mapping[str, int],
+        durations: Optional[DurationStats] = None,
+    ) -> None:
+        counts = [results.get(outcome, 0) for outcome in self.__outcomes]
+        node = self.__root
+        for name in filepath.split("/")[:-1][: self.__depth]:
+            if name in ("", "."):
+                continue
+
+            child = node.children.get(name)
+            if child is None:
+                child = _DirectoryNode()
+                node.children[name] = child
+            node = child
+
+            if node.counts is None:
+                node.counts = [0] * len(counts)
+            for i, count in enumerate(counts):
+                node.counts[i] += count
+
+            if durations is not None:
+                prev = node.durations
+                node.durations = durations if prev is None else prev.combine(durations)
+
+    def extract_results(self) -> dict[tuple, dict[str, int]]:
+        return {
+            (dirpath,): {
+                outcome: count for outcome, count in zip(self.__outcomes, node.counts) if count
+            }
+            for dirpath, node in self.__iter_nodes()
+            if node.counts is not None and any(node.counts)
+        }
+
+    def extract_durations(self) -> dict[tuple, DurationStats]:
+        return {
+            (dirpath,): node.durations
+            for dirpath, node in self.__iter_nodes()
+            if node.durations is not None
+        }
+
+    def __iter_nodes(self) -> Iterator[tuple[str, _DirectoryNode]]:
+        stack = [(f"{name}/", child) for name, child in reversed(self.__root.children.items())]
+
+        while stack:
+            dirpath, node = stack.pop()
+            yield dirpath, node
+
+            stack.extend(
+                (f"{dirpath}{name}/", child) for name, child in reversed(node.children.items())
+            )
@@ -0,0 +1,51 @@
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from ._const import ColorPolicy
+
+
+if TYPE_CHECKING:
+    from pytablewriter.writer.text import MarkdownFlavor
+
+
+class ReportSettings(NamedTuple):
+    """
+    Settings of a report that are resolved from command line options, environment variables,
+    and ini-options once at the start of a session. Values are validated when resolved.
+    Settings are immutable: ``color_map`` is a read-only view of the colors.
+    """
+
+    verbosity_level: int
+    output_filepath: Optional[str]
+    is_tee: bool
+    color_policy: ColorPolicy
+    md_flavor: "MarkdownFlavor"
+    margin: int
+    zeros: str
+    exclude_outcomes: tuple[str, ...]
+    color_map: Mapping[str, str]
+    is_xdist_aggregate: bool
+    is_durations: bool
+    duration_threshold: float
+    duration_histogram: Optional[str]
+    slowest: int
+    rollup_depth: int
+    expand_params: str
+    max_rows: Optional[int]
+    max_bytes: Optional[int]
+    snapshot_interval: Optional[float]
+    snapshot_tests: Optional[int]
+    is_crash_safe: bool
+    write_mode: str
+    is_baseline: bool
+    json_output_filepath: Optional[str]
+    json_format: str
+    is_profile: bool
+
+    @property
+    def is_output_file(self) -> bool:
+        return bool(self.output_filepath and self.output_filepath.strip())
+
+    @property
+    def is_output_term(self) -> bool:
+        return self.is_tee or not self.output_filepath
@@ -0,0 +1,73 @@
+import heapq
+from collections.abc import Sequence
+from typing import Any, Final, NamedTuple
+
+
+class SlowTest(NamedTuple):
+    nodeid: str
+    phase: str
+    duration: float
+    outcome: str
+
+
+class SlowestTests:
+    """
+    Keep the slowest setup/call/teardown phases of tests as reports arrive.
+
+    Phases are held in a min-heap bounded to ``size`` entries: a phase that is faster
+    than the fastest of the kept phases is discarded with a single comparison, so the
+    memory usage does not depend on the number of tests.
+    """
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __init__(self, size: int) -> None:
+        self.__size: Final = size
+
+        # entries are (duration, sequence number, test): the sequence number keeps
+        # the earlier of the phases that have the same duration
+        self.__heap: Final[list[tuple[float, int, SlowTest]]] = []
+        self.__seq = 0
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def add(self, nodeid: str, phase: str, duration: float, outcome: str) -> None:
+        heap = self.__heap
+        if len(heap) >= self.__size:
+            if self.__size <= 0 or duration <= heap[0][0]:
+                return
+
+            self.__seq -= 1
+            heapq.heapreplace(
+                heap, (duration, self.__seq, SlowTest(nodeid, phase, duration, outcome))
+            )
+            return
+
+        self.__seq -= 1
+        heapq.heappush(heap, (duration, self.__seq, SlowTest(nodeid, phase, duration, outcome)))
+
+    def to_list(self) -> list[list[Any]]:
+        """
+        Convert the kept phases to a compact form that consists of only builtin types,
+        which can be sent through the pytest-xdist workeroutput channel.
+        """
+
+        return [list(test) for test in self.extract()]
+
+    def merge(self, data: Sequence[Sequence[Any]]) -> None:
+        """
+        Merge phases that converted by :py:meth:`to_list` into this instance.
+        """
+
+        for nodeid, phase, duration, outcome in data:
+            self.add(nodeid, phase, duration, outcome)
+
+    def extract(self) -> list[SlowTest]:
+        """
+        Return the kept phases in descending order of durations.
+        """
+
+        return [test for _duration, _seq, test in sorted(self.__heap, reverse=True)]
@@ -0,0 +1,60 @@
+import time
+from typing import Callable, Final, Optional
+
+
+class SnapshotScheduler:
+    """
+    Decide when to write a snapshot of a report during a session.
+
+    Checked at the end of each test: the check is a counter increment and, if ``interval``
+    is specified, a read of a monotonic clock. The deadlines are restarted after writing
+    a snapshot, so that a slow write does not cause snapshots to be written back to back.
+
+    Args:
+        write: A function that writes a snapshot. Called with the number of finished tests.
+        interval: Minimum number of seconds between snapshots.
+        num_tests: Number of finished tests between snapshots.
+    """
+
+    @property
+    def num_tests(self) -> int:
+        return self.__num_tests
+
+    def __init__(
+        self,
+        write: Callable[[int], None],
+        interval: Optional[float] = None,
+        num_tests: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if interval is None and num_tests is None:
+            raise ValueError("either interval or num_tests is required")
+
+        self.__write: Final = write
+        self.__interval: Final = interval
+        self.__tests_per_snapshot: Final = num_tests
+        self.__clock: Final = clock
+        self.__num_tests = 0
+        self.__next_num_tests: float = 0
+        self.__next_time = 0.0
+        self.__restart()
+
+    def on_test_finished(self) -> None:
+        self.__num_tests += 1
+
+        if self.__num_tests < self.__next_num_tests and (
+            self.__interval is None or self.__clock() < self.__next_time
+        ):
+            return
+
+        self.__write(self.__num_tests)
+        self.__restart()
+
+    def __restart(self) -> None:
+        if self.__tests_per_snapshot is None:
+            self.__next_num_tests = float("inf")
+        else:
+            self.__next_num_tests = self.__num_tests + self.__tests_per_snapshot
+
+        if self.__interval is not None:
+            self.__next_time = self.__clock() + self.__interval
@@ -0,0 +1,117 @@
+from collections.abc import Iterable, Sequence
+from typing import Any, Callable, Final, Optional, TextIO
+
+from pytablewriter.writer.text import MarkdownFlavor
+
+from ._table import ColumnLayout, calc_column_layout, calc_display_width, to_cell_text
+
+
+class MarkdownStreamWriter:
+    """
+    A Markdown table writer that writes a table without styles to a stream row by row.
+
+    Column widths are computed by a first pass over the rows, then each row is formatted
+    and written to the stream one at a time. The rendered table is never held in memory
+    as a whole. The output is the same as the output of the pytablewriter Markdown writer
+    without style filters.
+
+    Args:
+        headers: Header names of the table.
+        number_columns: Flags that indicate whether each column holds integer values.
+        flavor: Markdown flavor of the table.
+        margin: Margin size for each cell.
+        render_zeros: Render zero values as ``0`` if |True|, otherwise render as empty.
+    """
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        number_columns: Sequence[bool],
+        flavor: MarkdownFlavor,
+        margin: int,
+        render_zeros: bool,
+    ) -> None:
+        if len(headers) != len(number_columns):
+            raise ValueError("headers and number_columns must have the same length")
+
+        self.__headers: Final = list(headers)
+        self.__number_columns: Final = list(number_columns)
+        self.__flavor: Final = flavor
+        self.__margin: Final = " " * margin
+        self.__render_zeros: Final = render_zeros
+
+    def write_table(
+        self,
+        stream: TextIO,
+        rows: Callable[[], Iterable[Sequence[Any]]],
+        column_layout: Optional[ColumnLayout] = None,
+    ) -> None:
+        """
+        Write a table to the stream.
+
+        Args:
+            stream: Output stream.
+            rows: A function that returns an iterable of table rows.
+                The function is called twice: to compute column widths and to write rows.
+            column_layout: Precomputed layout of the columns.
+                If specified, ``rows`` is called only once to write rows.
+        """
+
+        if column_layout is None:
+            column_layout = calc_column_layout(
+                self.__headers, self.__number_columns, rows(), self.__render_zeros
+            )
+        widths, aligns_right = column_layout
+
+        stream.write(
+            self.__to_line(
+                [
+                    self.__align_center(header, width)
+                    for header, width in zip(self.__headers, widths)
+                ]
+            )
+        )
+        if self.__flavor == MarkdownFlavor.KRAMDOWN:
+            stream.write("\n")
+        stream.write(
+            self.__to_line(
+                [
+                    "-" * (width - 1) + ":" if align_right else "-" * width
+                    for width, align_right in zip(widths, aligns_right)
+                ]
+            )
+        )
+
+        number_columns = self.__number_columns
+        render_zeros = self.__render_zeros
+        for row in rows():
+            stream.write(
+                self.__to_line(
+                    [
+                        self.__align(
+                            to_cell_text(value, number_columns[col], render_zeros),
+                            widths[col],
+                            aligns_right[col],
+                        )
+                        for col, value in enumerate(row)
+                    ]
+                )
+            )
+
+    def __to_line(self, items: Sequence[str]) -> str:
+        margin = self.__margin
+
+        return "|" + "|".join(f"{margin}{item}{margin}" for item in items) + "|\n"
+
+    @staticmethod
+    def __align(item: str, width: int, align_right: bool) -> str:
+        padding_len = width - (calc_display_width(item) - len(item))
+        aligned = item.rjust(padding_len) if align_right else item.ljust(padding_len)
+
+        return aligned.replace("|", r"\|")
+
+    @staticmethod
+    def __align_center(item: str, width: int) -> str:
+        padding_len = width - (calc_display_width(item) - len(item))
+
+        return f"{item:^{padding_len}}".replace("|", r"\|")
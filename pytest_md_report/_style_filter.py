@@ -1,112 +1,141 @@
+import copy
+from collections.abc import Mapping
+from functools import lru_cache
 from typing import Any, Final, Optional, cast
 
 from pytablewriter.style import Cell, Style
-from pytablewriter.writer import AbstractTableWriter
 
-from ._const import BGColor, ColorPolicy, FGColor, Header
+from ._const import (
+    ERROR_OUTCOMES,
+    SKIP_OUTCOMES,
+    SUCCESS_OUTCOMES,
+    BGColor,
+    ColorPolicy,
+    FGColor,
+    Header,
+)
+from ._table import ReportTable
+
+
+class StylePlan:
+    """
+    Colors of the table cells that are determined once per column and per row,
+    so that style filters only need to look them up for each cell.
+
+    - outcome columns are colored by the outcome of the column
+    - headers of columns that consist of only zero values are grayed out
+    - slow durations are colored with the error color
+    - new failures/fixed columns are colored with the error/success colors
+    - durations are aligned right: style filter results take precedence over column styles
+    - filepath/function/SUBTOTAL columns are colored by the class of the row
+
+    Styles are interned by the colors and the alignment: there are only a few combinations
+    of them, and creating a :py:class:`~pytablewriter.style.Style` parses the colors.
+    Cells get a shallow copy of an interned style, since the writer sets the padding
+    of each cell to the style that a filter returns.
+    """
 
-
-class ColorRetriever:
     def __init__(
-        self,
-        row: int,
-        is_grayout: bool,
-        color_polilcy: ColorPolicy,
-        color_map: dict[str, str],
+        self, table: ReportTable, color_policy: ColorPolicy, color_map: Mapping[str, str]
     ) -> None:
-        self.__row = row
-        self.__is_grayout = is_grayout
-        self.__color_polilcy = color_polilcy
-        self.__color_map = color_map
+        self.__grayout_color: Final = color_map[FGColor.GRAYOUT]
+        self.__slow_color: Final = color_map[FGColor.ERROR]
+        self.__slow_cells: Final = table.slow_cells
+        self.__col_aligns: Final = [
+            "right" if col in table.duration_columns else "auto"
+            for col in range(len(table.headers))
+        ]
+        self.__col_colors: Final = [
+            self.__to_outcome_color(header, color_map) for header in table.headers
+        ]
+        self.__header_colors: Final = [
+            self.__grayout_color if stats.is_all_zero else col_color
+            for col_color, stats in zip(self.__col_colors, table.column_stats)
+        ]
+        self.__row_colors: Final = [color_map[row_class] for row_class in table.row_classes]
+        self.__styles: Final[dict[tuple[Optional[str], Optional[str], Optional[str]], Style]] = {}
+
+        num_rows = len(table.value_matrix)
+        self.__row_bg_colors: Final[list[Optional[str]]] = []
+        for row in range(num_rows):
+            if row == num_rows - 1:
+                self.__row_bg_colors.append(BGColor.TOTAL_ROW)
+            elif color_policy != ColorPolicy.AUTO:
+                self.__row_bg_colors.append(None)
+            elif row % 2 == 0:
+                self.__row_bg_colors.append(BGColor.EVEN_ROW)
+            else:
+                self.__row_bg_colors.append(BGColor.ODD_ROW)
+
+    def retrieve_header_color(self, col: int) -> Optional[str]:
+        return self.__header_colors[col]
+
+    def retrieve_align(self, col: int) -> str:
+        return self.__col_aligns[col]
+
+    def retrieve_fg_bg_color(self, row: int, col: int, value: Any) -> tuple[str, Optional[str]]:
+        if value == 0:
+            fg_color = self.__grayout_color
+        elif (row, col) in self.__slow_cells:
+            fg_color = self.__slow_color
+        else:
+            fg_color = self.__col_colors[col] or self.__row_colors[row]
 
-    def retrieve_fg_bg_color(self, base_color: str) -> tuple[str, Optional[str]]:
-        bg_color: Optional[str] = None
+        return (fg_color, self.__row_bg_colors[row])
 
-        if (self.__row % 2) == 0:
-            fg_color = self.__color_map[FGColor.GRAYOUT] if self.__is_grayout else base_color
-            bg_color = BGColor.EVEN_ROW if self.__color_polilcy == ColorPolicy.AUTO else None
-        else:
-            fg_color = self.__color_map[FGColor.GRAYOUT] if self.__is_grayout else base_color
-            bg_color = BGColor.ODD_ROW if self.__color_polilcy == ColorPolicy.AUTO else None
+    @property
+    def num_styles(self) -> int:
+        return len(self.__styles)
 
-        return (fg_color, bg_color)
+    def to_style(
+        self, fg_color: Optional[str], bg_color: Optional[str] = None, align: Optional[str] = None
+    ) -> Style:
+        key = (fg_color, bg_color, align)
+        style = self.__styles.get(key)
+        if style is None:
+            style = Style(color=fg_color, bg_color=bg_color, align=align)
+            self.__styles[key] = style
 
+        return copy.copy(style)
 
-def style_filter(cell: Cell, **kwargs: Any) -> Optional[Style]:
-    writer = cast(AbstractTableWriter, kwargs["writer"])
-    color_policy: Final = cast(ColorPolicy, kwargs["color_policy"])
-    color_map: Final = kwargs["color_map"]
-    num_rows: Final = cast(int, kwargs["num_rows"])
-    headers: Final = writer.headers
-    header: Final = headers[cell.col]
-    fg_color = None
-    bg_color = None
+    @staticmethod
+    def __to_outcome_color(header: str, color_map: Mapping[str, str]) -> Optional[str]:
+        if header in SUCCESS_OUTCOMES or header == Header.FIXED:
+            return color_map[FGColor.SUCCESS]
+        if header in ERROR_OUTCOMES or header == Header.NEW_FAILURES:
+            return color_map[FGColor.ERROR]
+        if header in SKIP_OUTCOMES:
+            return color_map[FGColor.SKIP]
 
-    is_grayout = False
-    if cell.value == 0:
-        is_grayout = True
+        # filepath/function/SUBTOTAL columns
+        return None
 
-    retriever = ColorRetriever(cell.row, is_grayout, color_policy, color_map)
+
+def style_filter(cell: Cell, **kwargs: Any) -> Optional[Style]:
+    style_plan: Final = cast(StylePlan, kwargs["style_plan"])
 
     if cell.is_header_row():
-        if all([writer.value_matrix[r][cell.col] == 0 for r in range(len(writer.value_matrix))]):
-            return Style(color=color_map[FGColor.GRAYOUT])
-
-        if header in ("passed"):
-            fg_color, bg_color = retriever.retrieve_fg_bg_color(color_map[FGColor.SUCCESS])
-        elif header in ("failed", "error"):
-            fg_color, bg_color = retriever.retrieve_fg_bg_color(color_map[FGColor.ERROR])
-        elif header in ("skipped", "xfailed", "xpassed"):
-            fg_color, bg_color = retriever.retrieve_fg_bg_color(color_map[FGColor.SKIP])
-        else:
+        header_color = style_plan.retrieve_header_color(cell.col)
+        if header_color is None:
             return None
 
-        return Style(color=fg_color)
-
-    is_passed = False
-    is_failed = False
-    is_skipped = False
-
-    if header in (Header.FILEPATH, Header.TESTFUNC, Header.SUBTOTAL):
-        error_ct_list = []
-        if "failed" in headers:
-            error_ct_list.append(writer.value_matrix[cell.row][headers.index("failed")])
-        if "error" in headers:
-            error_ct_list.append(writer.value_matrix[cell.row][headers.index("error")])
-
-        skip_ct_list = []
-        if "skipped" in headers:
-            skip_ct_list.append(writer.value_matrix[cell.row][headers.index("skipped")])
-        if "xfailed" in headers:
-            skip_ct_list.append(writer.value_matrix[cell.row][headers.index("xfailed")])
-        if "xpassed" in headers:
-            skip_ct_list.append(writer.value_matrix[cell.row][headers.index("xpassed")])
-
-        error_ct = sum(error_ct_list)
-        skip_ct = sum(skip_ct_list)
-
-        is_failed = error_ct > 0
-        is_skipped = skip_ct > 0
-        is_passed = error_ct == 0 and skip_ct == 0
-
-    if is_passed or header in ("passed"):
-        fg_color, bg_color = retriever.retrieve_fg_bg_color(color_map[FGColor.SUCCESS])
-    elif is_failed or header in ("failed", "error"):
-        fg_color, bg_color = retriever.retrieve_fg_bg_color(color_map[FGColor.ERROR])
-    elif is_skipped or header in ("skipped", "xfailed", "xpassed"):
-        fg_color, bg_color = retriever.retrieve_fg_bg_color(color_map[FGColor.SKIP])
-
-    if cell.row == num_rows - 1:
-        bg_color = BGColor.TOTAL_ROW
+        return style_plan.to_style(header_color)
+
+    fg_color, bg_color = style_plan.retrieve_fg_bg_color(cell.row, cell.col, cell.value)
+
+    return style_plan.to_style(fg_color, bg_color, style_plan.retrieve_align(cell.col))
+
 
-    return Style(color=fg_color, bg_color=bg_color)
+@lru_cache(maxsize=None)
+def _to_separator_style(bg_color: str) -> Style:
+    # separator styles are not modified by the writer: shared by all of the separators
+    return Style(bg_color=bg_color)
 
 
 def col_separator_style_filter(
     left_cell: Optional[Cell], right_cell: Optional[Cell], **kwargs: dict[str, Any]
 ) -> Optional[Style]:
     num_rows: Final = cast(int, kwargs["num_rows"])
-    fg_color = None
     bg_color = None
     row: Final = left_cell.row if left_cell else cast(Cell, right_cell).row
 
@@ -117,7 +146,7 @@ def col_separator_style_filter(
     elif row >= 0:
         bg_color = BGColor.ODD_ROW
 
-    if fg_color or bg_color:
-        return Style(color=fg_color, bg_color=bg_color)
+    if bg_color:
+        return _to_separator_style(bg_color)
 
     return None
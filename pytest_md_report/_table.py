@@ -0,0 +1,316 @@
+import unicodedata
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from typing import Any, Callable, Final, NamedTuple, Optional, Union
+
+from ._const import ERROR_OUTCOMES, SKIP_OUTCOMES, FGColor, Header
+
+
+MIN_COLUMN_WIDTH: Final = 3
+
+# number of distinct non-ASCII strings whose display widths are cached
+DISPLAY_WIDTH_CACHE_SIZE: Final = 4096
+
+DURATION_HEADERS: Final = (
+    Header.DURATION,
+    Header.MAX_DURATION,
+    Header.MEAN_DURATION,
+    Header.DURATION_CHANGE,
+)
+THRESHOLD_DURATION_HEADERS: Final = (Header.MAX_DURATION, Header.MEAN_DURATION)
+
+
+class ColumnStats(NamedTuple):
+    """
+    Statistics of a column of a report table.
+    ``total`` and ``max`` are computed only from integer values.
+    """
+
+    is_all_zero: bool
+    total: int
+    max: int
+
+
+class ColumnLayout(NamedTuple):
+    """
+    Display widths and alignments of the columns of a Markdown table.
+    """
+
+    widths: list[int]
+    aligns_right: list[bool]
+
+
+def calc_display_width(value: str) -> int:
+    """
+    Calculate the display width of a string in the same way as pytablewriter:
+    East Asian wide/fullwidth characters are two columns wide, the others are one.
+    """
+
+    # most of paths and function names consist of only ASCII characters
+    if value.isascii():
+        return len(value)
+
+    return _calc_non_ascii_display_width(value)
+
+
+@lru_cache(maxsize=DISPLAY_WIDTH_CACHE_SIZE)
+def _calc_non_ascii_display_width(value: str) -> int:
+    # widths of each string are calculated at least twice: for the column layout and
+    # for the padding of the cell, and the same filepath is repeated in rows of functions
+    width = 0
+
+    for char in value:
+        if unicodedata.east_asian_width(char) in "WF":
+            width += 2
+        else:
+            width += 1
+
+    return width
+
+
+def to_cell_text(value: Any, is_number: bool, render_zeros: bool) -> str:
+    if is_number:
+        if value == 0 and not render_zeros:
+            return ""
+
+        return str(value)
+
+    if value is None:
+        return ""
+
+    return str(value).replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+
+
+def format_duration(seconds: float) -> str:
+    return f"{seconds:.3f}"
+
+
+def format_duration_change(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return ""
+    if abs(seconds) < 0.0005:
+        # avoid rendering a negative zero
+        return "+0.000"
+
+    return f"{seconds:+.3f}"
+
+
+def calc_column_stats(value_matrix: Sequence[Sequence[Any]], num_columns: int) -> list[ColumnStats]:
+    is_all_zero = [True] * num_columns
+    totals = [0] * num_columns
+    maxs = [0] * num_columns
+
+    for values in value_matrix:
+        for col, value in enumerate(values):
+            if value != 0:
+                is_all_zero[col] = False
+
+            if isinstance(value, int):
+                totals[col] += value
+                if value > maxs[col]:
+                    maxs[col] = value
+
+    return [
+        ColumnStats(is_all_zero=is_all_zero[col], total=totals[col], max=maxs[col])
+        for col in range(num_columns)
+    ]
+
+
+def calc_column_layout(
+    headers: Sequence[str],
+    number_columns: Sequence[bool],
+    rows: Iterable[Sequence[Any]],
+    render_zeros: bool,
+) -> ColumnLayout:
+    widths = [max(calc_display_width(header), MIN_COLUMN_WIDTH) for header in headers]
+    has_values = [False] * len(headers)
+
+    for row in rows:
+        for col, value in enumerate(row):
+            item = to_cell_text(value, number_columns[col], render_zeros)
+            if item:
+                has_values[col] = True
+            widths[col] = max(widths[col], calc_display_width(item))
+
+    # a column without any values is treated as a string column
+    aligns_right = [
+        is_number and has_value for is_number, has_value in zip(number_columns, has_values)
+    ]
+
+    return ColumnLayout(widths=widths, aligns_right=aligns_right)
+
+
+class ReportTable:
+    """
+    A report table that is independent of the output destination:
+    rows in the output order, statistics of the columns, and the class of each row.
+    Built once per session and shared by the terminal and file outputs,
+    which only differ in colors and ANSI escape sequences.
+
+    Row classes are one of the :py:class:`FGColor` keys:
+    ERROR if the row has failed/error results, SKIP if the row has
+    skipped/xfailed/xpassed results, SUCCESS otherwise.
+
+    Durations in seconds are formatted as strings with three decimal places, so that every
+    writer renders them as is. Changes of durations are formatted with signs.
+    Maximum and mean durations that exceed ``duration_threshold`` are marked as slow cells.
+
+    ``byte_budget`` is the size in bytes that the rows were selected to fit in,
+    when rendered without styles.
+
+    ``value_matrix`` is either the rows or a function that returns a new iterable of the rows.
+    Rows of a function are not stored until the rows, statistics, or row classes are
+    requested (by the styles of a colored output): :py:meth:`iter_rows` yields them
+    formatted one at a time, so that a table without styles is streamed.
+    """
+
+    @property
+    def headers(self) -> list[str]:
+        return self.__headers
+
+    @property
+    def number_columns(self) -> list[bool]:
+        return self.__number_columns
+
+    @property
+    def value_matrix(self) -> list[list[Any]]:
+        return self.__store_rows()
+
+    @property
+    def column_stats(self) -> list[ColumnStats]:
+        return self.__store_column_stats()
+
+    @property
+    def row_classes(self) -> list[str]:
+        return self.__store_row_classes()
+
+    @property
+    def duration_columns(self) -> list[int]:
+        return self.__duration_columns
+
+    @property
+    def slow_cells(self) -> frozenset[tuple[int, int]]:
+        self.__store_rows()
+
+        return self.__slow_cells
+
+    @property
+    def byte_budget(self) -> Optional[int]:
+        return self.__byte_budget
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        num_key_columns: int,
+        value_matrix: Union[Iterable[list[Any]], Callable[[], Iterable[list[Any]]]],
+        duration_threshold: Optional[float] = None,
+        byte_budget: Optional[int] = None,
+    ) -> None:
+        self.__headers: Final = list(headers)
+        # a sparkline of a histogram is the only column of values that is not a number
+        self.__number_columns: Final = [
+            col >= num_key_columns and header != Header.DURATION_HISTOGRAM
+            for col, header in enumerate(self.__headers)
+        ]
+        self.__duration_columns: Final = [
+            col for col, header in enumerate(self.__headers) if header in DURATION_HEADERS
+        ]
+        self.__duration_threshold: Final = duration_threshold
+        self.__value_matrix: Optional[list[list[Any]]] = None
+        self.__slow_cells: frozenset[tuple[int, int]] = frozenset()
+        self.__rows_func: Callable[[], Iterable[list[Any]]]
+        if callable(value_matrix):
+            self.__rows_func = value_matrix
+        else:
+            self.__value_matrix, self.__slow_cells = self.__format_rows(value_matrix)
+            self.__rows_func = self.__value_matrix.__iter__
+        self.__column_stats: Optional[list[ColumnStats]] = None
+        self.__row_classes: Optional[list[str]] = None
+        self.__column_layouts: dict[bool, ColumnLayout] = {}
+        self.__byte_budget: Final = byte_budget
+
+    def iter_rows(self) -> Iterable[list[Any]]:
+        """
+        Returns:
+            The rows of the table, without storing them if they are not stored yet.
+        """
+
+        if self.__value_matrix is not None:
+            return self.__value_matrix
+
+        return (self.__format_row(values) for values in self.__rows_func())
+
+    def retrieve_column_layout(self, render_zeros: bool) -> ColumnLayout:
+        layout = self.__column_layouts.get(render_zeros)
+        if layout is None:
+            layout = calc_column_layout(
+                self.__headers, self.__number_columns, self.iter_rows(), render_zeros
+            )
+            self.__column_layouts[render_zeros] = layout
+
+        return layout
+
+    def __store_rows(self) -> list[list[Any]]:
+        if self.__value_matrix is None:
+            self.__value_matrix, self.__slow_cells = self.__format_rows(self.__rows_func())
+
+        return self.__value_matrix
+
+    def __store_column_stats(self) -> list[ColumnStats]:
+        if self.__column_stats is None:
+            self.__column_stats = calc_column_stats(self.__store_rows(), len(self.__headers))
+
+        return self.__column_stats
+
+    def __store_row_classes(self) -> list[str]:
+        if self.__row_classes is None:
+            self.__row_classes = self.__calc_row_classes()
+
+        return self.__row_classes
+
+    def __format_rows(
+        self, value_matrix: Iterable[list[Any]]
+    ) -> tuple[list[list[Any]], frozenset[tuple[int, int]]]:
+        rows = []
+        slow_cells: set[tuple[int, int]] = set()
+
+        for row, values in enumerate(value_matrix):
+            slow_cells.update((row, col) for col in self.__find_slow_columns(values))
+            rows.append(self.__format_row(values))
+
+        return (rows, frozenset(slow_cells))
+
+    def __find_slow_columns(self, values: list[Any]) -> list[int]:
+        threshold = self.__duration_threshold
+        if threshold is None:
+            return []
+
+        return [
+            col
+            for col in self.__duration_columns
+            if self.__headers[col] in THRESHOLD_DURATION_HEADERS and values[col] > threshold
+        ]
+
+    def __format_row(self, values: list[Any]) -> list[Any]:
+        for col in self.__duration_columns:
+            if self.__headers[col] == Header.DURATION_CHANGE:
+                values[col] = format_duration_change(values[col])
+            else:
+                values[col] = format_duration(values[col])
+
+        return values
+
+    def __calc_row_classes(self) -> list[str]:
+        error_cols = [col for col, header in enumerate(self.__headers) if header in ERROR_OUTCOMES]
+        skip_cols = [col for col, header in enumerate(self.__headers) if header in SKIP_OUTCOMES]
+        row_classes = []
+
+        for values in self.__store_rows():
+            if sum(values[col] for col in error_cols) > 0:
+                row_classes.append(FGColor.ERROR)
+            elif sum(values[col] for col in skip_cols) > 0:
+                row_classes.append(FGColor.SKIP)
+            else:
+                row_classes.append(FGColor.SUCCESS)
+
+        return row_classes
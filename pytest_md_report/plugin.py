@@ -1,18 +1,92 @@
+import contextlib
+import io
 import os
 from collections import defaultdict
-from collections.abc import Mapping, Sequence
-from typing import Any, Optional
+from collections.abc import Iterator, Mapping, Sequence
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Final, Generic, Optional, TextIO, TypeVar, cast
 
+import pytest
 from _pytest.config import Config
 from _pytest.config.argparsing import Parser
 from _pytest.terminal import TerminalReporter
-from pytablewriter import TableWriterFactory
-from pytablewriter.writer.text import MarkdownFlavor, normalize_md_flavor
-from typepy import Bool, Integer, StrictLevel, is_not_null_string
-from typepy.error import TypeConversionError
 
-from ._const import ColorPolicy, Default, FGColor, Header, HelpMsg, Option, ZerosRender
-from ._style_filter import col_separator_style_filter, style_filter
+from ._aggregator import DurationStats, StatsAggregator
+from ._collector import ReportCollector, is_xdist_worker
+from ._const import (
+    MARKDOWN_FLAVORS,
+    OUTCOMES,
+    ColorPolicy,
+    Default,
+    FGColor,
+    Header,
+    HelpMsg,
+    HistogramStyle,
+    JsonFormat,
+    Option,
+    ParamExpand,
+    WriteMode,
+    ZerosRender,
+)
+from ._exit_flush import ExitFlusher
+from ._file_writer import open_report_file
+from ._profiler import Phase, PhaseProfiler
+from ._settings import ReportSettings
+from ._slowest import SlowestTests, SlowTest
+from ._snapshot import SnapshotScheduler
+
+
+if TYPE_CHECKING:
+    # pytablewriter/typepy are imported only when a report is created,
+    # to keep the startup time of pytest sessions that do not create a report
+    from pytablewriter.writer.text import MarkdownFlavor
+
+    from ._baseline import Baseline, BaselineDelta
+    from ._budget import FittedRows, RowUnit
+    from ._style_filter import StylePlan
+    from ._table import ReportTable
+
+
+T = TypeVar("T")
+
+
+class _SessionKey(Generic[T]):
+    """
+    A key of an object of the plugin that lives during a session. The objects are kept
+    in an attribute of the config: ``Config.stash`` is not available before pytest 7.
+    """
+
+
+_SESSION_ATTR: Final = "_md_report_session"
+
+settings_key: Final = _SessionKey[ReportSettings]()
+aggregator_key: Final = _SessionKey[StatsAggregator]()
+profiler_key: Final = _SessionKey[PhaseProfiler]()
+slowest_key: Final = _SessionKey[SlowestTests]()
+baseline_key: Final = _SessionKey["Baseline"]()
+exit_flusher_key: Final = _SessionKey[ExitFlusher]()
+budget_warned_key: Final = _SessionKey[bool]()
+
+
+def _get_session_objects(config: Config) -> dict[_SessionKey[Any], Any]:
+    objects = getattr(config, _SESSION_ATTR, None)
+    if objects is None:
+        objects = {}
+        setattr(config, _SESSION_ATTR, objects)
+
+    return objects
+
+
+def _set_session_object(config: Config, key: _SessionKey[T], value: T) -> None:
+    _get_session_objects(config)[key] = value
+
+
+def _find_session_object(config: Config, key: _SessionKey[T]) -> Optional[T]:
+    return cast(Optional[T], _get_session_objects(config).get(key))
+
+
+def _get_session_object(config: Config, key: _SessionKey[T]) -> T:
+    return cast(T, _get_session_objects(config)[key])
 
 
 def zero_to_nullstr(value: Any) -> Any:
@@ -96,7 +170,7 @@ def pytest_addoption(parser: Parser) -> None:
     )
     group.addoption(
         Option.MD_REPORT_FLAVOR.cmdoption_str,
-        choices=[flavor.value for flavor in MarkdownFlavor],
+        choices=MARKDOWN_FLAVORS,
         default=None,
         help=Option.MD_REPORT_FLAVOR.help_msg
         + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_FLAVOR.envvar_str),
@@ -108,6 +182,132 @@ def pytest_addoption(parser: Parser) -> None:
         help=Option.MD_EXCLUDE_OUTCOMES.help_msg
         + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_EXCLUDE_OUTCOMES.envvar_str),
     )
+    group.addoption(
+        Option.MD_REPORT_XDIST_AGGREGATE.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.MD_REPORT_XDIST_AGGREGATE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_XDIST_AGGREGATE.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_DURATIONS.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.MD_REPORT_DURATIONS.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_DURATIONS.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_DURATION_THRESHOLD.cmdoption_str,
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help=Option.MD_REPORT_DURATION_THRESHOLD.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_DURATION_THRESHOLD.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_DURATION_HISTOGRAM.cmdoption_str,
+        choices=HistogramStyle.LIST,
+        default=None,
+        help=Option.MD_REPORT_DURATION_HISTOGRAM.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_DURATION_HISTOGRAM.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_SLOWEST.cmdoption_str,
+        metavar="N",
+        type=int,
+        default=None,
+        help=Option.MD_REPORT_SLOWEST.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_SLOWEST.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_ROLLUP_DEPTH.cmdoption_str,
+        metavar="DEPTH",
+        type=int,
+        default=None,
+        help=Option.MD_REPORT_ROLLUP_DEPTH.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_ROLLUP_DEPTH.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_EXPAND_PARAMS.cmdoption_str,
+        choices=ParamExpand.LIST,
+        default=None,
+        help=Option.MD_REPORT_EXPAND_PARAMS.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_EXPAND_PARAMS.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_WRITE_MODE.cmdoption_str,
+        choices=WriteMode.LIST,
+        default=None,
+        help=Option.MD_REPORT_WRITE_MODE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_WRITE_MODE.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_BASELINE.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.MD_REPORT_BASELINE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_BASELINE.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_JSON_OUTPUT.cmdoption_str,
+        metavar="FILEPATH",
+        default=None,
+        help=Option.MD_REPORT_JSON_OUTPUT.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_JSON_OUTPUT.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_JSON_FORMAT.cmdoption_str,
+        choices=JsonFormat.LIST,
+        default=None,
+        help=Option.MD_REPORT_JSON_FORMAT.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_JSON_FORMAT.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_MAX_ROWS.cmdoption_str,
+        metavar="ROWS",
+        type=int,
+        default=None,
+        help=Option.MD_REPORT_MAX_ROWS.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_MAX_ROWS.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_MAX_BYTES.cmdoption_str,
+        metavar="BYTES",
+        type=int,
+        default=None,
+        help=Option.MD_REPORT_MAX_BYTES.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_MAX_BYTES.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_SNAPSHOT_INTERVAL.cmdoption_str,
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help=Option.MD_REPORT_SNAPSHOT_INTERVAL.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_SNAPSHOT_INTERVAL.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_SNAPSHOT_TESTS.cmdoption_str,
+        metavar="TESTS",
+        type=int,
+        default=None,
+        help=Option.MD_REPORT_SNAPSHOT_TESTS.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_SNAPSHOT_TESTS.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_CRASH_SAFE.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.MD_REPORT_CRASH_SAFE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_CRASH_SAFE.envvar_str),
+    )
+    group.addoption(
+        Option.MD_REPORT_PROFILE.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.MD_REPORT_PROFILE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.MD_REPORT_PROFILE.envvar_str),
+    )
 
     parser.addini(
         Option.MD_REPORT.inioption_str,
@@ -171,6 +371,91 @@ def pytest_addoption(parser: Parser) -> None:
         default=[],
         help=Option.MD_EXCLUDE_OUTCOMES.help_msg,
     )
+    parser.addini(
+        Option.MD_REPORT_XDIST_AGGREGATE.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_XDIST_AGGREGATE.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_DURATIONS.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_DURATIONS.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_DURATION_THRESHOLD.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_DURATION_THRESHOLD.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_DURATION_HISTOGRAM.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_DURATION_HISTOGRAM.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_SLOWEST.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_SLOWEST.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_ROLLUP_DEPTH.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_ROLLUP_DEPTH.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_EXPAND_PARAMS.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_EXPAND_PARAMS.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_WRITE_MODE.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_WRITE_MODE.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_BASELINE.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_BASELINE.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_JSON_OUTPUT.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_JSON_OUTPUT.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_JSON_FORMAT.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_JSON_FORMAT.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_MAX_ROWS.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_MAX_ROWS.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_MAX_BYTES.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_MAX_BYTES.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_SNAPSHOT_INTERVAL.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_SNAPSHOT_INTERVAL.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_SNAPSHOT_TESTS.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_SNAPSHOT_TESTS.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_CRASH_SAFE.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_CRASH_SAFE.help_msg,
+    )
+    parser.addini(
+        Option.MD_REPORT_PROFILE.inioption_str,
+        default=None,
+        help=Option.MD_REPORT_PROFILE.help_msg,
+    )
 
 
 def is_make_md_report(config: Config) -> bool:
@@ -229,6 +514,12 @@ def _is_appveyor_ci() -> bool:
 
 
 def _to_int(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+
+    from typepy import Integer, StrictLevel
+    from typepy.error import TypeConversionError
+
     try:
         return Integer(value, strict_level=StrictLevel.MIN).convert()
     except TypeConversionError:
@@ -237,7 +528,30 @@ def _to_int(value: Any) -> Optional[int]:
     return None
 
 
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+
+    from typepy import RealNumber, StrictLevel
+    from typepy.error import TypeConversionError
+
+    try:
+        return float(RealNumber(value, strict_level=StrictLevel.MIN).convert())
+    except TypeConversionError:
+        pass
+
+    return None
+
+
 def _to_bool(value: Any) -> Optional[bool]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+
+    from typepy import Bool, StrictLevel
+    from typepy.error import TypeConversionError
+
     try:
         return Bool(value, strict_level=StrictLevel.MIN).convert()
     except TypeConversionError:
@@ -297,7 +611,177 @@ def retrieve_tee(config: Config) -> bool:
     return tee if tee is not None else False
 
 
-def retrieve_md_flavor(config: Config) -> MarkdownFlavor:
+def retrieve_xdist_aggregate(config: Config) -> bool:
+    xdist_aggregate: Optional[bool] = config.option.md_report_xdist_aggregate
+
+    if xdist_aggregate is None:
+        xdist_aggregate = _to_bool(os.environ.get(Option.MD_REPORT_XDIST_AGGREGATE.envvar_str))
+
+    if xdist_aggregate is None:
+        xdist_aggregate = _to_bool(config.getini(Option.MD_REPORT_XDIST_AGGREGATE.inioption_str))
+
+    return xdist_aggregate if xdist_aggregate is not None else False
+
+
+def retrieve_durations(config: Config) -> bool:
+    durations: Optional[bool] = config.option.md_report_durations
+
+    if durations is None:
+        durations = _to_bool(os.environ.get(Option.MD_REPORT_DURATIONS.envvar_str))
+
+    if durations is None:
+        durations = _to_bool(config.getini(Option.MD_REPORT_DURATIONS.inioption_str))
+
+    return durations if durations is not None else False
+
+
+def retrieve_duration_threshold(config: Config) -> float:
+    threshold: Optional[float] = config.option.md_report_duration_threshold
+
+    if threshold is None:
+        threshold = _to_float(os.environ.get(Option.MD_REPORT_DURATION_THRESHOLD.envvar_str))
+
+    if threshold is None:
+        threshold = _to_float(config.getini(Option.MD_REPORT_DURATION_THRESHOLD.inioption_str))
+
+    if threshold is None:
+        return Default.DURATION_THRESHOLD
+
+    return threshold
+
+
+def retrieve_duration_histogram(config: Config) -> Optional[str]:
+    histogram = config.option.md_report_duration_histogram
+
+    if not histogram:
+        histogram = os.environ.get(Option.MD_REPORT_DURATION_HISTOGRAM.envvar_str)
+
+    if not histogram:
+        histogram = config.getini(Option.MD_REPORT_DURATION_HISTOGRAM.inioption_str)
+
+    if not histogram:
+        return None
+
+    return str(histogram)
+
+
+def retrieve_slowest(config: Config) -> int:
+    slowest: Optional[int] = config.option.md_report_slowest
+
+    if slowest is None:
+        slowest = _to_int(os.environ.get(Option.MD_REPORT_SLOWEST.envvar_str))
+
+    if slowest is None:
+        slowest = _to_int(config.getini(Option.MD_REPORT_SLOWEST.inioption_str))
+
+    if slowest is None:
+        return Default.SLOWEST
+
+    return slowest
+
+
+def retrieve_rollup_depth(config: Config) -> int:
+    rollup_depth: Optional[int] = config.option.md_report_rollup_depth
+
+    if rollup_depth is None:
+        rollup_depth = _to_int(os.environ.get(Option.MD_REPORT_ROLLUP_DEPTH.envvar_str))
+
+    if rollup_depth is None:
+        rollup_depth = _to_int(config.getini(Option.MD_REPORT_ROLLUP_DEPTH.inioption_str))
+
+    if rollup_depth is None:
+        return Default.ROLLUP_DEPTH
+
+    return rollup_depth
+
+
+def retrieve_max_rows(config: Config) -> Optional[int]:
+    max_rows: Optional[int] = config.option.md_report_max_rows
+
+    if max_rows is None:
+        max_rows = _to_int(os.environ.get(Option.MD_REPORT_MAX_ROWS.envvar_str))
+
+    if max_rows is None:
+        max_rows = _to_int(config.getini(Option.MD_REPORT_MAX_ROWS.inioption_str))
+
+    return max_rows
+
+
+def retrieve_max_bytes(config: Config) -> Optional[int]:
+    max_bytes: Optional[int] = config.option.md_report_max_bytes
+
+    if max_bytes is None:
+        max_bytes = _to_int(os.environ.get(Option.MD_REPORT_MAX_BYTES.envvar_str))
+
+    if max_bytes is None:
+        max_bytes = _to_int(config.getini(Option.MD_REPORT_MAX_BYTES.inioption_str))
+
+    return max_bytes
+
+
+def retrieve_snapshot_interval(config: Config) -> Optional[float]:
+    interval: Optional[float] = config.option.md_report_snapshot_interval
+
+    if interval is None:
+        interval = _to_float(os.environ.get(Option.MD_REPORT_SNAPSHOT_INTERVAL.envvar_str))
+
+    if interval is None:
+        interval = _to_float(config.getini(Option.MD_REPORT_SNAPSHOT_INTERVAL.inioption_str))
+
+    return interval
+
+
+def retrieve_snapshot_tests(config: Config) -> Optional[int]:
+    snapshot_tests: Optional[int] = config.option.md_report_snapshot_tests
+
+    if snapshot_tests is None:
+        snapshot_tests = _to_int(os.environ.get(Option.MD_REPORT_SNAPSHOT_TESTS.envvar_str))
+
+    if snapshot_tests is None:
+        snapshot_tests = _to_int(config.getini(Option.MD_REPORT_SNAPSHOT_TESTS.inioption_str))
+
+    return snapshot_tests
+
+
+def retrieve_baseline(config: Config) -> bool:
+    baseline: Optional[bool] = config.option.md_report_baseline
+
+    if baseline is None:
+        baseline = _to_bool(os.environ.get(Option.MD_REPORT_BASELINE.envvar_str))
+
+    if baseline is None:
+        baseline = _to_bool(config.getini(Option.MD_REPORT_BASELINE.inioption_str))
+
+    return baseline if baseline is not None else False
+
+
+def retrieve_crash_safe(config: Config) -> bool:
+    crash_safe: Optional[bool] = config.option.md_report_crash_safe
+
+    if crash_safe is None:
+        crash_safe = _to_bool(os.environ.get(Option.MD_REPORT_CRASH_SAFE.envvar_str))
+
+    if crash_safe is None:
+        crash_safe = _to_bool(config.getini(Option.MD_REPORT_CRASH_SAFE.inioption_str))
+
+    return crash_safe if crash_safe is not None else False
+
+
+def retrieve_profile(config: Config) -> bool:
+    profile: Optional[bool] = config.option.md_report_profile
+
+    if profile is None:
+        profile = _to_bool(os.environ.get(Option.MD_REPORT_PROFILE.envvar_str))
+
+    if profile is None:
+        profile = _to_bool(config.getini(Option.MD_REPORT_PROFILE.inioption_str))
+
+    return profile if profile is not None else False
+
+
+def retrieve_md_flavor(config: Config) -> "MarkdownFlavor":
+    from pytablewriter.writer.text import normalize_md_flavor
+
     md_flavor = config.option.md_report_flavor
 
     if not md_flavor:
@@ -307,7 +791,7 @@ def retrieve_md_flavor(config: Config) -> MarkdownFlavor:
         md_flavor = config.getini(Option.MD_REPORT_FLAVOR.inioption_str)
 
     if not md_flavor:
-        return Default.MARKDOWN_FLAVOR
+        md_flavor = Default.MARKDOWN_FLAVOR
 
     return normalize_md_flavor(str(md_flavor))
 
@@ -387,6 +871,67 @@ def retrieve_report_zeros(config: Config) -> str:
     return str(report_zeros)
 
 
+def retrieve_expand_params(config: Config) -> str:
+    expand_params = config.option.md_report_expand_params
+
+    if not expand_params:
+        expand_params = os.environ.get(Option.MD_REPORT_EXPAND_PARAMS.envvar_str)
+
+    if not expand_params:
+        expand_params = config.getini(Option.MD_REPORT_EXPAND_PARAMS.inioption_str)
+
+    if not expand_params:
+        expand_params = Default.EXPAND_PARAMS
+
+    return str(expand_params)
+
+
+def retrieve_write_mode(config: Config) -> str:
+    write_mode = config.option.md_report_write_mode
+
+    if not write_mode:
+        write_mode = os.environ.get(Option.MD_REPORT_WRITE_MODE.envvar_str)
+
+    if not write_mode:
+        write_mode = config.getini(Option.MD_REPORT_WRITE_MODE.inioption_str)
+
+    if not write_mode:
+        write_mode = Default.WRITE_MODE
+
+    return str(write_mode)
+
+
+def retrieve_json_output_filepath(config: Config) -> Optional[str]:
+    output_filepath: Optional[str] = config.option.md_report_json_output
+
+    if not output_filepath:
+        output_filepath = os.environ.get(Option.MD_REPORT_JSON_OUTPUT.envvar_str)
+
+    if not output_filepath:
+        value = config.getini(Option.MD_REPORT_JSON_OUTPUT.inioption_str)
+        if not value:
+            return None
+
+        return str(value)
+
+    return output_filepath
+
+
+def retrieve_json_format(config: Config) -> str:
+    json_format = config.option.md_report_json_format
+
+    if not json_format:
+        json_format = os.environ.get(Option.MD_REPORT_JSON_FORMAT.envvar_str)
+
+    if not json_format:
+        json_format = config.getini(Option.MD_REPORT_JSON_FORMAT.inioption_str)
+
+    if not json_format:
+        json_format = Default.JSON_FORMAT
+
+    return str(json_format)
+
+
 def retrieve_report_results_color(config: Config, color_option: Option, default: str) -> str:
     results_color = getattr(config.option, color_option.inioption_str)
 
@@ -402,6 +947,183 @@ def retrieve_report_results_color(config: Config, color_option: Option, default:
     return str(results_color)
 
 
+def resolve_report_settings(config: Config) -> ReportSettings:
+    """
+    Resolve and validate the settings of a report.
+
+    Raises:
+        pytest.UsageError: If any of the settings has an invalid value.
+    """
+
+    from tcolorpy import Color
+
+    try:
+        color_policy = retrieve_color_policy(config)
+    except KeyError:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_COLOR.cmdoption_str}: invalid value, expected one of "
+            + "/".join(policy.value for policy in ColorPolicy)
+        )
+
+    try:
+        md_flavor = retrieve_md_flavor(config)
+    except ValueError:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_FLAVOR.cmdoption_str}: invalid value, expected one of "
+            + "/".join(MARKDOWN_FLAVORS)
+        )
+
+    zeros = retrieve_report_zeros(config)
+    if zeros not in ZerosRender.LIST:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_ZEROS.cmdoption_str}: invalid value '{zeros}', expected one of "
+            + "/".join(ZerosRender.LIST)
+        )
+
+    expand_params = retrieve_expand_params(config)
+    if expand_params not in ParamExpand.LIST:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_EXPAND_PARAMS.cmdoption_str}: invalid value '{expand_params}', "
+            "expected one of " + "/".join(ParamExpand.LIST)
+        )
+
+    duration_histogram = retrieve_duration_histogram(config)
+    if duration_histogram is not None and duration_histogram not in HistogramStyle.LIST:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_DURATION_HISTOGRAM.cmdoption_str}: invalid value "
+            f"'{duration_histogram}', expected one of " + "/".join(HistogramStyle.LIST)
+        )
+
+    write_mode = retrieve_write_mode(config)
+    if write_mode not in WriteMode.LIST:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_WRITE_MODE.cmdoption_str}: invalid value '{write_mode}', "
+            "expected one of " + "/".join(WriteMode.LIST)
+        )
+
+    json_format = retrieve_json_format(config)
+    if json_format not in JsonFormat.LIST:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_JSON_FORMAT.cmdoption_str}: invalid value '{json_format}', "
+            "expected one of " + "/".join(JsonFormat.LIST)
+        )
+
+    color_map = {FGColor.GRAYOUT: Default.FGColor.GRAYOUT}
+    for fg_color, color_option, default in (
+        (FGColor.SUCCESS, Option.MD_REPORT_SUCCESS_COLOR, Default.FGColor.SUCCESS),
+        (FGColor.ERROR, Option.MD_REPORT_ERROR_COLOR, Default.FGColor.ERROR),
+        (FGColor.SKIP, Option.MD_REPORT_SKIP_COLOR, Default.FGColor.SKIP),
+    ):
+        color = retrieve_report_results_color(config, color_option, default)
+        try:
+            Color(color)
+        except ValueError:
+            raise pytest.UsageError(f"{color_option.cmdoption_str}: invalid color '{color}'")
+        color_map[fg_color] = color
+
+    slowest = retrieve_slowest(config)
+    if slowest < 0:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_SLOWEST.cmdoption_str}: invalid value '{slowest}', "
+            "expected a non-negative integer"
+        )
+
+    rollup_depth = retrieve_rollup_depth(config)
+    if rollup_depth < 0:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_ROLLUP_DEPTH.cmdoption_str}: invalid value '{rollup_depth}', "
+            "expected a non-negative integer"
+        )
+
+    max_rows = retrieve_max_rows(config)
+    max_bytes = retrieve_max_bytes(config)
+    for option, value in (
+        (Option.MD_REPORT_MAX_ROWS, max_rows),
+        (Option.MD_REPORT_MAX_BYTES, max_bytes),
+    ):
+        if value is not None and value < 1:
+            raise pytest.UsageError(
+                f"{option.cmdoption_str}: invalid value '{value}', expected a positive integer"
+            )
+
+    snapshot_interval = retrieve_snapshot_interval(config)
+    if snapshot_interval is not None and snapshot_interval <= 0:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_SNAPSHOT_INTERVAL.cmdoption_str}: invalid value "
+            f"'{snapshot_interval}', expected a positive number"
+        )
+
+    snapshot_tests = retrieve_snapshot_tests(config)
+    if snapshot_tests is not None and snapshot_tests < 1:
+        raise pytest.UsageError(
+            f"{Option.MD_REPORT_SNAPSHOT_TESTS.cmdoption_str}: invalid value "
+            f"'{snapshot_tests}', expected a positive integer"
+        )
+
+    output_filepath = retrieve_output_filepath(config)
+    if snapshot_interval is not None or snapshot_tests is not None:
+        # snapshots rewrite the whole output file
+        if not (output_filepath and output_filepath.strip()):
+            raise pytest.UsageError(
+                f"{Option.MD_REPORT_SNAPSHOT_INTERVAL.cmdoption_str}/"
+                f"{Option.MD_REPORT_SNAPSHOT_TESTS.cmdoption_str}: "
+                f"requires {Option.MD_REPORT_OUTPUT.cmdoption_str}"
+            )
+        if write_mode == WriteMode.APPEND:
+            raise pytest.UsageError(
+                f"{Option.MD_REPORT_SNAPSHOT_INTERVAL.cmdoption_str}/"
+                f"{Option.MD_REPORT_SNAPSHOT_TESTS.cmdoption_str}: "
+                f"cannot be used with the '{WriteMode.APPEND}' write mode"
+            )
+
+    return ReportSettings(
+        verbosity_level=retrieve_verbosity_level(config),
+        output_filepath=output_filepath,
+        is_tee=retrieve_tee(config),
+        color_policy=color_policy,
+        md_flavor=md_flavor,
+        margin=retrieve_report_margin(config),
+        zeros=zeros,
+        exclude_outcomes=tuple(retrieve_exclude_outcomes(config)),
+        color_map=MappingProxyType(color_map),
+        is_xdist_aggregate=retrieve_xdist_aggregate(config),
+        # a histogram of durations is shown along with the other columns of durations
+        is_durations=retrieve_durations(config) or duration_histogram is not None,
+        duration_threshold=retrieve_duration_threshold(config),
+        duration_histogram=duration_histogram,
+        slowest=slowest,
+        rollup_depth=rollup_depth,
+        expand_params=expand_params,
+        max_rows=max_rows,
+        max_bytes=max_bytes,
+        snapshot_interval=snapshot_interval,
+        snapshot_tests=snapshot_tests,
+        is_crash_safe=retrieve_crash_safe(config),
+        write_mode=write_mode,
+        is_baseline=retrieve_baseline(config),
+        json_output_filepath=retrieve_json_output_filepath(config),
+        json_format=json_format,
+        is_profile=retrieve_profile(config),
+    )
+
+
+def _get_report_settings(config: Config) -> ReportSettings:
+    settings = _find_session_object(config, settings_key)
+    if settings is None:
+        # called outside of a session that creates a report
+        settings = resolve_report_settings(config)
+
+    return settings
+
+
+def _get_profiler(config: Config) -> PhaseProfiler:
+    profiler = _find_session_object(config, profiler_key)
+    if profiler is None:
+        profiler = PhaseProfiler(enabled=False)
+
+    return profiler
+
+
 def _normalize_stat_name(name: str) -> str:
     if name == "error":
         return "errors"
@@ -435,7 +1157,12 @@ def extract_pytest_stats(
                 continue
 
             filesystempath = os.path.normpath(filesystempath).replace("\\", "/")
-            testfunc = value.head_line.split("[")[0]
+            if verbosity_level >= 2:
+                # every parameter set is a row: filtering by --md-report-expand-params
+                # requires the incremental aggregate
+                testfunc = value.head_line
+            else:
+                testfunc = value.head_line.split("[")[0]
 
             if verbosity_level == 0:
                 key: tuple = (filesystempath,)
@@ -452,68 +1179,384 @@ def extract_pytest_stats(
     return results_per_testfunc
 
 
-def make_md_report(
+def _extract_report_outcomes(settings: ReportSettings, total_stats: Mapping[str, int]) -> list[str]:
+    outcomes = [key for key in OUTCOMES if key not in settings.exclude_outcomes]
+
+    return [key for key in outcomes if total_stats.get(key, 0) > 0]
+
+
+def _to_duration_values(durations: DurationStats, histogram_style: Optional[str]) -> list[Any]:
+    values: list[Any] = [durations.total_seconds, durations.max_seconds, durations.mean_seconds]
+    if histogram_style is not None:
+        from ._histogram import to_histogram_values
+
+        values += to_histogram_values(durations.histogram, histogram_style)
+
+    return values
+
+
+def _to_delta_values(delta: "BaselineDelta", is_durations: bool) -> list[Any]:
+    if is_durations:
+        return [delta.new_failures, delta.fixed, delta.duration_change]
+
+    return [delta.new_failures, delta.fixed]
+
+
+def _diff_baseline(
+    baseline: "Baseline",
+    results_per_testfunc: Mapping[tuple, Mapping[str, int]],
+    durations_per_testfunc: Optional[Mapping[tuple, DurationStats]],
+) -> tuple[Optional[dict[tuple, "BaselineDelta"]], Optional["BaselineDelta"]]:
+    """
+    Compute the changes of the rows from the baseline, and record the rows to the baseline.
+    Changes are not computed if there is no previous run.
+    """
+
+    from ._baseline import ZERO_DELTA
+
+    deltas_per_testfunc: Optional[dict[tuple, "BaselineDelta"]] = {} if len(baseline) > 0 else None
+    total_delta = ZERO_DELTA
+    for key, results in results_per_testfunc.items():
+        durations = durations_per_testfunc[key] if durations_per_testfunc is not None else None
+        if deltas_per_testfunc is not None:
+            delta = baseline.diff(key, results, durations)
+            deltas_per_testfunc[key] = delta
+            total_delta += delta
+        baseline.update(key, results, durations)
+
+    if deltas_per_testfunc is None:
+        return (None, None)
+
+    return (deltas_per_testfunc, total_delta)
+
+
+def _to_key_headers(verbosity_level: int) -> list[str]:
+    if verbosity_level == 0:
+        return [Header.FILEPATH]
+
+    return [Header.FILEPATH, Header.TESTFUNC]
+
+
+def _to_headers(
+    key_headers: Sequence[str],
+    outcomes: Sequence[str],
+    is_durations: bool,
+    histogram_style: Optional[str] = None,
+) -> list[str]:
+    headers = list(key_headers) + list(outcomes) + [Header.SUBTOTAL]
+    if is_durations:
+        headers += [Header.DURATION, Header.MAX_DURATION, Header.MEAN_DURATION]
+        if histogram_style == HistogramStyle.SPARKLINE:
+            headers.append(Header.DURATION_HISTOGRAM)
+        elif histogram_style == HistogramStyle.COLUMNS:
+            from ._histogram import HISTOGRAM_HEADERS
+
+            headers += HISTOGRAM_HEADERS
+
+    return headers
+
+
+def _iter_report_rows(
+    results_per_testfunc: Mapping[tuple, Mapping[str, int]],
+    outcomes: Sequence[str],
+    total_stats: Mapping[str, int],
+    verbosity_level: int,
+    durations_per_testfunc: Optional[Mapping[tuple, DurationStats]] = None,
+    total_durations: Optional[DurationStats] = None,
+    deltas_per_testfunc: Optional[Mapping[tuple, "BaselineDelta"]] = None,
+    total_delta: Optional["BaselineDelta"] = None,
+    histogram_style: Optional[str] = None,
+) -> Iterator[list[Any]]:
+    is_durations = durations_per_testfunc is not None
+
+    for key, results in results_per_testfunc.items():
+        row: list[Any] = (
+            list(key) + [results.get(key, 0) for key in outcomes] + [sum(results.values())]
+        )
+        if durations_per_testfunc is not None:
+            row += _to_duration_values(durations_per_testfunc[key], histogram_style)
+        if deltas_per_testfunc is not None:
+            row += _to_delta_values(deltas_per_testfunc[key], is_durations)
+        yield row
+
+    total_row_key = ["TOTAL"] if verbosity_level == 0 else ["TOTAL", ""]
+    total_row: list[Any] = (
+        total_row_key + [total_stats.get(key, 0) for key in outcomes] + [sum(total_stats.values())]
+    )
+    if total_durations is not None:
+        total_row += _to_duration_values(total_durations, histogram_style)
+    if total_delta is not None:
+        total_row += _to_delta_values(total_delta, is_durations)
+    yield total_row
+
+
+def _rollup_directories(
+    depth: int,
+    outcomes: Sequence[str],
+    results_per_testfunc: Mapping[tuple, Mapping[str, int]],
+    durations_per_testfunc: Optional[Mapping[tuple, DurationStats]],
+) -> tuple[Mapping[tuple, Mapping[str, int]], Optional[Mapping[tuple, DurationStats]]]:
+    from ._rollup import DirectoryTree
+
+    tree = DirectoryTree(outcomes, depth)
+    for key, results in results_per_testfunc.items():
+        tree.add(
+            key[0],
+            results,
+            durations_per_testfunc[key] if durations_per_testfunc is not None else None,
+        )
+
+    if durations_per_testfunc is None:
+        return (tree.extract_results(), None)
+
+    return (tree.extract_results(), tree.extract_durations())
+
+
+def _to_row_unit(settings: ReportSettings, verbosity_level: int) -> "RowUnit":
+    from ._budget import RowUnit
+
+    if settings.rollup_depth > 0:
+        return RowUnit("directory", "directories")
+    if verbosity_level == 0:
+        return RowUnit("file", "files")
+    if verbosity_level == 1:
+        return RowUnit("function", "functions")
+
+    return RowUnit("test", "tests")
+
+
+def _fit_report_rows(
+    settings: ReportSettings,
+    headers: Sequence[str],
+    outcomes: Sequence[str],
+    num_key_columns: int,
+    unit: "RowUnit",
+    results_per_testfunc: Mapping[tuple, Mapping[str, int]],
+    durations_per_testfunc: Optional[Mapping[tuple, DurationStats]],
+    total_stats: Mapping[str, int],
+    total_durations: Optional[DurationStats],
+    deltas_per_testfunc: Optional[Mapping[tuple, "BaselineDelta"]],
+    total_delta: Optional["BaselineDelta"],
+    byte_budget: Optional[int],
+) -> "FittedRows":
+    from pytablewriter.writer.text import MarkdownFlavor
+
+    from ._budget import RowBudgetPlanner
+
+    return RowBudgetPlanner(
+        headers=headers,
+        outcomes=outcomes,
+        num_key_columns=num_key_columns,
+        margin=settings.margin,
+        is_kramdown=settings.md_flavor == MarkdownFlavor.KRAMDOWN,
+        unit=unit,
+        histogram_style=settings.duration_histogram,
+        # rows of directories are subtotals of the subdirectories
+        is_nested_rows=settings.rollup_depth > 0,
+    ).fit(
+        results_per_testfunc,
+        durations_per_testfunc,
+        total_stats=total_stats,
+        total_durations=total_durations,
+        max_rows=settings.max_rows,
+        max_bytes=byte_budget,
+        deltas_per_testfunc=deltas_per_testfunc,
+        total_delta=total_delta,
+    )
+
+
+def build_report_table(
     config: Config,
     reporter: TerminalReporter,
     total_stats: Mapping[str, int],
-    color_policy: ColorPolicy,
-    apply_ansi_escape: bool,
-    md_flavor: MarkdownFlavor,
-) -> str:
-    verbosity_level = retrieve_verbosity_level(config)
-    exclude_outcomes = retrieve_exclude_outcomes(config)
+    reserved_bytes: int = 0,
+) -> Optional["ReportTable"]:
+    """
+    Build a report table that is shared by all of the outputs of a session.
+    Returns |None| if there is nothing to report.
 
-    outcomes = ["passed", "failed", "error", "skipped", "xfailed", "xpassed"]
-    outcomes = [key for key in outcomes if key not in exclude_outcomes]
-    outcomes = [key for key in outcomes if total_stats.get(key, 0) > 0]
+    When the number of rows or bytes of a report is limited, ``reserved_bytes`` is
+    subtracted from the byte budget for the other contents of the outputs.
+    """
 
-    if not outcomes:
-        return ""
+    from ._table import ReportTable
 
-    results_per_testfunc = extract_pytest_stats(
-        reporter=reporter, outcomes=outcomes, verbosity_level=verbosity_level
-    )
+    settings = _get_report_settings(config)
+    verbosity_level = settings.verbosity_level
+    if verbosity_level < 0:
+        return None
 
-    writer = TableWriterFactory.create_from_format_name(
-        "md", flavor=md_flavor.value, colorize_terminal=apply_ansi_escape
+    outcomes = _extract_report_outcomes(settings, total_stats)
+    if not outcomes:
+        return None
+
+    profiler = _get_profiler(config)
+    aggregator = _find_session_object(config, aggregator_key)
+    durations_per_testfunc = None
+    total_durations = None
+    with profiler.measure(Phase.EXTRACTION):
+        if aggregator is not None:
+            results_per_testfunc = aggregator.extract_results(outcomes)
+            if settings.is_durations:
+                # durations are available only when aggregated by the plugin
+                durations_per_testfunc = aggregator.extract_durations()
+                total_durations = aggregator.total_durations
+        else:
+            results_per_testfunc = extract_pytest_stats(
+                reporter=reporter, outcomes=outcomes, verbosity_level=verbosity_level
+            )
+
+    if settings.rollup_depth > 0:
+        with profiler.measure(Phase.EXTRACTION):
+            results_per_testfunc, durations_per_testfunc = _rollup_directories(
+                settings.rollup_depth, outcomes, results_per_testfunc, durations_per_testfunc
+            )
+        # directories are the only key of rows
+        verbosity_level = 0
+
+    key_headers = _to_key_headers(verbosity_level)
+    headers = _to_headers(
+        key_headers,
+        outcomes,
+        is_durations=durations_per_testfunc is not None,
+        histogram_style=settings.duration_histogram,
     )
 
-    matrix = [
-        list(key) + [results.get(key, 0) for key in outcomes] + [sum(results.values())]
-        for key, results in results_per_testfunc.items()
-    ]
-    if verbosity_level == 0:
-        writer.headers = [Header.FILEPATH] + outcomes + [Header.SUBTOTAL]
-        matrix.append(
-            ["TOTAL"] + [total_stats.get(key, 0) for key in outcomes] + [sum(total_stats.values())]
-        )
-    elif verbosity_level >= 1:
-        writer.headers = [Header.FILEPATH, Header.TESTFUNC] + outcomes + [Header.SUBTOTAL]
-        matrix.append(
-            ["TOTAL", ""]
-            + [total_stats.get(key, 0) for key in outcomes]
-            + [sum(total_stats.values())]
+    baseline = _find_session_object(config, baseline_key)
+    deltas_per_testfunc: Optional[Mapping[tuple, "BaselineDelta"]] = None
+    total_delta = None
+    if baseline is not None:
+        with profiler.measure(Phase.MATRIX):
+            deltas_per_testfunc, total_delta = _diff_baseline(
+                baseline, results_per_testfunc, durations_per_testfunc
+            )
+        if deltas_per_testfunc is not None:
+            headers += [Header.NEW_FAILURES, Header.FIXED]
+            if durations_per_testfunc is not None:
+                headers.append(Header.DURATION_CHANGE)
+
+    byte_budget = None
+    if settings.max_bytes is not None:
+        byte_budget = max(settings.max_bytes - reserved_bytes, 0)
+    if settings.max_rows is not None or byte_budget is not None:
+        with profiler.measure(Phase.MATRIX):
+            fitted_rows = _fit_report_rows(
+                settings,
+                headers,
+                outcomes,
+                len(key_headers),
+                _to_row_unit(settings, verbosity_level),
+                results_per_testfunc,
+                durations_per_testfunc,
+                total_stats,
+                total_durations,
+                deltas_per_testfunc,
+                total_delta,
+                byte_budget,
+            )
+        results_per_testfunc = fitted_rows.results_per_testfunc
+        durations_per_testfunc = fitted_rows.durations_per_testfunc
+        deltas_per_testfunc = fitted_rows.deltas_per_testfunc
+        if not fitted_rows.is_within_budget and not _find_session_object(config, budget_warned_key):
+            # warned once per session: snapshots are built from the same settings
+            _set_session_object(config, budget_warned_key, True)
+            reporter.write_line(
+                f"md-report: the report exceeds {Option.MD_REPORT_MAX_BYTES.cmdoption_str}: "
+                f"the header, collapsed, and TOTAL rows do not fit in {byte_budget} bytes."
+            )
+
+    with profiler.measure(Phase.MATRIX):
+        return ReportTable(
+            headers=headers,
+            num_key_columns=len(key_headers),
+            value_matrix=lambda: _iter_report_rows(
+                results_per_testfunc,
+                outcomes,
+                total_stats,
+                verbosity_level,
+                durations_per_testfunc=durations_per_testfunc,
+                total_durations=total_durations,
+                deltas_per_testfunc=deltas_per_testfunc,
+                total_delta=total_delta,
+                histogram_style=settings.duration_histogram,
+            ),
+            duration_threshold=settings.duration_threshold,
+            byte_budget=byte_budget,
         )
 
-    writer.margin = retrieve_report_margin(config)
-    writer.value_matrix = matrix
 
-    if color_policy != ColorPolicy.NEVER:
+def write_report_table(
+    stream: TextIO,
+    config: Config,
+    table: "ReportTable",
+    color_policy: ColorPolicy,
+    apply_ansi_escape: bool,
+    md_flavor: "MarkdownFlavor",
+    style_plans: Optional[dict[ColorPolicy, "StylePlan"]] = None,
+) -> None:
+    """
+    Write a report table to a stream. ``style_plans`` caches the styles of the table
+    per color policy, to share them between the outputs of the same table.
+
+    Rows without styles are streamed to the output. Rows with styles are stored, as
+    pytablewriter renders the whole table: within a byte budget, the rendered table is
+    also buffered to check the size.
+    """
+
+    from pytablewriter import TableWriterFactory
+    from pytablewriter.style import Style
+    from typepy import String
+
+    from ._stream_writer import MarkdownStreamWriter
+    from ._style_filter import StylePlan, col_separator_style_filter, style_filter
+
+    settings = _get_report_settings(config)
+    profiler = _get_profiler(config)
+    margin = settings.margin
+    report_zeros = settings.zeros
+
+    if color_policy == ColorPolicy.NEVER:
+        # styles are not applied: write rows to the stream without rendering the whole table
+        render_zeros = report_zeros != ZerosRender.EMPTY
+        with profiler.measure(Phase.RENDERING):
+            MarkdownStreamWriter(
+                headers=table.headers,
+                number_columns=table.number_columns,
+                flavor=md_flavor,
+                margin=margin,
+                render_zeros=render_zeros,
+            ).write_table(
+                stream,
+                table.iter_rows,
+                column_layout=table.retrieve_column_layout(render_zeros),
+            )
+        return
+
+    with profiler.measure(Phase.STYLING):
+        writer = TableWriterFactory.create_from_format_name(
+            "md", flavor=md_flavor.value, colorize_terminal=apply_ansi_escape
+        )
+        writer.headers = table.headers
+        writer.margin = margin
+        writer.value_matrix = table.value_matrix
+        if table.duration_columns:
+            # render formatted durations as they are, aligned right
+            writer.type_hints = [
+                String if col in table.duration_columns else None
+                for col in range(len(table.headers))
+            ]
+            writer.column_styles = [
+                Style(align="right") if col in table.duration_columns else None
+                for col in range(len(table.headers))
+            ]
+        style_plan = style_plans.get(color_policy) if style_plans is not None else None
+        if style_plan is None:
+            style_plan = StylePlan(table, color_policy, settings.color_map)
+            if style_plans is not None:
+                style_plans[color_policy] = style_plan
         writer.style_filter_kwargs = {
-            "color_policy": color_policy,
-            "color_map": {
-                FGColor.SUCCESS: retrieve_report_results_color(
-                    config, Option.MD_REPORT_SUCCESS_COLOR, Default.FGColor.SUCCESS
-                ),
-                FGColor.ERROR: retrieve_report_results_color(
-                    config, Option.MD_REPORT_ERROR_COLOR, Default.FGColor.ERROR
-                ),
-                FGColor.SKIP: retrieve_report_results_color(
-                    config, Option.MD_REPORT_SKIP_COLOR, Default.FGColor.SKIP
-                ),
-                FGColor.GRAYOUT: Default.FGColor.GRAYOUT,
-            },
-            "num_rows": len(writer.value_matrix),
+            "style_plan": style_plan,
+            "num_rows": len(table.value_matrix),
         }
 
         if not _is_travis_ci():
@@ -522,16 +1565,114 @@ def make_md_report(
         if color_policy == ColorPolicy.AUTO and not _is_ci():
             writer.add_col_separator_style_filter(col_separator_style_filter)
 
-    report_zeros = retrieve_report_zeros(config)
-    if report_zeros == ZerosRender.EMPTY:
-        writer.register_trans_func(zero_to_nullstr)
+        if report_zeros == ZerosRender.EMPTY:
+            writer.register_trans_func(zero_to_nullstr)
+
+    if table.byte_budget is None:
+        with profiler.measure(Phase.RENDERING):
+            writer.stream = stream
+            writer.write_table()
+        return
+
+    # the rows fit in the budget without styles: styles may exceed the budget
+    with profiler.measure(Phase.RENDERING):
+        buffer = io.StringIO()
+        writer.stream = buffer
+        writer.write_table()
+        styled_table = buffer.getvalue()
+
+    if len(styled_table.encode("utf-8")) <= table.byte_budget:
+        stream.write(styled_table)
+        return
+
+    write_report_table(
+        stream,
+        config,
+        table,
+        color_policy=ColorPolicy.NEVER,
+        apply_ansi_escape=False,
+        md_flavor=md_flavor,
+    )
+
+
+def write_md_report(
+    stream: TextIO,
+    config: Config,
+    reporter: TerminalReporter,
+    total_stats: Mapping[str, int],
+    color_policy: ColorPolicy,
+    apply_ansi_escape: bool,
+    md_flavor: "MarkdownFlavor",
+) -> None:
+    table = build_report_table(config, reporter, total_stats)
+    if table is None:
+        return
+
+    write_report_table(
+        stream,
+        config,
+        table,
+        color_policy=color_policy,
+        apply_ansi_escape=apply_ansi_escape,
+        md_flavor=md_flavor,
+    )
+
 
-    return writer.dumps()
+def write_slowest_table(
+    stream: TextIO, config: Config, slowest_tests: Sequence[SlowTest], md_flavor: "MarkdownFlavor"
+) -> None:
+    """
+    Write a table of the slowest phases of tests, in descending order of durations.
+    """
+
+    from ._stream_writer import MarkdownStreamWriter
+
+    settings = _get_report_settings(config)
+    profiler = _get_profiler(config)
+
+    with profiler.measure(Phase.RENDERING):
+        MarkdownStreamWriter(
+            headers=[Header.NODEID, Header.PHASE, Header.DURATION, Header.OUTCOME],
+            number_columns=[False, False, True, False],
+            flavor=md_flavor,
+            margin=settings.margin,
+            render_zeros=True,
+        ).write_table(
+            stream,
+            lambda: (
+                [test.nodeid, test.phase, f"{test.duration:.3f}", test.outcome]
+                for test in slowest_tests
+            ),
+        )
+
+
+def make_md_report(
+    config: Config,
+    reporter: TerminalReporter,
+    total_stats: Mapping[str, int],
+    color_policy: ColorPolicy,
+    apply_ansi_escape: bool,
+    md_flavor: "MarkdownFlavor",
+) -> str:
+    stream = io.StringIO()
+    write_md_report(
+        stream,
+        config,
+        reporter,
+        total_stats,
+        color_policy=color_policy,
+        apply_ansi_escape=apply_ansi_escape,
+        md_flavor=md_flavor,
+    )
+
+    return stream.getvalue()
 
 
 def extract_file_color_policy(
-    color_policy: ColorPolicy, is_output_file: bool, md_flavor: MarkdownFlavor
+    color_policy: ColorPolicy, is_output_file: bool, md_flavor: "MarkdownFlavor"
 ) -> ColorPolicy:
+    from pytablewriter.writer.text import MarkdownFlavor
+
     file_color_policy = color_policy
     if is_output_file and color_policy == ColorPolicy.AUTO:
         if md_flavor != MarkdownFlavor.GFM:
@@ -540,61 +1681,400 @@ def extract_file_color_policy(
     return file_color_policy
 
 
-def pytest_unconfigure(config: Config) -> None:
+def _import_report_modules() -> None:
+    # import the modules that are lazily imported when creating a report in advance,
+    # to exclude import time from the other phases
+    import pytablewriter  # noqa: F401
+    import tcolorpy  # noqa: F401
+    import typepy  # noqa: F401
+
+    from . import (  # noqa: F401
+        _baseline,
+        _budget,
+        _json_writer,
+        _rollup,
+        _stream_writer,
+        _style_filter,
+        _table,
+    )
+
+
+def _to_baseline_cache_key(settings: ReportSettings) -> str:
+    # keys of rows depend on the kind of the rows
+    if settings.rollup_depth > 0:
+        kind = f"directories-{settings.rollup_depth}"
+    elif settings.verbosity_level == 0:
+        kind = "files"
+    elif settings.verbosity_level == 1:
+        kind = "functions"
+    else:
+        kind = f"params-{settings.expand_params}"
+
+    return f"md-report/baseline-{kind}"
+
+
+def pytest_configure(config: Config) -> None:
     if not is_make_md_report(config):
         return
 
+    profiler = PhaseProfiler(enabled=retrieve_profile(config))
+    _set_session_object(config, profiler_key, profiler)
+    if profiler.enabled:
+        with profiler.measure_time(Phase.IMPORT):
+            _import_report_modules()
+
+    # fail fast on invalid settings before running tests
+    with profiler.measure(Phase.SETTINGS):
+        settings = resolve_report_settings(config)
+    _set_session_object(config, settings_key, settings)
+
+    if is_xdist_worker(config) and not settings.is_xdist_aggregate:
+        return
+
+    aggregator = StatsAggregator(
+        verbosity_level=settings.verbosity_level,
+        expand_params=settings.expand_params,
+        duration_threshold=settings.duration_threshold,
+        is_histogram=settings.duration_histogram is not None,
+    )
+    _set_session_object(config, aggregator_key, aggregator)
+    slowest = None
+    if settings.slowest > 0:
+        slowest = SlowestTests(settings.slowest)
+        _set_session_object(config, slowest_key, slowest)
+    cache = getattr(config, "cache", None)
+    if settings.is_baseline and cache is not None and not is_xdist_worker(config):
+        from ._baseline import Baseline
+
+        baseline = Baseline.from_cache_value(cache.get(_to_baseline_cache_key(settings), None))
+        _set_session_object(config, baseline_key, baseline)
+    snapshot = None
+    if (
+        settings.snapshot_interval is not None or settings.snapshot_tests is not None
+    ) and not is_xdist_worker(config):
+        snapshot = SnapshotScheduler(
+            lambda num_tests: _write_snapshot(config, num_tests),
+            interval=settings.snapshot_interval,
+            num_tests=settings.snapshot_tests,
+        )
+    exit_flusher = None
+    if settings.is_crash_safe and not is_xdist_worker(config):
+        exit_flusher = ExitFlusher(
+            lambda reason: _write_partial_report(config, collector.running_nodeids, reason)
+        )
+    collector = ReportCollector(
+        config,
+        aggregator,
+        is_xdist_aggregate=settings.is_xdist_aggregate,
+        is_durations=settings.is_durations,
+        slowest=slowest,
+        snapshot=snapshot,
+        exit_flusher=exit_flusher,
+    )
+    config.pluginmanager.register(collector, "md-report-collector")
+
+    if exit_flusher is not None:
+        exit_flusher.install()
+        _set_session_object(config, exit_flusher_key, exit_flusher)
+
+
+def pytest_unconfigure(config: Config) -> None:
+    aggregator = _find_session_object(config, aggregator_key)
+    if aggregator is None:
+        return
+
+    exit_flusher = _find_session_object(config, exit_flusher_key)
+    if exit_flusher is not None:
+        # the session is finishing: the complete report is written below
+        exit_flusher.uninstall()
+
+    if is_xdist_worker(config):
+        # reports are created by the pytest-xdist controller
+        return
+
     reporter = config.pluginmanager.get_plugin("terminalreporter")
     if reporter is None:
         return
 
-    stat_count_map = retrieve_stat_count_map(reporter)
-    is_tee = retrieve_tee(config)
-    output_filepath = retrieve_output_filepath(config)
-    color_policy = retrieve_color_policy(config)
-    md_flavor = retrieve_md_flavor(config)
+    settings = _get_session_object(config, settings_key)
+    slowest_table = _render_slowest_table(config)
+    table = build_report_table(
+        config,
+        reporter,
+        aggregator.total_stats,
+        reserved_bytes=_calc_reserved_bytes(slowest_table),
+    )
+    if table is not None or slowest_table:
+        _write_report_outputs(config, reporter, table, slowest_table)
+
+    if settings.json_output_filepath:
+        _write_json_output(config, aggregator)
+
+    baseline = _find_session_object(config, baseline_key)
+    if baseline is not None:
+        config.cache.set(_to_baseline_cache_key(settings), baseline.to_cache_value())
+
+    profiler = _get_session_object(config, profiler_key)
+    if profiler.enabled:
+        reporter.write_sep("-", "md-report profile")
+        for line in profiler.to_lines():
+            reporter.write_line(line)
+
+
+def _render_slowest_table(config: Config) -> str:
+    # written as is to every output: rendered once, and its size is excluded
+    # from the byte budget of the report table.
+    # the slowest tests are halved until the table fits in half of the budget.
+    settings = _get_session_object(config, settings_key)
+    slowest = _find_session_object(config, slowest_key)
+    if slowest is None or len(slowest) == 0:
+        return ""
+
+    slowest_tests = slowest.extract()
+    while slowest_tests:
+        stream = io.StringIO()
+        write_slowest_table(stream, config, slowest_tests, settings.md_flavor)
+        slowest_table = stream.getvalue()
+        if settings.max_bytes is None or 2 * len(slowest_table.encode("utf-8")) <= (
+            settings.max_bytes
+        ):
+            return slowest_table
+
+        slowest_tests = slowest_tests[: len(slowest_tests) // 2]
+
+    return ""
+
+
+def _calc_reserved_bytes(slowest_table: str, note: str = "") -> int:
+    # the slowest table and the note are separated by blank lines
+    reserved_bytes = 0
+    for text in (slowest_table, note):
+        if text:
+            reserved_bytes += len(text.encode("utf-8")) + 1
+
+    return reserved_bytes
+
+
+def _write_snapshot(config: Config, num_tests: int) -> None:
+    """
+    Rewrite the output file with a snapshot of the report from the incremental aggregate.
+    Snapshots are written atomically, so that readers never observe a partial snapshot.
+    """
+
+    aggregator = _find_session_object(config, aggregator_key)
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if aggregator is None or reporter is None:
+        return
+
+    note = f"md-report: snapshot during the session, {num_tests} tests finished.\n"
+    with _get_profiler(config).measure_all(Phase.SNAPSHOT):
+        slowest_table = _render_slowest_table(config)
+        table = build_report_table(
+            config,
+            reporter,
+            aggregator.total_stats,
+            reserved_bytes=_calc_reserved_bytes(slowest_table, note),
+        )
+        if table is None and not slowest_table:
+            # consistent with the report at the end of the session
+            return
+
+        _write_report_file(config, table, slowest_table, WriteMode.ATOMIC, note=note)
 
-    is_output_term = is_tee or not output_filepath
-    is_output_file = is_not_null_string(output_filepath)
+
+def _write_partial_report(config: Config, running_nodeids: Sequence[str], reason: str) -> None:
+    """
+    Write a report from the aggregate at the moment, when a session ends without
+    ``pytest_unconfigure``. The report is marked as incomplete with the running tests.
+    """
+
+    aggregator = _find_session_object(config, aggregator_key)
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if aggregator is None or reporter is None:
+        return
+
+    note = f"md-report: incomplete report, {reason}"
+    if running_nodeids:
+        note += " while running: " + ", ".join(running_nodeids)
+    note += ".\n"
+
+    with _get_profiler(config).measure_all(Phase.PARTIAL):
+        settings = _get_session_object(config, settings_key)
+        slowest_table = _render_slowest_table(config)
+        table = build_report_table(
+            config,
+            reporter,
+            aggregator.total_stats,
+            reserved_bytes=_calc_reserved_bytes(slowest_table, note),
+        )
+        write_mode = (
+            WriteMode.APPEND if settings.write_mode == WriteMode.APPEND else WriteMode.ATOMIC
+        )
+
+        # a test may be running: outputs to the terminal are captured unless capturing is disabled.
+        # old versions of pytest cannot disable capturing
+        capture_manager = config.pluginmanager.get_plugin("capturemanager")
+        disable_capturing = getattr(capture_manager, "global_and_fixture_disabled", None)
+        with disable_capturing() if disable_capturing is not None else contextlib.nullcontext():
+            if settings.is_output_term:
+                # progress of the running test file may be on the current line
+                reporter.ensure_newline()
+            _write_report_outputs(
+                config, reporter, table, slowest_table, note=note, write_mode=write_mode
+            )
+            # the process may be terminated by the signal right after this function
+            reporter._tw.flush()
+
+
+def _write_report_outputs(
+    config: Config,
+    reporter: TerminalReporter,
+    table: Optional["ReportTable"],
+    slowest_table: str,
+    note: str = "",
+    write_mode: Optional[str] = None,
+) -> None:
+    settings = _get_session_object(config, settings_key)
+    color_policy = settings.color_policy
+    md_flavor = settings.md_flavor
+
+    is_output_term = settings.is_output_term
+    is_output_file = settings.is_output_file
     term_color_policy = color_policy
-    file_color_policy = extract_file_color_policy(color_policy, is_output_file, md_flavor)
 
-    apply_ansi_escape_to_file = is_apply_ansi_escape_to_file(color_policy, is_output_file)
     apply_ansi_escape_to_term = is_apply_ansi_escape_to_term(color_policy)
-    term_report = None
+    style_plans: dict[ColorPolicy, StylePlan] = {}
+    report = None
     if is_output_term:
-        term_report = make_md_report(
+        term_stream = cast(TextIO, reporter._tw)
+        is_same_report = (
+            is_output_file
+            # reports without styles are written to each output without buffering
+            and term_color_policy != ColorPolicy.NEVER
+            and extract_file_color_policy(color_policy, True, md_flavor) == term_color_policy
+            and is_apply_ansi_escape_to_file(color_policy, True) == apply_ansi_escape_to_term
+        )
+        if is_same_report:
+            # the file output is the same as the terminal output: rendered once
+            term_stream = io.StringIO()
+        _write_report(
+            term_stream,
             config,
-            reporter,
-            stat_count_map,
+            table,
+            slowest_table,
             color_policy=term_color_policy,
             apply_ansi_escape=apply_ansi_escape_to_term,
             md_flavor=md_flavor,
+            note=note,
+            style_plans=style_plans,
         )
-        reporter._tw.write(term_report)
+        if is_same_report:
+            report = cast(io.StringIO, term_stream).getvalue()
+            reporter._tw.write(report)
 
     if not is_output_file:
         return
 
-    file_report = term_report
-    gen_report_for_file_output = any(
-        [
-            not file_report,
-            file_color_policy != term_color_policy,
-            apply_ansi_escape_to_file != apply_ansi_escape_to_term,
-        ]
+    _write_report_file(
+        config,
+        table,
+        slowest_table,
+        write_mode if write_mode is not None else settings.write_mode,
+        note=note,
+        report=report,
+        style_plans=style_plans,
     )
-    if gen_report_for_file_output:
-        file_report = make_md_report(
+
+
+def _write_report_file(
+    config: Config,
+    table: Optional["ReportTable"],
+    slowest_table: str,
+    write_mode: str,
+    note: str = "",
+    report: Optional[str] = None,
+    style_plans: Optional[dict[ColorPolicy, "StylePlan"]] = None,
+) -> None:
+    """
+    Write a report to the output file. ``report`` is a report that is already rendered
+    for another output with the same colors.
+    """
+
+    settings = _get_session_object(config, settings_key)
+    profiler = _get_session_object(config, profiler_key)
+    output_filepath = settings.output_filepath
+    color_policy = settings.color_policy
+    md_flavor = settings.md_flavor
+    assert output_filepath
+
+    file_color_policy = extract_file_color_policy(color_policy, True, md_flavor)
+    apply_ansi_escape_to_file = is_apply_ansi_escape_to_file(color_policy, True)
+
+    # styling/rendering into the file are measured as nested phases:
+    # the file write phase is the time of opening, flushing, and closing the file
+    with profiler.measure(Phase.FILE_WRITE):
+        with open_report_file(output_filepath, write_mode) as f:
+            if report is not None:
+                f.write(report)
+                return
+
+            _write_report(
+                f,
+                config,
+                table,
+                slowest_table,
+                color_policy=file_color_policy,
+                apply_ansi_escape=apply_ansi_escape_to_file,
+                md_flavor=md_flavor,
+                note=note,
+                style_plans=style_plans,
+            )
+
+
+def _write_json_output(config: Config, aggregator: StatsAggregator) -> None:
+    from ._json_writer import write_json
+
+    settings = _get_session_object(config, settings_key)
+    profiler = _get_session_object(config, profiler_key)
+    assert settings.json_output_filepath
+
+    write_mode = (
+        WriteMode.ATOMIC if settings.write_mode == WriteMode.ATOMIC else WriteMode.OVERWRITE
+    )
+    with profiler.measure(Phase.FILE_WRITE):
+        with open_report_file(settings.json_output_filepath, write_mode) as f:
+            write_json(f, aggregator, settings.json_format, is_durations=settings.is_durations)
+
+
+def _write_report(
+    stream: TextIO,
+    config: Config,
+    table: Optional["ReportTable"],
+    slowest_table: str,
+    color_policy: ColorPolicy,
+    apply_ansi_escape: bool,
+    md_flavor: "MarkdownFlavor",
+    note: str = "",
+    style_plans: Optional[dict[ColorPolicy, "StylePlan"]] = None,
+) -> None:
+    if table is not None:
+        write_report_table(
+            stream,
             config,
-            reporter,
-            stat_count_map,
-            color_policy=file_color_policy,
-            apply_ansi_escape=apply_ansi_escape_to_file,
+            table,
+            color_policy=color_policy,
+            apply_ansi_escape=apply_ansi_escape,
             md_flavor=md_flavor,
+            style_plans=style_plans,
         )
 
-    if file_report:
-        assert output_filepath
-        with open(output_filepath, "w") as f:
-            f.write(file_report)
+    is_written = table is not None
+    for text in (slowest_table, note):
+        if not text:
+            continue
+
+        if is_written:
+            # a blank line separates the blocks in Markdown
+            stream.write("\n")
+        stream.write(text)
+        is_written = True
@@ -86,8 +86,11 @@ setuptools.setup(
     cmdclass=get_release_command_class(),
     zip_safe=False,
     entry_points={
+        "console_scripts": [
+            "pytest-md-report = pytest_md_report._cli:main",
+        ],
         "pytest11": [
             "pytest-md-report = pytest_md_report.plugin",
-        ]
+        ],
     },
 )
@@ -0,0 +1,233 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pytest_md_report._aggregator import DurationStats, StatsAggregator
+
+
+def make_report(filesystempath: str, domaininfo: str) -> SimpleNamespace:
+    return SimpleNamespace(location=(filesystempath, 0, domaininfo))
+
+
+class Test_StatsAggregator:
+    def test_add(self):
+        aggregator = StatsAggregator(verbosity_level=1)
+        aggregator.add("passed", make_report("tests/test_a.py", "test_a[1]"))
+        aggregator.add("passed", make_report("tests/test_a.py", "test_a[2]"))
+        aggregator.add("failed", make_report("tests/./test_a.py", "test_b"))
+        aggregator.add("skipped", SimpleNamespace())
+        aggregator.add("deselected", make_report("tests/test_a.py", "test_c"))
+
+        assert aggregator.total_stats == {
+            "passed": 2,
+            "failed": 1,
+            "error": 0,
+            "skipped": 1,
+            "xfailed": 0,
+            "xpassed": 0,
+        }
+        assert aggregator.extract_results(["passed", "failed"]) == {
+            ("tests/test_a.py", "test_a"): {"passed": 2},
+            ("tests/test_a.py", "test_b"): {"failed": 1},
+        }
+        assert aggregator.extract_results(["skipped"]) == {}
+
+    def test_extract_results_order(self):
+        # rows are grouped by outcomes in the order of the first appearance,
+        # as the terminal reporter groups the reports
+        aggregator = StatsAggregator(verbosity_level=1)
+        for outcome, testfunc in (
+            ("passed", "test_a"),
+            ("failed", "test_b"),
+            ("skipped", "test_c"),
+            ("passed", "test_d"),
+            ("failed", "test_a"),
+            ("skipped", "test_b"),
+        ):
+            aggregator.add(outcome, make_report("test_a.py", testfunc))
+
+        assert list(aggregator.extract_results(["passed", "failed", "skipped"])) == [
+            ("test_a.py", "test_a"),
+            ("test_a.py", "test_d"),
+            ("test_a.py", "test_b"),
+            ("test_a.py", "test_c"),
+        ]
+        assert list(aggregator.extract_results(["failed", "skipped"])) == [
+            ("test_a.py", "test_b"),
+            ("test_a.py", "test_a"),
+            ("test_a.py", "test_c"),
+        ]
+
+    @pytest.mark.parametrize(
+        ["expand_params", "expected"],
+        [
+            [
+                "all",
+                {
+                    ("test_a.py", "test_a[1]"): {"passed": 1},
+                    ("test_a.py", "test_a[2]"): {"passed": 1},
+                    ("test_a.py", "test_a[3]"): {"failed": 1},
+                },
+            ],
+            [
+                "failed",
+                {
+                    ("test_a.py", "test_a"): {"passed": 2},
+                    ("test_a.py", "test_a[3]"): {"failed": 1},
+                },
+            ],
+            [
+                "failed-or-slow",
+                {
+                    ("test_a.py", "test_a"): {"passed": 1},
+                    ("test_a.py", "test_a[2]"): {"passed": 1},
+                    ("test_a.py", "test_a[3]"): {"failed": 1},
+                },
+            ],
+        ],
+    )
+    def test_expand_params(self, expand_params, expected):
+        aggregator = StatsAggregator(
+            verbosity_level=2, expand_params=expand_params, duration_threshold=1.0
+        )
+        for domaininfo, outcome, duration in (
+            ("test_a[1]", "passed", 0.5),
+            ("test_a[2]", "passed", 2.0),
+            ("test_a[3]", "failed", 0.5),
+        ):
+            for when, phase_outcome, phase_duration in (
+                ("setup", "", 0.0),
+                ("call", outcome, duration),
+                ("teardown", "", 0.0),
+            ):
+                report = make_report("test_a.py", domaininfo)
+                report.nodeid = f"test_a.py::{domaininfo}"
+                report.when = when
+                report.duration = phase_duration
+                aggregator.add(phase_outcome, report)
+                aggregator.add_duration(report)
+
+        assert aggregator.extract_results(["passed", "failed"]) == expected
+        # durations are added to the same rows as the outcomes
+        assert aggregator.extract_durations().keys() == expected.keys()
+
+    def test_expand_params_per_test(self):
+        # the teardown error of a test that passed is added to the row of the call
+        aggregator = StatsAggregator(verbosity_level=2, expand_params="failed")
+        for when, outcome in (("setup", ""), ("call", "passed"), ("teardown", "error")):
+            report = make_report("test_a.py", "test_a[1]")
+            report.nodeid = "test_a.py::test_a[1]"
+            report.when = when
+            report.duration = 1.0
+            aggregator.add(outcome, report)
+            aggregator.add_duration(report)
+
+        assert aggregator.extract_results(["passed", "error"]) == {
+            ("test_a.py", "test_a"): {"passed": 1, "error": 1},
+        }
+        assert list(aggregator.extract_durations()) == [("test_a.py", "test_a")]
+        assert aggregator._StatsAggregator__expand_decisions == {}
+
+    @pytest.mark.parametrize(["is_durations"], [[True], [False]])
+    def test_expand_params_finished(self, is_durations):
+        aggregator = StatsAggregator(verbosity_level=2, expand_params="failed")
+        for i in range(10):
+            for when, outcome in (("setup", ""), ("call", "failed"), ("teardown", "error")):
+                report = make_report("test_a.py", f"test_a[{i}]")
+                report.nodeid = f"test_a.py::test_a[{i}]"
+                report.when = when
+                report.duration = 1.0
+                aggregator.add(outcome, report)
+                if is_durations:
+                    aggregator.add_duration(report)
+
+        collect_report = make_report("test_b.py", "test_b.py")
+        collect_report.nodeid = "test_b.py"
+        collect_report.when = "collect"
+        aggregator.add("error", collect_report)
+
+        # decisions of tests are not kept after the tests finished
+        assert aggregator._StatsAggregator__expand_decisions == {}
+        assert aggregator.extract_results(["failed", "error"])[("test_a.py", "test_a[0]")] == {
+            "failed": 1,
+            "error": 1,
+        }
+        if is_durations:
+            assert aggregator.extract_durations()[("test_a.py", "test_a[0]")] == DurationStats(
+                total_seconds=3.0, max_seconds=3.0, num_tests=1
+            )
+
+    def test_merge(self):
+        worker_a = StatsAggregator(verbosity_level=0)
+        worker_a.add("passed", make_report("test_a.py", "test_a"))
+        worker_a.add("error", make_report("test_b.py", "test_b"))
+        worker_b = StatsAggregator(verbosity_level=0)
+        worker_b.add("passed", make_report("test_a.py", "test_c"))
+
+        aggregator = StatsAggregator(verbosity_level=0)
+        aggregator.merge(worker_a.to_dict())
+        aggregator.merge(worker_b.to_dict())
+
+        assert aggregator.total_stats["passed"] == 2
+        assert aggregator.total_stats["error"] == 1
+        assert aggregator.extract_results(["passed", "error"]) == {
+            ("test_a.py",): {"passed": 2},
+            ("test_b.py",): {"error": 1},
+        }
+
+    def test_add_duration(self):
+        aggregator = StatsAggregator(verbosity_level=0)
+        for nodeid, durations in (
+            ("test_a.py::test_a", (0.5, 1.0, 0.5)),
+            ("test_a.py::test_b", (0.0, 3.0, 0.0)),
+            ("test_b.py::test_c", (0.25, 0.5, 0.25)),
+        ):
+            filesystempath = nodeid.split("::")[0]
+            for when, duration in zip(("setup", "call", "teardown"), durations):
+                report = make_report(filesystempath, nodeid.split("::")[1])
+                report.nodeid = nodeid
+                report.when = when
+                report.duration = duration
+                aggregator.add_duration(report)
+
+        assert aggregator.extract_durations() == {
+            ("test_a.py",): DurationStats(total_seconds=5.0, max_seconds=3.0, num_tests=2),
+            ("test_b.py",): DurationStats(total_seconds=1.0, max_seconds=1.0, num_tests=1),
+        }
+        assert aggregator.total_durations == DurationStats(
+            total_seconds=6.0, max_seconds=3.0, num_tests=3
+        )
+        assert aggregator.total_durations.mean_seconds == 2.0
+
+        merged = StatsAggregator(verbosity_level=0)
+        merged.merge(aggregator.to_dict())
+        merged.merge(aggregator.to_dict())
+        assert merged.extract_durations()[("test_a.py",)] == DurationStats(
+            total_seconds=10.0, max_seconds=3.0, num_tests=4
+        )
+        assert merged.total_durations.num_tests == 6
+
+    def test_add_duration_histogram(self):
+        aggregator = StatsAggregator(verbosity_level=0, is_histogram=True)
+        for nodeid, duration in (
+            ("test_a.py::test_a", 0.001),
+            ("test_a.py::test_b", 0.5),
+            ("test_a.py::test_c", 0.002),
+            ("test_b.py::test_d", 20.0),
+        ):
+            report = make_report(nodeid.split("::")[0], nodeid.split("::")[1])
+            report.nodeid = nodeid
+            report.when = "teardown"
+            report.duration = duration
+            aggregator.add_duration(report)
+
+        durations_per_file = aggregator.extract_durations()
+        assert durations_per_file[("test_a.py",)].histogram == (2, 0, 1, 0, 0)
+        assert durations_per_file[("test_b.py",)].histogram == (0, 0, 0, 0, 1)
+        assert aggregator.total_durations.histogram == (2, 0, 1, 0, 1)
+
+        merged = StatsAggregator(verbosity_level=0, is_histogram=True)
+        merged.merge(aggregator.to_dict())
+        merged.merge(aggregator.to_dict())
+        assert merged.extract_durations()[("test_a.py",)].histogram == (4, 0, 2, 0, 0)
+        assert merged.total_durations.histogram == (4, 0, 2, 0, 2)
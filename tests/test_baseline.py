@@ -0,0 +1,48 @@
+from pytest_md_report._aggregator import DurationStats
+from pytest_md_report._baseline import Baseline, BaselineDelta, BaselineRow
+
+
+class Test_Baseline:
+    def test_diff(self):
+        baseline = Baseline(
+            {
+                ("test_a.py",): BaselineRow(num_failures=1, total_seconds=1.0),
+                ("test_b.py",): BaselineRow(num_failures=0, total_seconds=None),
+            }
+        )
+
+        assert baseline.diff(
+            ("test_a.py",), {"passed": 2}, DurationStats(1.5, 1.0, 2)
+        ) == BaselineDelta(new_failures=0, fixed=1, duration_change=0.5)
+        assert baseline.diff(
+            ("test_b.py",), {"failed": 1, "error": 1}, DurationStats(1.0, 1.0, 2)
+        ) == BaselineDelta(new_failures=2, fixed=0, duration_change=None)
+        assert baseline.diff(("test_c.py",), {"failed": 1}, None) == BaselineDelta(
+            new_failures=1, fixed=0, duration_change=None
+        )
+
+    def test_add_delta(self):
+        assert BaselineDelta(1, 0, None) + BaselineDelta(0, 2, 0.5) == BaselineDelta(1, 2, 0.5)
+        assert BaselineDelta(1, 0, 0.25) + BaselineDelta(0, 2, 0.5) == BaselineDelta(1, 2, 0.75)
+
+    def test_cache_value(self):
+        baseline = Baseline(
+            {
+                ("test_a.py",): BaselineRow(num_failures=1, total_seconds=1.0),
+                ("test_b.py",): BaselineRow(num_failures=2, total_seconds=None),
+            }
+        )
+        baseline.update(("test_a.py",), {"passed": 1}, DurationStats(2.0, 2.0, 1))
+
+        # updates do not affect the diffs of the current run
+        assert baseline.diff(("test_a.py",), {"passed": 1}, None).fixed == 1
+
+        restored = Baseline.from_cache_value(baseline.to_cache_value())
+
+        assert len(restored) == 2
+        assert restored.diff(("test_a.py",), {"failed": 1}, None).new_failures == 1
+        assert restored.diff(("test_b.py",), {}, None).fixed == 2
+
+    def test_unknown_cache_value(self):
+        assert len(Baseline.from_cache_value(None)) == 0
+        assert len(Baseline.from_cache_value({"version": 0, "rows": []})) == 0
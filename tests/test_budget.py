@@ -0,0 +1,158 @@
+import io
+
+import pytest
+from pytablewriter.writer.text import MarkdownFlavor
+
+from pytest_md_report._aggregator import DurationStats
+from pytest_md_report._budget import RowBudgetPlanner, RowUnit
+from pytest_md_report._stream_writer import MarkdownStreamWriter
+
+
+HEADERS = ["filepath", "passed", "failed", "SUBTOTAL", "duration", "max duration", "mean duration"]
+OUTCOMES = ["passed", "failed"]
+RESULTS_PER_TESTFUNC = {
+    (f"tests/test_{i:02d}{'_日本語' if i % 5 == 0 else ''}.py",): (
+        {"passed": i, "failed": 1} if i % 4 == 0 else {"passed": i + 1}
+    )
+    for i in range(20)
+}
+DURATIONS_PER_TESTFUNC = {
+    key: DurationStats(float(i), 1.0, i + 1) for i, key in enumerate(RESULTS_PER_TESTFUNC)
+}
+TOTAL_STATS = {
+    "passed": sum(results.get("passed", 0) for results in RESULTS_PER_TESTFUNC.values()),
+    "failed": 5,
+}
+TOTAL_DURATIONS = DurationStats(190.0, 1.0, 210)
+
+
+def fit(max_rows, max_bytes, margin=1, flavor=MarkdownFlavor.COMMON_MARK):
+    return RowBudgetPlanner(
+        headers=HEADERS,
+        outcomes=OUTCOMES,
+        num_key_columns=1,
+        margin=margin,
+        is_kramdown=flavor == MarkdownFlavor.KRAMDOWN,
+        unit=RowUnit("file", "files"),
+    ).fit(
+        RESULTS_PER_TESTFUNC,
+        DURATIONS_PER_TESTFUNC,
+        total_stats=TOTAL_STATS,
+        total_durations=TOTAL_DURATIONS,
+        max_rows=max_rows,
+        max_bytes=max_bytes,
+    )
+
+
+def dumps(fitted_rows, margin, flavor) -> str:
+    rows = []
+    for key, results in list(fitted_rows.results_per_testfunc.items()) + [
+        (("TOTAL",), TOTAL_STATS)
+    ]:
+        durations = (
+            TOTAL_DURATIONS if key == ("TOTAL",) else fitted_rows.durations_per_testfunc[key]
+        )
+        rows.append(
+            list(key)
+            + [results.get(outcome, 0) for outcome in OUTCOMES]
+            + [sum(results.values())]
+            + [
+                f"{seconds:.3f}"
+                for seconds in (
+                    durations.total_seconds,
+                    durations.max_seconds,
+                    durations.mean_seconds,
+                )
+            ]
+        )
+
+    stream = io.StringIO()
+    MarkdownStreamWriter(
+        headers=HEADERS,
+        number_columns=[False] + [True] * 6,
+        flavor=flavor,
+        margin=margin,
+        render_zeros=True,
+    ).write_table(stream, lambda: rows)
+
+    return stream.getvalue()
+
+
+class Test_RowBudgetPlanner:
+    def test_within_budget(self):
+        fitted_rows = fit(max_rows=None, max_bytes=None)
+
+        assert fitted_rows.results_per_testfunc == RESULTS_PER_TESTFUNC
+        assert fitted_rows.num_omitted_rows == 0
+        assert fitted_rows.is_within_budget
+
+    def test_max_rows(self):
+        fitted_rows = fit(max_rows=4, max_bytes=None)
+
+        assert list(fitted_rows.results_per_testfunc.items()) == [
+            (("tests/test_00_日本語.py",), {"passed": 0, "failed": 1}),
+            (("tests/test_04.py",), {"passed": 4, "failed": 1}),
+            (("tests/test_08.py",), {"passed": 8, "failed": 1}),
+            (("17 other files",), {"passed": 193, "failed": 2}),
+        ]
+        assert fitted_rows.durations_per_testfunc[("17 other files",)] == DurationStats(
+            178.0, 1.0, 195
+        )
+        assert fitted_rows.num_omitted_rows == 17
+
+    def test_all_passed_label(self):
+        fitted_rows = fit(max_rows=6, max_bytes=None)
+
+        assert list(fitted_rows.results_per_testfunc)[-1] == ("15 other files passed",)
+
+    @pytest.mark.parametrize(["flavor"], [[MarkdownFlavor.COMMON_MARK], [MarkdownFlavor.KRAMDOWN]])
+    @pytest.mark.parametrize(["margin"], [[0], [1], [2]])
+    @pytest.mark.parametrize(["max_bytes"], [[900], [1200], [1500]])
+    def test_max_bytes(self, flavor, margin, max_bytes):
+        fitted_rows = fit(max_rows=None, max_bytes=max_bytes, margin=margin, flavor=flavor)
+        output = dumps(fitted_rows, margin, flavor)
+
+        assert fitted_rows.num_omitted_rows > 0
+        assert len(output.encode("utf-8")) <= max_bytes
+        # rows that have failed results are kept first
+        assert ("tests/test_00_日本語.py",) in fitted_rows.results_per_testfunc
+
+    def test_max_bytes_not_met(self):
+        # the header, collapsed, and TOTAL rows alone exceed the budget
+        fitted_rows = fit(max_rows=None, max_bytes=100)
+
+        assert list(fitted_rows.results_per_testfunc) == [("20 other files",)]
+        assert not fitted_rows.is_within_budget
+
+    def test_nested_rows(self):
+        results_per_testfunc = {
+            ("a/",): {"passed": 3, "failed": 1},
+            ("a/b/",): {"passed": 2},
+            ("a/b/c/",): {"passed": 1},
+            ("d/",): {"passed": 4},
+            ("e/",): {"failed": 1},
+        }
+
+        fitted_rows = RowBudgetPlanner(
+            headers=HEADERS[:4],
+            outcomes=OUTCOMES,
+            num_key_columns=1,
+            margin=1,
+            is_kramdown=False,
+            unit=RowUnit("directory", "directories"),
+            is_nested_rows=True,
+        ).fit(
+            results_per_testfunc,
+            None,
+            total_stats={"passed": 7, "failed": 2},
+            total_durations=None,
+            max_rows=3,
+            max_bytes=None,
+        )
+
+        # subdirectories of an omitted directory are not summed again
+        assert fitted_rows.results_per_testfunc == {
+            ("a/",): {"passed": 3, "failed": 1},
+            ("e/",): {"failed": 1},
+            ("3 other directories passed",): {"passed": 6},
+        }
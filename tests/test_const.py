@@ -0,0 +1,12 @@
+from pytablewriter.writer.text import MarkdownFlavor
+from tcolorpy import AnsiFGColor
+
+from pytest_md_report._const import COLOR_NAMES, MARKDOWN_FLAVORS
+
+
+def test_color_names():
+    assert COLOR_NAMES == "/".join([style.name.lower() for style in list(AnsiFGColor)])
+
+
+def test_markdown_flavors():
+    assert MARKDOWN_FLAVORS == tuple(flavor.value for flavor in MarkdownFlavor)
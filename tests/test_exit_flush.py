@@ -0,0 +1,80 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from pytest_md_report._exit_flush import ExitFlusher
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGUSR1 is not available on Windows")
+class Test_ExitFlusher:
+    def test_signal(self):
+        reasons = []
+        prev_signals = []
+        prev_handler = signal.signal(
+            signal.SIGUSR1, lambda signum, frame: prev_signals.append(signum)
+        )
+        try:
+            flusher = ExitFlusher(reasons.append, signals=[signal.SIGUSR1])
+            flusher.install()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            flusher.uninstall()
+        finally:
+            signal.signal(signal.SIGUSR1, prev_handler)
+
+        # flushed only once, and the previous handler is called for every signal
+        assert reasons == ["received SIGUSR1"]
+        assert prev_signals == [signal.SIGUSR1, signal.SIGUSR1]
+
+    def test_uninstall(self):
+        reasons = []
+        prev_signals = []
+        prev_handler = signal.signal(
+            signal.SIGUSR1, lambda signum, frame: prev_signals.append(signum)
+        )
+        try:
+            flusher = ExitFlusher(reasons.append, signals=[signal.SIGUSR1])
+            flusher.install()
+            flusher.uninstall()
+            os.kill(os.getpid(), signal.SIGUSR1)
+        finally:
+            signal.signal(signal.SIGUSR1, prev_handler)
+
+        assert reasons == []
+        assert prev_signals == [signal.SIGUSR1]
+
+    def test_defer_signals(self):
+        reasons = []
+        prev_signals = []
+        prev_handler = signal.signal(
+            signal.SIGUSR1, lambda signum, frame: prev_signals.append(signum)
+        )
+        try:
+            flusher = ExitFlusher(reasons.append, signals=[signal.SIGUSR1])
+            flusher.install()
+            with flusher.defer_signals():
+                with flusher.defer_signals():
+                    os.kill(os.getpid(), signal.SIGUSR1)
+                    os.kill(os.getpid(), signal.SIGUSR1)
+                assert reasons == []
+                assert prev_signals == []
+            flusher.uninstall()
+        finally:
+            signal.signal(signal.SIGUSR1, prev_handler)
+
+        # handled when the outermost block exits
+        assert reasons == ["received SIGUSR1"]
+        assert prev_signals == [signal.SIGUSR1, signal.SIGUSR1]
+
+    def test_prev_handler_not_from_python(self, monkeypatch):
+        handlers = []
+        monkeypatch.setattr(signal, "signal", lambda signum, handler: handlers.append(handler))
+
+        flusher = ExitFlusher(lambda reason: None, signals=[signal.SIGUSR1])
+        flusher.install()
+        flusher.uninstall()
+
+        # signal.signal returns None when the previous handler was not installed from Python
+        assert handlers[-1] == signal.SIG_DFL
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from pytest_md_report._const import WriteMode
+from pytest_md_report._file_writer import open_report_file
+
+
+class Test_open_report_file:
+    def test_overwrite(self, tmp_path):
+        filepath = str(tmp_path / "report.md")
+        for content in ["| a |\n", "| b |\n"]:
+            with open_report_file(filepath, WriteMode.OVERWRITE) as f:
+                f.write(content)
+
+        with open(filepath) as f:
+            assert f.read() == "| b |\n"
+
+    def test_append(self, tmp_path):
+        filepath = str(tmp_path / "report.md")
+        for content in ["| a |\n", "| b |\n"]:
+            with open_report_file(filepath, WriteMode.APPEND) as f:
+                f.write(content)
+
+        with open(filepath) as f:
+            assert f.read() == "| a |\n\n| b |\n"
+
+    def test_atomic(self, tmp_path):
+        filepath = str(tmp_path / "report.md")
+        with open(filepath, "w") as f:
+            f.write("previous")
+        os.chmod(filepath, 0o640)
+
+        with open_report_file(filepath, WriteMode.ATOMIC) as f:
+            f.write("| a |\n")
+            with open(filepath) as prev:
+                # the file is replaced when the context exits
+                assert prev.read() == "previous"
+
+        with open(filepath) as f:
+            assert f.read() == "| a |\n"
+        assert os.stat(filepath).st_mode & 0o777 == 0o640
+        assert os.listdir(tmp_path) == ["report.md"]
+
+    def test_atomic_new_file(self, tmp_path):
+        filepath = str(tmp_path / "report.md")
+        reference_filepath = str(tmp_path / "reference.md")
+        with open(reference_filepath, "w"):
+            pass
+
+        with open_report_file(filepath, WriteMode.ATOMIC) as f:
+            f.write("| a |\n")
+
+        with open(filepath) as f:
+            assert f.read() == "| a |\n"
+        # the same permissions as a file that is created by open()
+        assert os.stat(filepath).st_mode == os.stat(reference_filepath).st_mode
+
+    def test_atomic_error(self, tmp_path):
+        filepath = str(tmp_path / "report.md")
+
+        with pytest.raises(RuntimeError):
+            with open_report_file(filepath, WriteMode.ATOMIC) as f:
+                f.write("| a |\n")
+                raise RuntimeError()
+
+        assert os.listdir(tmp_path) == []
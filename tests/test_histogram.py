@@ -0,0 +1,50 @@
+import pytest
+
+from pytest_md_report._histogram import (
+    add_histograms,
+    to_bucket,
+    to_histogram,
+    to_histogram_values,
+    to_sparkline,
+)
+
+
+@pytest.mark.parametrize(
+    ["seconds", "expected"],
+    [
+        [0.0, 0],
+        [0.009, 0],
+        [0.01, 1],
+        [0.5, 2],
+        [1.0, 3],
+        [10.0, 4],
+        [1000.0, 4],
+    ],
+)
+def test_to_bucket(seconds, expected):
+    assert to_bucket(seconds) == expected
+
+
+def test_add_histograms():
+    assert add_histograms(to_histogram(0.0), to_histogram(0.5)) == (1, 0, 1, 0, 0)
+    assert add_histograms((), (1, 0, 1, 0, 0)) == (1, 0, 1, 0, 0)
+    assert add_histograms((1, 0, 1, 0, 0), ()) == (1, 0, 1, 0, 0)
+
+
+@pytest.mark.parametrize(
+    ["histogram", "expected"],
+    [
+        [(0, 0, 0, 0, 0), "     "],
+        [(8, 4, 1, 0, 0), "█▄▁  "],
+        [(1, 1, 1, 1, 1), "█████"],
+        [(0, 0, 100, 0, 1), "  █ ▁"],
+    ],
+)
+def test_to_sparkline(histogram, expected):
+    assert to_sparkline(histogram) == expected
+
+
+def test_to_histogram_values():
+    assert to_histogram_values((3, 1, 0, 0, 0), "columns") == [3, 1, 0, 0, 0]
+    assert to_histogram_values((3, 1, 0, 0, 0), "sparkline") == ["█▃   "]
+    assert to_histogram_values((), "columns") == [0, 0, 0, 0, 0]
@@ -0,0 +1,69 @@
+import io
+import json
+from types import SimpleNamespace
+
+from pytest_md_report._aggregator import StatsAggregator
+from pytest_md_report._json_writer import write_json
+
+
+def make_aggregator() -> StatsAggregator:
+    aggregator = StatsAggregator(verbosity_level=1)
+    for nodeid, outcome in (
+        ("tests/test_a.py::test_a[1]", "passed"),
+        ("tests/test_a.py::test_a[2]", "failed"),
+        ("tests/test_b.py::test_b", "skipped"),
+    ):
+        filesystempath, domaininfo = nodeid.split("::")
+        for when in ("setup", "call", "teardown"):
+            report = SimpleNamespace(
+                location=(filesystempath, 0, domaininfo),
+                nodeid=nodeid,
+                when=when,
+                duration=0.5,
+            )
+            if when == "call":
+                aggregator.add(outcome, report)
+            aggregator.add_duration(report)
+
+    return aggregator
+
+
+class Test_write_json:
+    def test_json(self):
+        stream = io.StringIO()
+        write_json(stream, make_aggregator(), "json", is_durations=False)
+
+        assert json.loads(stream.getvalue()) == {
+            "version": 1,
+            "verbosity_level": 1,
+            "total": {"passed": 1, "failed": 1, "skipped": 1},
+            "rows": [
+                {
+                    "filepath": "tests/test_a.py",
+                    "function": "test_a",
+                    "results": {"passed": 1, "failed": 1},
+                },
+                {"filepath": "tests/test_b.py", "function": "test_b", "results": {"skipped": 1}},
+            ],
+        }
+
+    def test_jsonl(self):
+        stream = io.StringIO()
+        write_json(stream, make_aggregator(), "jsonl", is_durations=True)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        assert records[0] == {
+            "type": "summary",
+            "version": 1,
+            "verbosity_level": 1,
+            "total": {"passed": 1, "failed": 1, "skipped": 1},
+            "total_durations": {"total_seconds": 4.5, "max_seconds": 1.5, "num_tests": 3},
+        }
+        assert records[1] == {
+            "type": "row",
+            "filepath": "tests/test_a.py",
+            "function": "test_a",
+            "results": {"passed": 1, "failed": 1},
+            "durations": {"total_seconds": 3.0, "max_seconds": 1.5, "num_tests": 2},
+        }
+        assert len(records) == 3
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from pytest_md_report._cli import main
+from pytest_md_report._merge import ShardMerger
+
+
+def write_shard(path, verbosity_level, total, rows, json_format="jsonl"):
+    summary = {"type": "summary", "version": 1, "verbosity_level": verbosity_level, "total": total}
+    records = [summary] + [dict({"type": "row"}, **row) for row in rows]
+
+    if json_format == "jsonl":
+        path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    else:
+        del summary["type"]
+        summary["rows"] = [
+            {name: value for name, value in row.items() if name != "type"} for row in records[1:]
+        ]
+        path.write_text(json.dumps(summary) + "\n")
+
+    return str(path)
+
+
+class Test_ShardMerger:
+    def test_add_file(self, tmp_path):
+        merger = ShardMerger()
+        merger.add_file(
+            write_shard(
+                tmp_path / "1.jsonl",
+                0,
+                {"passed": 2, "failed": 1},
+                [
+                    {"filepath": "test_a.py", "results": {"passed": 1, "failed": 1}},
+                    {"filepath": "test_b.py", "results": {"passed": 1}},
+                ],
+            )
+        )
+        merger.add_file(
+            write_shard(
+                tmp_path / "2.json",
+                0,
+                {"passed": 1},
+                [{"filepath": "test_a.py", "results": {"passed": 1}}],
+                json_format="json",
+            )
+        )
+
+        assert merger.num_shards == 2
+        assert not merger.is_durations
+        assert merger.aggregator.total_stats["passed"] == 3
+        assert merger.aggregator.extract_results(["passed", "failed"]) == {
+            ("test_a.py",): {"passed": 2, "failed": 1},
+            ("test_b.py",): {"passed": 1},
+        }
+
+    def test_verbosity_level_mismatch(self, tmp_path):
+        merger = ShardMerger()
+        merger.add_file(write_shard(tmp_path / "1.jsonl", 0, {}, []))
+
+        with pytest.raises(ValueError):
+            merger.add_file(write_shard(tmp_path / "2.jsonl", 1, {}, []))
+
+
+def test_main_merge(tmp_path, capsys):
+    shards = [
+        write_shard(
+            tmp_path / f"{i}.jsonl",
+            0,
+            {"passed": 1, "failed": 1},
+            [{"filepath": "test_a.py", "results": {"passed": 1, "failed": 1}}],
+        )
+        for i in range(3)
+    ]
+
+    assert main(["merge", *shards]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "| filepath  | passed | failed | SUBTOTAL |",
+        "| --------- | -----: | -----: | -------: |",
+        "| test_a.py |      3 |      3 |        6 |",
+        "| TOTAL     |      3 |      3 |        6 |",
+    ]
+
+
+def test_main_merge_invalid_file(tmp_path):
+    invalid_file = tmp_path / "invalid.jsonl"
+    invalid_file.write_text('{"type": "row"}\n')
+
+    with pytest.raises(SystemExit) as e:
+        main(["merge", str(invalid_file)])
+
+    assert e.value.code == 1
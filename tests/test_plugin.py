@@ -1,15 +1,18 @@
 import difflib
+import json
 import sys
 from textwrap import dedent
 
 import pytest
 from pytablewriter.writer.text import MarkdownFlavor
 
+from pytest_md_report._const import FGColor
 from pytest_md_report.plugin import (
     ColorPolicy,
     extract_file_color_policy,
     is_apply_ansi_escape_to_file,
     is_apply_ansi_escape_to_term,
+    resolve_report_settings,
 )
 
 
@@ -54,6 +57,18 @@ PYFILE_MIX_TESTS = dedent(
         assert True
     """
 )
+PYFILE_PARAM_TESTS = dedent(
+    """\
+    import pytest
+
+    @pytest.mark.parametrize("value", [1, 2, 3])
+    def test_param(value):
+        assert value != 2
+
+    def test_pass():
+        assert True
+    """
+)
 
 
 def print_test_result(expected, actual, error=None):
@@ -130,6 +145,53 @@ def test_pytest_md_report(testdir):
     assert out == expected
 
 
+def test_pytest_md_report_verbose(testdir):
+    testdir.makepyfile(PYFILE_PARAM_TESTS)
+    expected = dedent(
+        """\
+        |             filepath             |  function  | passed | failed | SUBTOTAL |
+        | -------------------------------- | ---------- | -----: | -----: | -------: |
+        | test_pytest_md_report_verbose.py | test_param |      2 |      1 |        3 |
+        | test_pytest_md_report_verbose.py | test_pass  |      1 |      0 |        1 |
+        | TOTAL                            |            |      3 |      1 |        4 |"""
+    )
+    result = testdir.runpytest(
+        "--md-report", "--md-report-color", "never", "--md-report-verbose", "1"
+    )
+    out = "\n".join(result.outlines[-5:])
+    print_test_result(expected=expected, actual=out)
+
+    assert out == expected
+
+
+def test_pytest_md_report_row_order(testdir):
+    testdir.makepyfile(
+        """\
+        def test_a():
+            pass
+
+        def test_b():
+            assert False
+
+        def test_c():
+            pass
+        """
+    )
+
+    result = testdir.runpytest(
+        "--md-report", "--md-report-color", "never", "--md-report-verbose", "1"
+    )
+
+    # rows are grouped by the outcomes in the order of the first appearance
+    result.stdout.fnmatch_lines(
+        [
+            "*| test_a   |      1 |      0 |        1 |",
+            "*| test_c   |      1 |      0 |        1 |",
+            "*| test_b   |      0 |      1 |        1 |",
+        ]
+    )
+
+
 def test_pytest_md_report_output(testdir):
     testdir.makepyfile(PYFILE_MIX_TESTS)
     expected = dedent(
@@ -166,6 +228,68 @@ def test_pytest_md_report_output(testdir):
         assert f.read().strip() == expected
 
 
+def test_pytest_md_report_output_tee_rendered_once(testdir, monkeypatch):
+    import pytest_md_report.plugin
+
+    testdir.makepyfile(PYFILE_MIX_TESTS)
+    output_filepath = testdir.tmpdir.join("report.md")
+    num_renders = []
+    write_report_table = pytest_md_report.plugin.write_report_table
+
+    def count_renders(*args, **kwargs):
+        num_renders.append(1)
+        write_report_table(*args, **kwargs)
+
+    monkeypatch.setattr(pytest_md_report.plugin, "write_report_table", count_renders)
+
+    result = testdir.runpytest_inprocess(
+        "--md-report",
+        "--md-report-color",
+        "text",
+        "--md-report-output",
+        output_filepath,
+        "--md-report-tee",
+    )
+
+    # the file output is the same as the terminal output
+    assert len(num_renders) == 1
+    with open(output_filepath) as f:
+        report = f.read()
+    assert "\x1b[" in report
+    assert report.strip() in result.stdout.str()
+
+
+def test_pytest_md_report_output_tee_style_plan(testdir, monkeypatch):
+    import pytest_md_report._style_filter
+
+    testdir.makepyfile(PYFILE_MIX_TESTS)
+    output_filepath = testdir.tmpdir.join("report.md")
+    style_plans = []
+    style_plan_class = pytest_md_report._style_filter.StylePlan
+
+    def create_style_plan(*args, **kwargs):
+        style_plans.append(style_plan_class(*args, **kwargs))
+        return style_plans[-1]
+
+    monkeypatch.setattr(pytest_md_report._style_filter, "StylePlan", create_style_plan)
+
+    testdir.runpytest_inprocess(
+        "--md-report",
+        "--md-report-color",
+        "auto",
+        "--md-report-flavor",
+        "gfm",
+        "--md-report-output",
+        output_filepath,
+        "--md-report-tee",
+    )
+
+    # outputs differ only in ANSI escape sequences: styles of the table are shared
+    assert len(style_plans) == 1
+    with open(output_filepath) as f:
+        assert "\x1b[" not in f.read()
+
+
 def test_pytest_md_report_margin(testdir):
     testdir.makepyfile(PYFILE_MIX_TESTS)
     expected = dedent(
@@ -268,3 +392,557 @@ def test_pytest_md_report_exclude_outcomes(testdir):
         report = f.read()
         print(report)
         assert report == expected
+
+
+def test_pytest_md_report_xdist_aggregate(testdir):
+    pytest.importorskip("xdist")
+
+    testdir.makepyfile(test_passed=PYFILE_PASS_TEST)
+    testdir.makepyfile(test_skipped=PYFILE_SKIP_TEST)
+    expected = dedent(
+        """\
+        |    filepath     | passed | skipped | SUBTOTAL |
+        | --------------- | -----: | ------: | -------: |
+        | test_passed.py  |      1 |       0 |        1 |
+        | test_skipped.py |      0 |       1 |        1 |
+        | TOTAL           |      1 |       1 |        2 |
+        """
+    )
+    output_filepath = testdir.tmpdir.join("report.md")
+    testdir.runpytest(
+        "-n",
+        "2",
+        "--md-report",
+        "--md-report-color",
+        "never",
+        "--md-report-xdist-aggregate",
+        "--md-report-output",
+        output_filepath,
+    )
+    with open(output_filepath) as f:
+        lines = f.read().splitlines()
+
+    # the order of rows depends on the order of workers finished
+    expected_lines = expected.splitlines()
+    assert lines[:2] == expected_lines[:2]
+    assert sorted(lines[2:-1]) == expected_lines[2:-1]
+    assert lines[-1] == expected_lines[-1]
+
+
+def test_pytest_md_report_xdist_aggregate_crash(testdir):
+    pytest.importorskip("xdist")
+
+    testdir.makepyfile(
+        test_crash="""\
+        import os
+
+        def test_crash():
+            os._exit(1)
+        """
+    )
+    result = testdir.runpytest(
+        "-n",
+        "1",
+        "--md-report",
+        "--md-report-color",
+        "never",
+        "--md-report-xdist-aggregate",
+    )
+
+    # the test that crashed the worker is reported by the controller
+    result.stdout.fnmatch_lines(
+        [
+            "*did not send aggregated results*",
+            "| test_crash.py | *1 |        1 |",
+            "| TOTAL         | *1 |        1 |",
+        ]
+    )
+
+
+def test_pytest_md_report_lazy_import(testdir):
+    testdir.makepyfile(
+        test_lazy_import=dedent(
+            """\
+            import sys
+
+            def test_lazy_import():
+                for name in ("pytablewriter", "typepy", "tcolorpy"):
+                    assert name not in sys.modules
+            """
+        )
+    )
+
+    # run in a subprocess: the libraries are already imported in this process
+    result = testdir.runpytest_subprocess()
+    result.assert_outcomes(passed=1)
+
+
+@pytest.mark.parametrize(
+    ["options", "envvars", "expected"],
+    [
+        [["--md-report-success-color", "nocolor"], {}, "--md-report-success-color"],
+        [[], {"PYTEST_MD_REPORT_ERROR_COLOR": "#ff"}, "--md-report-error-color"],
+        [[], {"PYTEST_MD_REPORT_FLAVOR": "unknown"}, "--md-report-flavor"],
+        [[], {"PYTEST_MD_REPORT_COLOR": "always"}, "--md-report-color"],
+        [[], {"PYTEST_MD_REPORT_ZEROS": "none"}, "--md-report-zeros"],
+        [["--md-report-slowest", "-1"], {}, "--md-report-slowest"],
+        [[], {"PYTEST_MD_REPORT_ROLLUP_DEPTH": "-1"}, "--md-report-rollup-depth"],
+        [["--md-report-max-rows", "0"], {}, "--md-report-max-rows"],
+        [[], {"PYTEST_MD_REPORT_MAX_BYTES": "-1"}, "--md-report-max-bytes"],
+        [[], {"PYTEST_MD_REPORT_WRITE_MODE": "truncate"}, "--md-report-write-mode"],
+        [[], {"PYTEST_MD_REPORT_JSON_FORMAT": "yaml"}, "--md-report-json-format"],
+        [[], {"PYTEST_MD_REPORT_EXPAND_PARAMS": "slow"}, "--md-report-expand-params"],
+        [
+            [],
+            {"PYTEST_MD_REPORT_DURATION_HISTOGRAM": "bars"},
+            "--md-report-duration-histogram",
+        ],
+        [["--md-report-snapshot-interval", "0"], {}, "--md-report-snapshot-interval"],
+        [["--md-report-snapshot-tests", "0"], {}, "--md-report-snapshot-tests"],
+        [["--md-report-snapshot-tests", "10"], {}, "requires --md-report-output"],
+        [
+            [
+                "--md-report-snapshot-tests",
+                "10",
+                "--md-report-output",
+                "report.md",
+                "--md-report-write-mode",
+                "append",
+            ],
+            {},
+            "cannot be used with the 'append' write mode",
+        ],
+    ],
+)
+def test_pytest_md_report_invalid_settings(testdir, monkeypatch, options, envvars, expected):
+    monkeypatch.delenv("CI", raising=False)
+    for name, value in envvars.items():
+        monkeypatch.setenv(name, value)
+    testdir.makepyfile(PYFILE_PASS_TEST)
+
+    result = testdir.runpytest("--md-report", *options)
+
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    assert expected in result.stderr.str()
+    result.stdout.no_fnmatch_line("*passed*")
+
+
+def test_resolve_report_settings_immutable(testdir):
+    config = testdir.parseconfig("--md-report", "--md-report-success-color", "blue")
+
+    settings = resolve_report_settings(config)
+
+    assert settings.color_map[FGColor.SUCCESS] == "blue"
+    with pytest.raises(TypeError):
+        settings.color_map[FGColor.SUCCESS] = "red"  # type: ignore[index]
+    with pytest.raises(AttributeError):
+        settings.margin = 0  # type: ignore[misc]
+
+
+def test_pytest_md_report_profile(testdir):
+    testdir.makepyfile(PYFILE_MIX_TESTS)
+    output_filepath = testdir.tmpdir.join("report.md")
+
+    result = testdir.runpytest(
+        "--md-report",
+        "--md-report-profile",
+        "--md-report-tee",
+        "--md-report-output",
+        output_filepath,
+    )
+
+    result.stdout.fnmatch_lines(
+        [
+            "*md-report profile*",
+            "phase *seconds *peak KiB",
+            "import *",
+            "settings *",
+            "extraction *",
+            "matrix *",
+            "styling *",
+            "rendering *",
+            "file write *",
+            "total *",
+        ]
+    )
+
+
+def test_pytest_md_report_durations(testdir):
+    testdir.makepyfile(
+        test_durations=dedent(
+            """\
+            import time
+
+            def test_fast():
+                pass
+
+            def test_slow():
+                time.sleep(0.3)
+            """
+        )
+    )
+    output_filepath = testdir.tmpdir.join("report.md")
+
+    testdir.runpytest(
+        "--md-report",
+        "--md-report-verbose",
+        "1",
+        "--md-report-color",
+        "never",
+        "--md-report-durations",
+        "--md-report-output",
+        output_filepath,
+    )
+    with open(output_filepath) as f:
+        lines = f.read().splitlines()
+
+    assert lines[0].split("|")[-4:-1] == [" duration ", " max duration ", " mean duration "]
+    assert lines[1].endswith("| -------: | -----------: | ------------: |")
+    durations_per_row = [[float(v) for v in line.split("|")[-4:-1]] for line in lines[2:]]
+    fast, slow, total = durations_per_row
+    assert fast[0] < 0.3 <= slow[0]
+    assert total[0] == pytest.approx(fast[0] + slow[0], abs=0.002)
+    assert total[1] == slow[1]
+
+
+def test_pytest_md_report_slowest(testdir):
+    testdir.makepyfile(
+        test_slow_phases=dedent(
+            """\
+            import time
+
+            def test_fast():
+                pass
+
+            def test_slow():
+                time.sleep(0.2)
+
+            def test_slow_fail():
+                time.sleep(0.1)
+                assert False
+            """
+        )
+    )
+
+    result = testdir.runpytest(
+        "--md-report", "--md-report-color", "never", "--md-report-slowest", "2"
+    )
+    result.stdout.fnmatch_lines(
+        [
+            "| TOTAL *|",
+            "",
+            "|*nodeid*|*phase*|*duration*|*outcome*|",
+            "| ---* | ---* | ---*: | ---* |",
+            "| test_slow_phases.py::test_slow *| call *| *0.2* | passed *|",
+            "| test_slow_phases.py::test_slow_fail | call *| *0.1* | failed *|",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*test_fast*")
+
+
+def test_pytest_md_report_rollup_depth(testdir):
+    for path in ("pkg/a/test_a.py", "pkg/b/c/test_c.py", "pkg/b/test_b.py", "test_root.py"):
+        testdir.tmpdir.join(path).write(PYFILE_MIX_TESTS, ensure=True)
+
+    result = testdir.runpytest(
+        "-p",
+        "no:cacheprovider",
+        "--import-mode=importlib",
+        "--md-report",
+        "--md-report-verbose",
+        "1",
+        "--md-report-color",
+        "never",
+        "--md-report-rollup-depth",
+        "2",
+    )
+    result.stdout.fnmatch_lines(
+        [
+            "| filepath | passed | failed |*| SUBTOTAL |",
+            "| ---*",
+            "| pkg/     |      3 |      3 |*|       18 |",
+            "| pkg/a/   |      1 |      1 |*|        6 |",
+            "| pkg/b/   |      2 |      2 |*|       12 |",
+            "| TOTAL    |      4 |      4 |*|       24 |",
+        ]
+    )
+
+
+def test_pytest_md_report_max_rows(testdir):
+    testdir.makepyfile(
+        test_a=PYFILE_PASS_TEST,
+        test_b=PYFILE_MIX_TESTS,
+        test_c=PYFILE_PASS_TEST,
+        test_d=PYFILE_PASS_TEST,
+    )
+
+    result = testdir.runpytest(
+        "--md-report", "--md-report-color", "never", "--md-report-max-rows", "2"
+    )
+    result.stdout.fnmatch_lines(
+        [
+            "|*filepath*| passed | failed |*| SUBTOTAL |",
+            "| ---*",
+            "| test_b.py *|      1 |      1 |*|        6 |",
+            "| 3 other files passed |      3 |      0 |*|        3 |",
+            "| TOTAL *|      4 |      1 |*|        9 |",
+        ]
+    )
+
+
+def test_pytest_md_report_max_bytes(testdir):
+    testdir.makepyfile(
+        **{f"test_{i:03d}": PYFILE_PASS_TEST for i in range(100)},
+        test_fail=PYFILE_MIX_TESTS,
+    )
+    output_filepath = testdir.tmpdir.join("report.md")
+    max_bytes = 2000
+
+    testdir.runpytest(
+        "--md-report",
+        "--md-report-flavor",
+        "gfm",
+        "--md-report-max-bytes",
+        str(max_bytes),
+        "--md-report-output",
+        output_filepath,
+    )
+    with open(output_filepath, "rb") as f:
+        output = f.read()
+
+    assert len(output) <= max_bytes
+    assert b"test_fail.py" in output
+    assert b"other files passed" in output
+
+
+def test_pytest_md_report_max_bytes_not_met(testdir):
+    testdir.makepyfile(PYFILE_MIX_TESTS)
+
+    result = testdir.runpytest("--md-report", "--md-report-max-bytes", "100")
+
+    result.stdout.fnmatch_lines(
+        [
+            "md-report: the report exceeds --md-report-max-bytes: "
+            "the header, collapsed, and TOTAL rows do not fit in 100 bytes."
+        ]
+    )
+
+
+def test_pytest_md_report_write_mode_append(testdir):
+    testdir.makepyfile(PYFILE_PASS_TEST)
+    output_filepath = testdir.tmpdir.join("summary.md")
+    output_filepath.write("# Summary\n")
+
+    for _ in range(2):
+        testdir.runpytest(
+            "--md-report",
+            "--md-report-color",
+            "never",
+            "--md-report-write-mode",
+            "append",
+            "--md-report-output",
+            output_filepath,
+        )
+
+    lines = output_filepath.read().splitlines()
+    assert lines[0] == "# Summary"
+    assert lines[1] == ""
+    assert lines[2].startswith("|")
+    assert lines.count("") == 2
+    assert len([line for line in lines if line.startswith("| TOTAL")]) == 2
+
+
+def test_pytest_md_report_json_output(testdir):
+    testdir.makepyfile(PYFILE_MIX_TESTS)
+    output_filepath = testdir.tmpdir.join("report.jsonl")
+
+    testdir.runpytest(
+        "--md-report",
+        "--md-report-verbose",
+        "0",
+        "--md-report-json-format",
+        "jsonl",
+        "--md-report-json-output",
+        output_filepath,
+    )
+    records = [json.loads(line) for line in output_filepath.read().splitlines()]
+
+    assert records[0]["type"] == "summary"
+    assert records[0]["total"] == {
+        "passed": 1,
+        "failed": 1,
+        "error": 1,
+        "skipped": 1,
+        "xfailed": 1,
+        "xpassed": 1,
+    }
+    assert [record["type"] for record in records[1:]] == ["row"]
+    assert records[1]["results"] == records[0]["total"]
+
+
+def test_pytest_md_report_baseline(testdir):
+    testdir.makepyfile(
+        test_a="""\
+        def test_a():
+            assert False
+        """,
+        test_b="""\
+        def test_b():
+            pass
+        """,
+    )
+    options = ["--md-report", "--md-report-color", "never", "--md-report-baseline"]
+
+    result = testdir.runpytest(*options)
+    assert "new failures" not in result.stdout.str()
+
+    testdir.makepyfile(
+        test_a="""\
+        def test_a():
+            pass
+        """,
+        test_b="""\
+        def test_b():
+            assert False
+        """,
+    )
+    result = testdir.runpytest(*options)
+    result.stdout.fnmatch_lines(
+        [
+            "| filepath  | passed | failed | SUBTOTAL | new failures | fixed |",
+            "| test_a.py |      1 |      0 |        1 |            0 |     1 |",
+            "| test_b.py |      0 |      1 |        1 |            1 |     0 |",
+            "| TOTAL     |      1 |      1 |        2 |            1 |     1 |",
+        ]
+    )
+
+
+def test_pytest_md_report_snapshot(testdir):
+    output_filepath = testdir.tmpdir.join("report.md")
+    testdir.makepyfile(
+        f"""\
+        import pathlib
+
+
+        def test_a():
+            pass
+
+
+        def test_b():
+            pass
+
+
+        def test_snapshot():
+            snapshot = pathlib.Path({str(output_filepath)!r}).read_text()
+            assert "|      2 |        2 |\\n\\nmd-report: snapshot" in snapshot
+            assert snapshot.endswith("2 tests finished.\\n")
+        """
+    )
+
+    result = testdir.runpytest(
+        "--md-report",
+        "--md-report-color",
+        "never",
+        "--md-report-snapshot-tests",
+        "2",
+        "--md-report-output",
+        output_filepath,
+    )
+
+    result.assert_outcomes(passed=3)
+    assert "tests finished" not in output_filepath.read()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM cannot be handled on Windows")
+def test_pytest_md_report_crash_safe(testdir):
+    output_filepath = testdir.tmpdir.join("report.md")
+    testdir.makepyfile(
+        """\
+        import os
+        import signal
+
+
+        def test_a():
+            pass
+
+
+        def test_terminated():
+            os.kill(os.getpid(), signal.SIGTERM)
+        """
+    )
+
+    testdir.runpytest_subprocess(
+        "--md-report",
+        "--md-report-color",
+        "never",
+        "--md-report-crash-safe",
+        "--md-report-output",
+        output_filepath,
+    )
+
+    lines = output_filepath.read().splitlines()
+    assert lines[-3] == "| TOTAL                               |      1 |        1 |"
+    assert lines[-1] == (
+        "md-report: incomplete report, received SIGTERM while running: "
+        "test_pytest_md_report_crash_safe.py::test_terminated."
+    )
+
+
+def test_pytest_md_report_expand_params(testdir):
+    testdir.makepyfile(
+        """\
+        import pytest
+
+
+        @pytest.mark.parametrize("i", range(5))
+        def test_a(i):
+            assert i != 3
+        """
+    )
+
+    result = testdir.runpytest(
+        "--md-report",
+        "--md-report-color",
+        "never",
+        "--md-report-verbose",
+        "2",
+        "--md-report-expand-params",
+        "failed",
+    )
+
+    result.stdout.fnmatch_lines(
+        [
+            "*| function  | passed | failed | SUBTOTAL |",
+            "*| test_a    |      4 |      0 |        4 |",
+            "*| test_a[[]3] |      0 |      1 |        1 |",
+            "*|           |      4 |      1 |        5 |",
+        ]
+    )
+
+
+def test_pytest_md_report_duration_histogram(testdir):
+    testdir.makepyfile(
+        """\
+        def test_a():
+            pass
+
+        def test_b():
+            pass
+        """
+    )
+
+    result = testdir.runpytest(
+        "--md-report",
+        "--md-report-color",
+        "never",
+        "--md-report-duration-histogram",
+        "columns",
+    )
+
+    # tests that do nothing finish within 10 milliseconds
+    result.stdout.fnmatch_lines(
+        [
+            "*| mean duration | <10ms | <100ms | <1s | <10s | >=10s |",
+            "| TOTAL *|     2 |      0 |   0 |    0 |     0 |",
+        ]
+    )
@@ -0,0 +1,37 @@
+import tracemalloc
+
+from pytest_md_report._profiler import Phase, PhaseProfiler
+
+
+class Test_PhaseProfiler:
+    def test_measure_all(self):
+        profiler = PhaseProfiler(enabled=True)
+
+        with profiler.measure(Phase.RENDERING):
+            pass
+        with profiler.measure_all(Phase.SNAPSHOT):
+            with profiler.measure(Phase.EXTRACTION):
+                with profiler.measure(Phase.RENDERING):
+                    pass
+
+        # phases nested in a snapshot are not added to the phases of the report
+        assert list(profiler.stats) == [Phase.RENDERING, Phase.SNAPSHOT]
+
+    def test_traced_by_others(self):
+        profiler = PhaseProfiler(enabled=True)
+        tracemalloc.start()
+        try:
+            data = bytearray(1024 * 1024)
+            del data
+            _current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+
+            with profiler.measure(Phase.RENDERING):
+                data = [0] * 1024
+                del data
+
+            # the peak of the trace is neither reset nor attributed to the phase
+            assert tracemalloc.get_traced_memory()[1] == peak_bytes
+            assert profiler.stats[Phase.RENDERING].peak_bytes < 1024 * 1024
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
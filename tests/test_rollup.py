@@ -0,0 +1,36 @@
+import pytest
+
+from pytest_md_report._aggregator import DurationStats
+from pytest_md_report._rollup import DirectoryTree
+
+
+class Test_DirectoryTree:
+    def test_extract(self):
+        tree = DirectoryTree(["passed", "failed"], depth=2)
+        tree.add("tests/unit/a/test_a.py", {"passed": 2}, DurationStats(1.0, 0.75, 2))
+        tree.add("tests/integ/test_b.py", {"failed": 1}, DurationStats(2.0, 2.0, 1))
+        tree.add("tests/unit/b/test_c.py", {"passed": 1, "failed": 1}, DurationStats(1.0, 1.0, 2))
+        tree.add("tests/test_d.py", {"passed": 1}, DurationStats(0.5, 0.5, 1))
+        tree.add("test_e.py", {"passed": 1}, DurationStats(0.5, 0.5, 1))
+
+        # rows of directories are subtotals of the subdirectories,
+        # and the subtotal of the root directory is the TOTAL row
+        assert list(tree.extract_results().items()) == [
+            (("tests/",), {"passed": 4, "failed": 2}),
+            (("tests/unit/",), {"passed": 3, "failed": 1}),
+            (("tests/integ/",), {"failed": 1}),
+        ]
+        assert tree.extract_durations()[("tests/unit/",)] == DurationStats(2.0, 1.0, 4)
+        assert tree.extract_durations()[("tests/",)] == DurationStats(4.5, 2.0, 6)
+
+    def test_excluded_outcomes(self):
+        tree = DirectoryTree(["failed"], depth=1)
+        tree.add("tests/test_a.py", {"passed": 2})
+        tree.add("other/test_b.py", {"failed": 1})
+
+        assert tree.extract_results() == {("other/",): {"failed": 1}}
+        assert tree.extract_durations() == {}
+
+    def test_invalid_depth(self):
+        with pytest.raises(ValueError):
+            DirectoryTree(["passed"], depth=0)
@@ -0,0 +1,37 @@
+from pytest_md_report._slowest import SlowestTests, SlowTest
+
+
+class Test_SlowestTests:
+    def test_add(self):
+        slowest = SlowestTests(size=3)
+        for i, duration in enumerate([0.5, 0.1, 2.0, 0.5, 0.3, 1.0]):
+            slowest.add(f"test_a.py::test_{i}", "call", duration, "passed")
+
+        assert len(slowest) == 3
+        assert slowest.extract() == [
+            SlowTest("test_a.py::test_2", "call", 2.0, "passed"),
+            SlowTest("test_a.py::test_5", "call", 1.0, "passed"),
+            SlowTest("test_a.py::test_0", "call", 0.5, "passed"),
+        ]
+
+    def test_merge(self):
+        worker_a = SlowestTests(size=2)
+        worker_a.add("test_a.py::test_a", "setup", 3.0, "passed")
+        worker_a.add("test_a.py::test_b", "call", 1.0, "failed")
+        worker_b = SlowestTests(size=2)
+        worker_b.add("test_b.py::test_c", "call", 2.0, "passed")
+
+        slowest = SlowestTests(size=2)
+        slowest.merge(worker_a.to_list())
+        slowest.merge(worker_b.to_list())
+
+        assert slowest.extract() == [
+            SlowTest("test_a.py::test_a", "setup", 3.0, "passed"),
+            SlowTest("test_b.py::test_c", "call", 2.0, "passed"),
+        ]
+
+    def test_zero_size(self):
+        slowest = SlowestTests(size=0)
+        slowest.add("test_a.py::test_a", "call", 1.0, "passed")
+
+        assert slowest.extract() == []
@@ -0,0 +1,49 @@
+import pytest
+
+from pytest_md_report._snapshot import SnapshotScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Test_SnapshotScheduler:
+    def test_num_tests(self):
+        snapshots = []
+        scheduler = SnapshotScheduler(snapshots.append, num_tests=3)
+
+        for _ in range(10):
+            scheduler.on_test_finished()
+
+        assert snapshots == [3, 6, 9]
+
+    def test_interval(self):
+        snapshots = []
+        clock = FakeClock()
+        scheduler = SnapshotScheduler(snapshots.append, interval=10, clock=clock)
+
+        for now in [1, 5, 10, 12, 19, 21]:
+            clock.now = now
+            scheduler.on_test_finished()
+
+        assert snapshots == [3, 6]
+
+    def test_interval_and_num_tests(self):
+        snapshots = []
+        clock = FakeClock()
+        scheduler = SnapshotScheduler(snapshots.append, interval=10, num_tests=2, clock=clock)
+
+        for now in [1, 2, 15, 16, 17]:
+            clock.now = now
+            scheduler.on_test_finished()
+
+        # each snapshot restarts both of the deadlines
+        assert snapshots == [2, 3, 5]
+
+    def test_no_schedule(self):
+        with pytest.raises(ValueError):
+            SnapshotScheduler(lambda num_tests: None)
@@ -0,0 +1,119 @@
+import io
+import random
+from typing import Any
+
+import pytest
+from pytablewriter import TableWriterFactory
+from pytablewriter.writer.text import MarkdownFlavor
+
+from pytest_md_report._stream_writer import MarkdownStreamWriter
+from pytest_md_report.plugin import zero_to_nullstr
+
+
+HEADERS = ["filepath", "function", "passed", "failed", "SUBTOTAL"]
+NUMBER_COLUMNS = [False, False, True, True, True]
+VALUE_MATRIX = [
+    ["tests/test_a.py", "test_pass", 3, 0, 3],
+    ["tests/test_日本語.py", "test_fail", 0, 12, 12],
+    ["tests/test_pipe.py", "test_a|b", 100, 1, 101],
+    ["tests/test_newline.py", "test_a\nb", 1, 0, 1],
+    ["TOTAL", "", 104, 13, 117],
+]
+
+
+def dumps_by_pytablewriter(flavor: MarkdownFlavor, margin: int, render_zeros: bool) -> str:
+    writer = TableWriterFactory.create_from_format_name(
+        "md", flavor=flavor.value, colorize_terminal=False
+    )
+    writer.headers = HEADERS
+    writer.margin = margin
+    writer.value_matrix = VALUE_MATRIX
+    if not render_zeros:
+        writer.register_trans_func(zero_to_nullstr)
+
+    return writer.dumps()
+
+
+@pytest.mark.parametrize(
+    ["flavor"],
+    [[MarkdownFlavor.COMMON_MARK], [MarkdownFlavor.GFM], [MarkdownFlavor.KRAMDOWN]],
+)
+@pytest.mark.parametrize(["margin"], [[0], [1], [2]])
+@pytest.mark.parametrize(["render_zeros"], [[True], [False]])
+def test_write_table(flavor, margin, render_zeros):
+    stream = io.StringIO()
+    writer = MarkdownStreamWriter(
+        headers=HEADERS,
+        number_columns=NUMBER_COLUMNS,
+        flavor=flavor,
+        margin=margin,
+        render_zeros=render_zeros,
+    )
+    writer.write_table(stream, lambda: iter(VALUE_MATRIX))
+
+    assert stream.getvalue() == dumps_by_pytablewriter(flavor, margin, render_zeros)
+
+
+def test_write_table_mismatch_columns():
+    with pytest.raises(ValueError):
+        MarkdownStreamWriter(
+            headers=HEADERS,
+            number_columns=NUMBER_COLUMNS[:-1],
+            flavor=MarkdownFlavor.COMMON_MARK,
+            margin=1,
+            render_zeros=True,
+        )
+
+
+# ASCII/East Asian wide/ambiguous/combining characters and characters to be escaped
+FUZZ_CHARS = "abcXYZ_/.-[]|日本語テスト°±é́ "
+
+
+def make_fuzz_table(rand: random.Random) -> tuple[list[str], list[bool], list[list[Any]]]:
+    def make_text() -> str:
+        # prefixed to avoid being inferred as numbers/booleans by pytablewriter
+        return "t" + "".join(rand.choice(FUZZ_CHARS) for _ in range(rand.randint(0, 12))) + "t"
+
+    num_key_columns = rand.randint(1, 2)
+    num_number_columns = rand.randint(1, 5)
+    headers = [make_text() for _ in range(num_key_columns + num_number_columns)]
+    number_columns = [col >= num_key_columns for col in range(len(headers))]
+    value_matrix = [
+        [make_text() for _ in range(num_key_columns)]
+        + [
+            rand.choice([0, rand.randint(0, 10 ** rand.randint(1, 6))])
+            for _ in range(num_number_columns)
+        ]
+        for _ in range(rand.randint(1, 10))
+    ]
+
+    return (headers, number_columns, value_matrix)
+
+
+@pytest.mark.parametrize(["seed"], [[seed] for seed in range(50)])
+def test_write_table_fuzz(seed):
+    rand = random.Random(seed)
+    headers, number_columns, value_matrix = make_fuzz_table(rand)
+    flavor = rand.choice([MarkdownFlavor.COMMON_MARK, MarkdownFlavor.GFM, MarkdownFlavor.KRAMDOWN])
+    margin = rand.randint(0, 2)
+    render_zeros = rand.choice([True, False])
+
+    stream = io.StringIO()
+    MarkdownStreamWriter(
+        headers=headers,
+        number_columns=number_columns,
+        flavor=flavor,
+        margin=margin,
+        render_zeros=render_zeros,
+    ).write_table(stream, lambda: iter(value_matrix))
+
+    writer = TableWriterFactory.create_from_format_name(
+        "md", flavor=flavor.value, colorize_terminal=False
+    )
+    writer.headers = headers
+    writer.margin = margin
+    writer.value_matrix = value_matrix
+    if not render_zeros:
+        writer.register_trans_func(zero_to_nullstr)
+
+    assert stream.getvalue() == writer.dumps()
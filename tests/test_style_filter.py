@@ -0,0 +1,67 @@
+from pytablewriter.style import Cell, Style
+
+from pytest_md_report._const import ColorPolicy, Default, FGColor
+from pytest_md_report._style_filter import StylePlan, col_separator_style_filter, style_filter
+from pytest_md_report._table import ReportTable
+
+
+COLOR_MAP = {
+    FGColor.SUCCESS: Default.FGColor.SUCCESS,
+    FGColor.ERROR: Default.FGColor.ERROR,
+    FGColor.SKIP: Default.FGColor.SKIP,
+    FGColor.GRAYOUT: Default.FGColor.GRAYOUT,
+}
+
+
+def make_table(num_rows: int) -> ReportTable:
+    value_matrix = [[f"test_{row}.py", 1, 0, 1] for row in range(num_rows)]
+    value_matrix.append(["TOTAL", num_rows, 0, num_rows])
+
+    return ReportTable(
+        headers=["filepath", "passed", "failed", "SUBTOTAL"],
+        num_key_columns=1,
+        value_matrix=value_matrix,
+    )
+
+
+class Test_style_filter:
+    def test_interned(self):
+        table = make_table(100)
+        style_plan = StylePlan(table, ColorPolicy.AUTO, COLOR_MAP)
+        styles = [
+            style_filter(
+                Cell(row=row, col=col, value=value, default_style=Style()),
+                style_plan=style_plan,
+            )
+            for row, values in enumerate(table.value_matrix)
+            for col, value in enumerate(values)
+        ]
+
+        # even/odd/TOTAL rows x row class/outcome/zero colors
+        assert style_plan.num_styles <= 9
+
+        # the writer sets the padding of each cell to the returned style
+        assert len({id(style) for style in styles}) == len(styles)
+        styles[0].padding = 10
+        assert styles[4].padding is None
+        assert styles[0].color == styles[8].color
+        assert styles[0].bg_color == styles[8].bg_color
+
+    def test_col_separator(self):
+        table = make_table(4)
+        kwargs = {"num_rows": len(table.value_matrix)}
+
+        def to_style(row: int) -> Style:
+            return col_separator_style_filter(
+                Cell(row=row, col=0, value="|", default_style=Style()), None, **kwargs
+            )
+
+        assert to_style(0) is to_style(2)
+        assert to_style(0) is not to_style(1)
+        assert to_style(4) is not to_style(0)
+        assert (
+            col_separator_style_filter(
+                Cell(row=-1, col=0, value="|", default_style=Style()), None, **kwargs
+            )
+            is None
+        )
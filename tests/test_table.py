@@ -0,0 +1,74 @@
+from pytest_md_report._const import FGColor, Header
+from pytest_md_report._table import ColumnLayout, ColumnStats, ReportTable, calc_column_stats
+
+
+class Test_calc_column_stats:
+    def test_normal(self):
+        value_matrix = [
+            ["a.py", 1, 0, 0],
+            ["b.py", 3, 0, 2],
+            ["TOTAL", 4, 0, 2],
+        ]
+
+        assert calc_column_stats(value_matrix, 4) == [
+            ColumnStats(is_all_zero=False, total=0, max=0),
+            ColumnStats(is_all_zero=False, total=8, max=4),
+            ColumnStats(is_all_zero=True, total=0, max=0),
+            ColumnStats(is_all_zero=False, total=4, max=2),
+        ]
+
+
+class Test_ReportTable:
+    def test_normal(self):
+        table = ReportTable(
+            headers=["filepath", "passed", "failed", "skipped", "SUBTOTAL"],
+            num_key_columns=1,
+            value_matrix=iter(
+                [
+                    ["a.py", 1, 0, 0, 1],
+                    ["b.py", 3, 1, 1, 5],
+                    ["c.py", 0, 0, 2, 2],
+                    ["TOTAL", 4, 1, 3, 8],
+                ]
+            ),
+        )
+
+        assert table.number_columns == [False, True, True, True, True]
+        assert table.row_classes == [FGColor.SUCCESS, FGColor.ERROR, FGColor.SKIP, FGColor.ERROR]
+        assert table.retrieve_column_layout(render_zeros=True) == ColumnLayout(
+            widths=[8, 6, 6, 7, 8], aligns_right=[False, True, True, True, True]
+        )
+        assert table.retrieve_column_layout(render_zeros=False) is table.retrieve_column_layout(
+            render_zeros=False
+        )
+
+    def test_rows_func(self):
+        num_calls = []
+
+        def iter_rows():
+            num_calls.append(1)
+            yield ["a.py", 1, 0, 0.5]
+            yield ["b.py", 0, 1, 2.0]
+            yield ["TOTAL", 1, 1, 2.5]
+
+        table = ReportTable(
+            headers=["filepath", "passed", "failed", Header.MAX_DURATION],
+            num_key_columns=1,
+            value_matrix=iter_rows,
+            duration_threshold=1.0,
+        )
+
+        # rows are formatted on each iteration without being stored
+        assert list(table.iter_rows()) == [
+            ["a.py", 1, 0, "0.500"],
+            ["b.py", 0, 1, "2.000"],
+            ["TOTAL", 1, 1, "2.500"],
+        ]
+        assert table.retrieve_column_layout(render_zeros=True).widths == [8, 6, 6, 12]
+        assert len(num_calls) == 2
+
+        # rows are stored once when the styles of the rows are requested
+        assert table.row_classes == [FGColor.SUCCESS, FGColor.ERROR, FGColor.ERROR]
+        assert table.slow_cells == frozenset([(1, 3), (2, 3)])
+        assert table.value_matrix is table.iter_rows()
+        assert len(num_calls) == 3